@@ -0,0 +1,51 @@
+"""association primary key and foreign key indexes
+
+Revision ID: 9d1f6a3c5e27
+Revises: 4b7e2c91d0a3
+Create Date: 2026-10-18 11:02:17.530914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d1f6a3c5e27'
+down_revision: Union[str, None] = '4b7e2c91d0a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Rows without both keys or duplicated pairs would violate the new primary key
+    op.execute(
+        'DELETE FROM fair_place_association WHERE fair_id IS NULL OR place_id IS NULL'
+    )
+    op.execute(
+        'DELETE FROM fair_place_association a USING fair_place_association b '
+        'WHERE a.ctid < b.ctid AND a.fair_id = b.fair_id AND a.place_id = b.place_id'
+    )
+    op.alter_column('fair_place_association', 'fair_id', existing_type=sa.UUID(), nullable=False)
+    op.alter_column('fair_place_association', 'place_id', existing_type=sa.UUID(), nullable=False)
+    op.create_primary_key(
+        'fair_place_association_pkey', 'fair_place_association', ['fair_id', 'place_id']
+    )
+    op.create_index(
+        'ix_fair_place_association_place_id_fair_id',
+        'fair_place_association',
+        ['place_id', 'fair_id'],
+        unique=False,
+    )
+    op.create_index('ix_reservation_business_id', 'reservation', ['business_id'], unique=False)
+    op.create_index('ix_reservation_place_id', 'reservation', ['place_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_reservation_place_id', table_name='reservation')
+    op.drop_index('ix_reservation_business_id', table_name='reservation')
+    op.drop_index('ix_fair_place_association_place_id_fair_id', table_name='fair_place_association')
+    op.drop_constraint('fair_place_association_pkey', 'fair_place_association', type_='primary')
+    op.alter_column('fair_place_association', 'place_id', existing_type=sa.UUID(), nullable=True)
+    op.alter_column('fair_place_association', 'fair_id', existing_type=sa.UUID(), nullable=True)
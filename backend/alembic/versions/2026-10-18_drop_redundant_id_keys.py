@@ -0,0 +1,55 @@
+"""drop redundant unique constraints on primary keys
+
+Revision ID: 2c8e5b7f1a64
+Revises: 9d1f6a3c5e27
+Create Date: 2026-10-18 12:15:41.208337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2c8e5b7f1a64'
+down_revision: Union[str, None] = '9d1f6a3c5e27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TABLES = ['admin', 'business', 'fair', 'payment', 'place', 'reservation']
+
+# Foreign keys may have been bound to the {table}_id_key index instead of the primary key,
+# so they are recreated around dropping it
+FOREIGN_KEYS = [
+    ('reservation', 'business_id', 'business'),
+    ('reservation', 'fair_id', 'fair'),
+    ('reservation', 'payment_id', 'payment'),
+    ('reservation', 'place_id', 'place'),
+    ('fair_place_association', 'fair_id', 'fair'),
+    ('fair_place_association', 'place_id', 'place'),
+]
+
+
+def _drop_foreign_keys() -> None:
+    for table, column, _ in FOREIGN_KEYS:
+        op.drop_constraint(f'{table}_{column}_fkey', table, type_='foreignkey')
+
+
+def _create_foreign_keys() -> None:
+    for table, column, referred in FOREIGN_KEYS:
+        op.create_foreign_key(f'{table}_{column}_fkey', table, referred, [column], ['id'])
+
+
+def upgrade() -> None:
+    _drop_foreign_keys()
+    for table in TABLES:
+        op.drop_constraint(f'{table}_id_key', table, type_='unique')
+    _create_foreign_keys()
+
+
+def downgrade() -> None:
+    _drop_foreign_keys()
+    for table in TABLES:
+        op.create_unique_constraint(f'{table}_id_key', table, ['id'])
+    _create_foreign_keys()
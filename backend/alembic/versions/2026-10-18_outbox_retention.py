@@ -0,0 +1,40 @@
+"""outbox retention indexes
+
+Revision ID: b4d8e2a6c173
+Revises: 9e2a4c7f1b58
+Create Date: 2026-10-18 19:47:03.186254
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4d8e2a6c173'
+down_revision: Union[str, None] = '9e2a4c7f1b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_outbox_message_delivered',
+        'outbox_message',
+        ['delivered_at'],
+        unique=False,
+        postgresql_where=sa.text("status = 'delivered'"),
+    )
+    op.create_index(
+        'ix_outbox_message_dead',
+        'outbox_message',
+        ['id'],
+        unique=False,
+        postgresql_where=sa.text("status = 'dead'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_outbox_message_dead', table_name='outbox_message')
+    op.drop_index('ix_outbox_message_delivered', table_name='outbox_message')
@@ -0,0 +1,32 @@
+"""payment event ignored time
+
+Revision ID: 9e2a4c7f1b58
+Revises: 0d7c3b9e5a16
+Create Date: 2026-10-18 19:21:44.527103
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e2a4c7f1b58'
+down_revision: Union[str, None] = '0d7c3b9e5a16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('payment_event', sa.Column('ignored_at', sa.DateTime(), nullable=True))
+    # Events that ran out of attempts were left queued, take them out of the queue
+    op.execute(
+        "UPDATE payment_event SET processed_at = timezone('utc', now()), "
+        "ignored_at = timezone('utc', now()) "
+        "WHERE processed_at IS NULL AND attempts >= 60"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('payment_event', 'ignored_at')
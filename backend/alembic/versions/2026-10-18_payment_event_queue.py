@@ -0,0 +1,51 @@
+"""payment event queue
+
+Revision ID: 3a6d9e1f7b42
+Revises: 5f0b8d2e6c91
+Create Date: 2026-10-18 15:12:30.418265
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3a6d9e1f7b42'
+down_revision: Union[str, None] = '5f0b8d2e6c91'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'payment_event',
+        sa.Column('event_id', sa.String(length=255), nullable=False),
+        sa.Column('charge_id', sa.String(length=255), nullable=False),
+        sa.Column('payment_status', sa.String(length=50), nullable=False),
+        sa.Column('occurred_at', sa.DateTime(), nullable=False),
+        sa.Column('attempts', sa.INTEGER(), nullable=False),
+        sa.Column('processed_at', sa.DateTime(), nullable=True),
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('event_id'),
+    )
+    op.create_index(
+        'ix_payment_event_queued',
+        'payment_event',
+        ['occurred_at', 'id'],
+        unique=False,
+        postgresql_where=sa.text('processed_at IS NULL'),
+    )
+    op.create_index(
+        op.f('ix_payment_payment_stripe_id'), 'payment', ['payment_stripe_id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_payment_payment_stripe_id'), table_name='payment')
+    op.drop_index('ix_payment_event_queued', table_name='payment_event')
+    op.drop_table('payment_event')
@@ -0,0 +1,43 @@
+"""store stripe charge ids as strings
+
+Revision ID: 5f0b8d2e6c91
+Revises: 7e3a9c4d2b18
+Create Date: 2026-10-18 14:41:52.093716
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f0b8d2e6c91'
+down_revision: Union[str, None] = '7e3a9c4d2b18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.alter_column(
+        'payment',
+        'payment_stripe_id',
+        existing_type=sa.Integer(),
+        type_=sa.String(),
+        existing_nullable=False,
+        postgresql_using='payment_stripe_id::varchar',
+    )
+
+
+def downgrade() -> None:
+    # Real charge ids ("ch_...") cannot be represented as integers and become 0
+    op.alter_column(
+        'payment',
+        'payment_stripe_id',
+        existing_type=sa.String(),
+        type_=sa.Integer(),
+        existing_nullable=False,
+        postgresql_using=(
+            "CASE WHEN payment_stripe_id ~ '^[0-9]+$' THEN payment_stripe_id::integer ELSE 0 END"
+        ),
+    )
@@ -0,0 +1,44 @@
+"""unique payment charge id
+
+Revision ID: 2f9c6a1e8d45
+Revises: b4d8e2a6c173
+Create Date: 2026-10-18 20:32:18.640972
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2f9c6a1e8d45'
+down_revision: Union[str, None] = 'b4d8e2a6c173'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Concurrent /pay requests could record the same charge twice, keep the copy the
+    # reservation points at
+    op.execute(
+        "DELETE FROM payment WHERE id IN ("
+        "SELECT id FROM ("
+        "SELECT p.id, row_number() OVER ("
+        "PARTITION BY p.payment_stripe_id "
+        "ORDER BY EXISTS (SELECT 1 FROM reservation r WHERE r.payment_id = p.id) DESC, "
+        "p.created_at, p.id"
+        ") AS copy FROM payment p"
+        ") copies WHERE copy > 1)"
+    )
+    op.drop_index('ix_payment_payment_stripe_id', table_name='payment')
+    op.create_unique_constraint(
+        'payment_payment_stripe_id_key', 'payment', ['payment_stripe_id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('payment_payment_stripe_id_key', 'payment', type_='unique')
+    op.create_index(
+        op.f('ix_payment_payment_stripe_id'), 'payment', ['payment_stripe_id'], unique=False
+    )
@@ -0,0 +1,48 @@
+"""numeric place coordinates
+
+Revision ID: 7e3a9c4d2b18
+Revises: 2c8e5b7f1a64
+Create Date: 2026-10-18 13:27:05.641920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e3a9c4d2b18'
+down_revision: Union[str, None] = '2c8e5b7f1a64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+NUMBER = r'-?[0-9]+(\.[0-9]+)?([eE][-+]?[0-9]+)?'
+
+
+def upgrade() -> None:
+    op.add_column('place', sa.Column('place_lat', sa.Double(), nullable=True))
+    op.add_column('place', sa.Column('place_lng', sa.Double(), nullable=True))
+    # Backfill from the "lat lng" string, malformed or out of range values stay NULL
+    op.execute(
+        sa.text(
+            f"""
+            UPDATE place SET place_lat = parts[1]::double precision, place_lng = parts[2]::double precision
+            FROM (
+                SELECT id, regexp_split_to_array(btrim(place_cordinates), '\\s+') AS parts
+                FROM place
+                WHERE place_cordinates ~ '^\\s*{NUMBER}\\s+{NUMBER}\\s*$'
+            ) AS parsed
+            WHERE place.id = parsed.id
+              AND parts[1]::double precision BETWEEN -90 AND 90
+              AND parts[2]::double precision BETWEEN -180 AND 180
+            """
+        )
+    )
+    op.create_index('ix_place_lat_lng', 'place', ['place_lat', 'place_lng'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_place_lat_lng', table_name='place')
+    op.drop_column('place', 'place_lng')
+    op.drop_column('place', 'place_lat')
@@ -0,0 +1,26 @@
+"""reservation check-in time
+
+Revision ID: 6b1e8f3a9d27
+Revises: 8c4f2a7d1e93
+Create Date: 2026-10-18 16:48:11.905372
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6b1e8f3a9d27'
+down_revision: Union[str, None] = '8c4f2a7d1e93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('reservation', sa.Column('checked_in_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('reservation', 'checked_in_at')
@@ -0,0 +1,34 @@
+"""reservation hold expiry
+
+Revision ID: 4b7e2c91d0a3
+Revises: 835dc00da798
+Create Date: 2026-10-18 09:12:44.118201
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b7e2c91d0a3'
+down_revision: Union[str, None] = '835dc00da798'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('reservation', sa.Column('hold_expires_at', sa.DateTime(), nullable=True))
+    op.create_index(
+        'ix_reservation_unpaid_hold_expires_at',
+        'reservation',
+        ['hold_expires_at'],
+        unique=False,
+        postgresql_where=sa.text('payment_id IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_reservation_unpaid_hold_expires_at', table_name='reservation')
+    op.drop_column('reservation', 'hold_expires_at')
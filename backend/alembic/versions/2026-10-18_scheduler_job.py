@@ -0,0 +1,35 @@
+"""scheduler job runs
+
+Revision ID: 0d7c3b9e5a16
+Revises: 6b1e8f3a9d27
+Create Date: 2026-10-18 18:05:27.361840
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0d7c3b9e5a16'
+down_revision: Union[str, None] = '6b1e8f3a9d27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'scheduler_job',
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('last_run_at', sa.DateTime(), nullable=True),
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('scheduler_job')
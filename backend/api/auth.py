@@ -1,8 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Security
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Security
 from sqlalchemy.ext.asyncio import AsyncSession
 from loguru import logger
 from fastapi.security import OAuth2PasswordRequestForm
-from typing import Annotated
+from typing import Annotated, Literal, Optional
 
 from backend.db.session import get_db
 
@@ -11,10 +11,11 @@ from backend.crud.admin import admin_crud
 from backend.schemas.token import Token
 from backend.schemas.admin import AdminCreate, AdminResponse, AdminUpdate
 from backend.schemas.business import BusinessCreate, BusinessResponse
+from backend.schemas.page import Page
+from backend.utils.pagination import InvalidPageQueryError
 from backend.services.auth import (
-    auth_business,
+    authenticate,
     create_access_token,
-    auth_admin,
     get_current_user_email,
 )
 
@@ -38,23 +39,20 @@ async def login_for_access_token(
     Raises:
         HTTPException: If the authentication fails for both admin and business users.
     """
-    admin = await auth_admin(
+    principal = await authenticate(
         db=db, email=form_data.username, password=form_data.password
     )
-    if admin:
-        return await create_access_token(
-            data={"sub": form_data.username, "scopes": "admin"}
-        )
-
-    business = await auth_business(
-        db=db, email=form_data.username, password=form_data.password
-    )
-    if not business:
+    if not principal:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+    if principal.kind == "admin":
+        return await create_access_token(
+            data={"sub": form_data.username, "scopes": "admin"}
+        )
     return await create_access_token({"sub": form_data.username, "scopes": ""})
 
 
@@ -165,3 +163,48 @@ async def get_info(user_email: Annotated[
     ], db: AsyncSession = Depends(get_db)):
     b = await business_crud.get_by_email(db=db, email=user_email)
     return b
+
+
+@router.get("/businesses", response_model=Page[BusinessResponse], status_code=status.HTTP_200_OK)
+async def list_businesses(user_email: Annotated[
+        str, Security(get_current_user_email, scopes=["admin"])
+    ], cursor: Optional[str] = None,
+    limit: Annotated[int, Query(ge=1, le=200)] = 50,
+    sort: Optional[str] = None,
+    order: Literal["asc", "desc"] = "asc",
+    email: Optional[str] = None,
+    with_total: bool = False,
+    db: AsyncSession = Depends(get_db)) -> Page[BusinessResponse]:
+    """
+    Retrieve registered businesses one page at a time.
+    Args:
+        cursor (str, optional): next_cursor of the previous page.
+        limit (int): Maximum number of businesses per page.
+        sort (str, optional): One of created_at, business_name, email. Defaults to created_at.
+        order (str): Sort direction, asc or desc.
+        email (str, optional): Only return the business with this email.
+        with_total (bool): Whether to include an estimate of the number of matching businesses.
+        db (AsyncSession): The database session.
+    Returns:
+        Page[BusinessResponse]: One page of businesses.
+    Raises:
+        HTTPException: If the sort field or the cursor is invalid (HTTP 400).
+    """
+    try:
+        page = await business_crud.get_page(
+            db=db,
+            limit=limit,
+            cursor=cursor,
+            sort=sort,
+            descending=order == "desc",
+            filters={"email": email},
+            with_total=with_total,
+        )
+    except InvalidPageQueryError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return Page[BusinessResponse](
+        items=[BusinessResponse.model_validate(business) for business in page.items],
+        next_cursor=page.next_cursor,
+        total=page.total,
+    )
@@ -0,0 +1,53 @@
+from datetime import date
+from typing import Annotated, Literal, Optional
+
+from fastapi import APIRouter, Security
+from fastapi.responses import StreamingResponse
+
+from backend.crud.payment import payment_crud
+from backend.crud.reservation import reservation_crud
+from backend.services.auth import get_current_user_email
+from backend.services.export import EXPORT_FORMATS, stream_export
+
+router = APIRouter(prefix="/export")
+
+
+def _export_response(query, name: str, export_format: str) -> StreamingResponse:
+    filename = f"{name}-{date.today().isoformat()}.{export_format}"
+    return StreamingResponse(
+        stream_export(query, export_format),
+        media_type=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/exhibitors")
+async def export_exhibitors(user_email: Annotated[
+        str, Security(get_current_user_email, scopes=["admin"])
+    ], fair_name: Optional[str] = None,
+    format: Literal["ndjson", "csv"] = "ndjson"):
+    """
+    Stream every reservation with its fair, place, business and payment for accounting.
+    Args:
+        fair_name (str, optional): Only export reservations of this fair.
+        format (str): Either ndjson or csv.
+    Returns:
+        StreamingResponse: The export as an attachment, one record per reservation.
+    """
+    return _export_response(
+        reservation_crud.exhibitors_export_query(fair_name=fair_name), "exhibitors", format
+    )
+
+
+@router.get("/payments")
+async def export_payments(user_email: Annotated[
+        str, Security(get_current_user_email, scopes=["admin"])
+    ], format: Literal["ndjson", "csv"] = "ndjson"):
+    """
+    Stream every payment with its reservation, business and fair for accounting.
+    Args:
+        format (str): Either ndjson or csv.
+    Returns:
+        StreamingResponse: The export as an attachment, one record per payment.
+    """
+    return _export_response(payment_crud.export_query(), "payments", format)
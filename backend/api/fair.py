@@ -1,18 +1,67 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Security
+import asyncio
+import base64
+import hashlib
+import json
+import uuid
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Response, status, Security
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 from loguru import logger
-from typing import Annotated
-from backend.db.session import get_db
+from typing import Annotated, Literal, Optional
+from backend.core.config import settings
+from backend.db.session import AsyncSessionLocal, get_db
 from backend.services.auth import get_current_user_email
 from backend.crud.fair import fair_crud
-from backend.crud.business import business_crud
 from backend.schemas.fair import FairCreate, FairResponse
+from backend.schemas.page import Page
 from backend.schemas.business import BusinessResponse
 from backend.crud.payment import payment_crud
 from backend.schemas.payment import PaymentResponse
-from backend.schemas.place import PlaceResponse
+from backend.schemas.place import PlaceAvailabilityResponse, PlaceResponse, PlaceTileResponse
+from backend.services.cache import availability_cache, exhibitors_cache, tile_cache
+from backend.services.events import place_events
+from backend.utils.geo import tile_bounds
+from backend.utils.pagination import (
+    InvalidCursorError,
+    InvalidPageQueryError,
+    decode_cursor,
+    encode_cursor,
+)
 router = APIRouter()
 
+EXHIBITORS_CACHE_KEY = "active"
+_business_list_adapter = TypeAdapter(list[BusinessResponse])
+MAX_TILE_ZOOM = 22
+
+
+def _encode_bitset(flags: list[bool]) -> str:
+    """
+    Pack flags into a base64 bitset, most significant bit of each byte first.
+    """
+    bitset = bytearray((len(flags) + 7) // 8)
+    for index, flag in enumerate(flags):
+        if flag:
+            bitset[index // 8] |= 0x80 >> (index % 8)
+    return base64.b64encode(bytes(bitset)).decode()
+
+
+def _etag_entry(payload: bytes) -> tuple[str, bytes]:
+    return f'"{hashlib.sha1(payload).hexdigest()}"', payload
+
+
+def _conditional_response(request: Request, cached: tuple[str, bytes]) -> Response:
+    """
+    Serve a cached (ETag, payload) entry, answering with 304 when the client already has it.
+    """
+    etag, payload = cached
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=payload, media_type="application/json", headers=headers)
+
 
 @router.post(
     "/create_fair", response_model=FairResponse, status_code=status.HTTP_201_CREATED
@@ -102,30 +151,306 @@ async def get_all_fairs(db: AsyncSession = Depends(get_db)) -> list[FairResponse
     fairs = await fair_crud.get_all_active_fairs(db=db)
     return [FairResponse.model_validate(fair) for fair in fairs]
 
+@router.get("/fairs", response_model=Page[FairResponse], status_code=status.HTTP_200_OK)
+async def list_fairs(
+    cursor: Optional[str] = None,
+    limit: Annotated[int, Query(ge=1, le=200)] = 50,
+    sort: Optional[str] = None,
+    order: Literal["asc", "desc"] = "asc",
+    name: Optional[str] = None,
+    with_total: bool = False,
+    db: AsyncSession = Depends(get_db),
+) -> Page[FairResponse]:
+    """
+    Retrieve fairs one page at a time.
+    Args:
+        cursor (str, optional): next_cursor of the previous page.
+        limit (int): Maximum number of fairs per page.
+        sort (str, optional): One of created_at, name, start_day, end_day. Defaults to created_at.
+        order (str): Sort direction, asc or desc.
+        name (str, optional): Only return the fair with this name.
+        with_total (bool): Whether to include an estimate of the number of matching fairs.
+        db (AsyncSession): The database session.
+    Returns:
+        Page[FairResponse]: One page of fairs.
+    Raises:
+        HTTPException: If the sort field or the cursor is invalid (HTTP 400).
+    """
+    try:
+        page = await fair_crud.get_page(
+            db=db,
+            limit=limit,
+            cursor=cursor,
+            sort=sort,
+            descending=order == "desc",
+            filters={"name": name},
+            with_total=with_total,
+        )
+    except InvalidPageQueryError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return Page[FairResponse](
+        items=[FairResponse.model_validate(fair) for fair in page.items],
+        next_cursor=page.next_cursor,
+        total=page.total,
+    )
+
+
 @router.get("/info", response_model=list[BusinessResponse])
 async def get_all_info(db: AsyncSession = Depends(get_db)):
-    fairs = await fair_crud.get_all_active_fairs(db=db)
-    if not fairs:
-        raise HTTPException(status_code=404, detail="active fair was not found")
+    """
+    Retrieve the businesses with a reservation on any active fair.
+    The serialized payload is cached and dropped whenever reservations, businesses or fairs change.
+    Args:
+        db (AsyncSession): The database session.
+    Returns:
+        Response: JSON list of businesses, one entry per reservation.
+    Raises:
+        HTTPException: If there is no active fair (HTTP 404).
+    """
+    payload = exhibitors_cache.get(EXHIBITORS_CACHE_KEY)
+    if payload is None:
+        exhibitors = await fair_crud.get_active_exhibitors(db=db)
+        if exhibitors is None:
+            raise HTTPException(status_code=404, detail="active fair was not found")
 
-    all_business = []
-    for fair in list(fairs):
-        for reservation in list(fair.reservations):
-            all_business.append(( await business_crud.get_by_id(db=db, obj_id=reservation.business_id)))
+        payload = _business_list_adapter.dump_json(
+            [BusinessResponse.model_validate(row) for row in exhibitors]
+        )
+        exhibitors_cache.set(EXHIBITORS_CACHE_KEY, payload)
 
-    return all_business
+    return Response(content=payload, media_type="application/json")
 
 @router.get("/all_payments", response_model=list[PaymentResponse])
 async def get_payments(user_email: Annotated[
         str, Security(get_current_user_email)
-    ], db: AsyncSession = Depends(get_db)):
-    b = await business_crud.get_by_email(db=db, email=user_email)
-    paymnet = []
-    for reservation in b.reservations:
-        paymnet.append(await payment_crud.get_by_id(db=db, obj_id=reservation.payment_id))
+    ], response: Response, cursor: Optional[str] = None,
+    limit: Annotated[int, Query(ge=1, le=200)] = 50,
+    db: AsyncSession = Depends(get_db)):
+    """
+    Retrieve the payments of the current business, oldest first, one page at a time.
+    Args:
+        cursor (str, optional): Cursor from the X-Next-Cursor header of the previous page.
+        limit (int): Maximum number of payments per page.
+        db (AsyncSession): The database session.
+    Returns:
+        list[PaymentResponse]: One page of payments. The X-Next-Cursor header is set when more pages exist.
+    Raises:
+        HTTPException: If the cursor is malformed (HTTP 400).
+    """
+    after = None
+    if cursor:
+        try:
+            created_at, payment_id = decode_cursor(cursor)
+            if not isinstance(created_at, datetime) or not isinstance(payment_id, uuid.UUID):
+                raise InvalidCursorError("unexpected cursor values")
+            after = (created_at, payment_id)
+        except (InvalidCursorError, ValueError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="invalid cursor")
 
-    return paymnet
+    rows = await payment_crud.get_by_business(
+        db=db, email=user_email, limit=limit + 1, after=after
+    )
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1].Payment
+        response.headers["X-Next-Cursor"] = encode_cursor((last.created_at, last.id))
+
+    return [
+        PaymentResponse(
+            id=row.Payment.id,
+            created_at=row.Payment.created_at,
+            reservation_id=row.reservation_id,
+            payment_status=row.Payment.payment_status,
+            payment_stripe_id=row.Payment.payment_stripe_id,
+        )
+        for row in rows
+    ]
+
+@router.get("/payments", response_model=Page[PaymentResponse])
+async def list_payments(user_email: Annotated[
+        str, Security(get_current_user_email, scopes=["admin"])
+    ], cursor: Optional[str] = None,
+    limit: Annotated[int, Query(ge=1, le=200)] = 50,
+    order: Literal["asc", "desc"] = "asc",
+    payment_status: Optional[str] = None,
+    with_total: bool = False,
+    db: AsyncSession = Depends(get_db)) -> Page[PaymentResponse]:
+    """
+    Retrieve the payments of all businesses, ordered by creation time, one page at a time.
+    Args:
+        cursor (str, optional): next_cursor of the previous page.
+        limit (int): Maximum number of payments per page.
+        order (str): Sort direction, asc or desc.
+        payment_status (str, optional): Only return payments with this status.
+        with_total (bool): Whether to include an estimate of the number of matching payments.
+        db (AsyncSession): The database session.
+    Returns:
+        Page[PaymentResponse]: One page of payments.
+    Raises:
+        HTTPException: If the cursor is invalid (HTTP 400).
+    """
+    try:
+        page = await payment_crud.get_page(
+            db=db,
+            limit=limit,
+            cursor=cursor,
+            descending=order == "desc",
+            filters={"payment_status": payment_status},
+            with_total=with_total,
+            load=payment_crud.WITH_RESERVATION,
+        )
+    except InvalidPageQueryError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return Page[PaymentResponse](
+        items=[
+            PaymentResponse(
+                id=payment.id,
+                created_at=payment.created_at,
+                reservation_id=payment.reservation.id if payment.reservation else None,
+                payment_status=payment.payment_status,
+                payment_stripe_id=payment.payment_stripe_id,
+            )
+            for payment in page.items
+        ],
+        next_cursor=page.next_cursor,
+        total=page.total,
+    )
 
 @router.post('/get_fair_places')
 async def get_places(fair_name: str, db: AsyncSession = Depends(get_db)):
-    return await fair_crud.get_places(db=db, fair_name=fair_name)
\ No newline at end of file
+    places = await fair_crud.get_places(db=db, fair_name=fair_name)
+    if places is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Fair was not found")
+    return places
+
+
+@router.get("/fair_availability", response_model=PlaceAvailabilityResponse)
+async def get_fair_availability(fair_name: str, request: Request, db: AsyncSession = Depends(get_db)):
+    """
+    Retrieve the availability of every place of a fair in one compact payload.
+    The payload is cached per fair and served with an ETag, so unchanged snapshots cost a 304.
+    Args:
+        fair_name (str): The name of the fair.
+        db (AsyncSession): The database session.
+    Returns:
+        Response: PlaceAvailabilityResponse as JSON.
+    Raises:
+        HTTPException: If the fair was not found (HTTP 404).
+    """
+    cached = availability_cache.get(fair_name)
+    if cached is None:
+        availability = await fair_crud.get_place_availability(db=db, fair_name=fair_name)
+        if availability is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Fair was not found")
+
+        fair_id, places = availability
+        payload = PlaceAvailabilityResponse(
+            fair_id=fair_id,
+            ids=[place.id for place in places],
+            cordinates=[place.place_cordinates for place in places],
+            zones=[place.place_zona for place in places],
+            reserved=_encode_bitset([place.reserved for place in places]),
+        ).model_dump_json().encode()
+        cached = _etag_entry(payload)
+        availability_cache.set(fair_name, cached)
+
+    return _conditional_response(request, cached)
+
+
+@router.get("/fair_tiles/{z}/{x}/{y}", response_model=PlaceTileResponse)
+async def get_fair_tile(
+    z: Annotated[int, Path(ge=0, le=MAX_TILE_ZOOM)],
+    x: Annotated[int, Path(ge=0)],
+    y: Annotated[int, Path(ge=0)],
+    fair_name: str,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Retrieve the places of a fair inside one XYZ map tile with their availability.
+    Tiles are cached per fair and served with an ETag. The cache is dropped whenever a place
+    of any fair changes, so the map only refetches tiles whose content actually changed.
+    Args:
+        z (int): Zoom level of the tile.
+        x (int): Column of the tile.
+        y (int): Row of the tile.
+        fair_name (str): The name of the fair.
+        db (AsyncSession): The database session.
+    Returns:
+        Response: PlaceTileResponse as JSON.
+    Raises:
+        HTTPException: If the tile is outside the zoom level (HTTP 400).
+        HTTPException: If the fair was not found (HTTP 404).
+    """
+    if x >= 2 ** z or y >= 2 ** z:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Tile is out of range")
+
+    key = (fair_name, z, x, y)
+    cached = tile_cache.get(key)
+    if cached is None:
+        availability = await fair_crud.get_place_availability(
+            db=db, fair_name=fair_name, bounds=tile_bounds(z, x, y)
+        )
+        if availability is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Fair was not found")
+
+        fair_id, places = availability
+        payload = PlaceTileResponse(
+            fair_id=fair_id,
+            z=z,
+            x=x,
+            y=y,
+            ids=[place.id for place in places],
+            lat=[place.place_lat for place in places],
+            lng=[place.place_lng for place in places],
+            zones=[place.place_zona for place in places],
+            reserved=_encode_bitset([place.reserved for place in places]),
+        ).model_dump_json().encode()
+        cached = _etag_entry(payload)
+        tile_cache.set(key, cached)
+
+    return _conditional_response(request, cached)
+
+
+@router.get("/fair_events")
+async def fair_events(fair_name: str):
+    """
+    Stream reservation changes of the places of a fair as Server-Sent Events.
+    A "place" event carries the changed place ids and their new reserved state, a "resync" event asks
+    the client to reload /fair_availability because events may have been missed.
+    Args:
+        fair_name (str): The name of the fair.
+    Returns:
+        StreamingResponse: The text/event-stream of the fair.
+    Raises:
+        HTTPException: If the fair was not found (HTTP 404).
+    """
+    # Not using get_db, the session would keep its connection for the lifetime of the stream
+    async with AsyncSessionLocal() as db:
+        fair_id = await fair_crud.get_id_by_name(db=db, name=fair_name)
+    if fair_id is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Fair was not found")
+
+    async def stream():
+        queue = place_events.subscribe(fair_id)
+        try:
+            yield f"retry: {int(settings.events_reconnect_seconds * 1000)}\n\n"
+            while True:
+                try:
+                    message = await asyncio.wait_for(
+                        queue.get(), timeout=settings.events_heartbeat_seconds
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {message['event']}\ndata: {json.dumps(message['data'])}\n\n"
+        finally:
+            place_events.unsubscribe(fair_id, queue)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
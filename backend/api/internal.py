@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Depends, Security, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Annotated
+
+from backend.core.config import settings
+from backend.crud.outbox import outbox_crud
+from backend.db.session import get_db, get_pool_stats
+from backend.services.auth import get_current_user_email
+from backend.services.scheduler import scheduler
+
+router = APIRouter(prefix="/internal")
+
+
+@router.get("/pool", status_code=status.HTTP_200_OK)
+async def pool_stats(user_email: Annotated[
+        str, Security(get_current_user_email, scopes=["admin"])
+    ]):
+    """
+    Return live database connection pool statistics.
+    Returns:
+        dict: Pool limits from settings together with checked-out connections,
+        waiters, timeouts, connection errors and the acquire wait-time histogram.
+    """
+    return {
+        "limits": {
+            "pool_size": settings.db_pool_size,
+            "max_overflow": settings.db_pool_max_overflow,
+            "timeout_seconds": settings.db_pool_timeout_seconds,
+            "recycle_seconds": settings.db_pool_recycle_seconds,
+        },
+        "pool": get_pool_stats(),
+    }
+
+
+@router.get("/scheduler", status_code=status.HTTP_200_OK)
+async def scheduler_stats(user_email: Annotated[
+        str, Security(get_current_user_email, scopes=["admin"])
+    ]):
+    """
+    Return run metrics of the background scheduler jobs on this worker.
+    Returns:
+        dict: Per-job runs, failures, runs skipped because another worker ran them this interval and timings.
+    """
+    return scheduler.stats()
+
+
+@router.get("/outbox", status_code=status.HTTP_200_OK)
+async def outbox_stats(user_email: Annotated[
+        str, Security(get_current_user_email, scopes=["admin"])
+    ], db: AsyncSession = Depends(get_db)):
+    """
+    Return the state of the transactional outbox.
+    Returns:
+        dict: Pending and dead message counts and when the oldest pending message became due.
+    """
+    return await outbox_crud.stats(db=db)
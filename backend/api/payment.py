@@ -1,36 +1,108 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Security
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status, Security
 from sqlalchemy.ext.asyncio import AsyncSession
 from loguru import logger
-import stripe
 from typing import Annotated
 from backend.db.session import get_db
 from backend.services.auth import get_current_user_email
-from backend.crud.fair import fair_crud
-from backend.core.config import settings
-from backend.schemas.payment import PaymentCreate, PaymentResponse
-from backend.services.auth import get_current_user_email
-from backend.crud.payment import payment_crud
-
-stripe.api_key = settings.stripe_api_key
+from backend.crud.business import business_crud
+from backend.schemas.payment import PaymentCreate
+from backend.crud.payment import OPEN_PAYMENT_STATUSES, payment_crud
+from backend.crud.payment_event import payment_event_crud
+from backend.services.payment_gateway import (
+    InvalidWebhookError,
+    PaymentDeclinedError,
+    PaymentGatewayError,
+    checkout_payment_event,
+    get_payment_gateway,
+    parse_webhook,
+    reservation_idempotency_key,
+)
 
 router = APIRouter()
 
 @router.post("/pay")
-async def process_payment(amount: int, currency: str, token: str, user_email: Annotated[
+async def process_payment(amount: Annotated[int, Query(gt=0)],
+        currency: Annotated[str, Query(min_length=3, max_length=3)], token: str, user_email: Annotated[
         str, Security(get_current_user_email)], db: AsyncSession = Depends(get_db)):
+    """
+    Charge the card of the current business for its latest reservation.
+    The charge uses an idempotency key derived from the reservation and the card, so repeating
+    the request never charges the reservation twice, while another card can be tried after a
+    decline. The payment is recorded as pending, its status is confirmed by the payment event
+    job from the charge result and Stripe webhooks. A failed or refunded payment is replaced.
+    Args:
+        amount (int): Amount in the smallest currency unit.
+        currency (str): Three-letter ISO currency code.
+        token (str): Card token created by Stripe.js.
+        db (AsyncSession): The database session.
+    Returns:
+        dict: The status of the payment and the charge id, or an error message.
+    Raises:
+        HTTPException: If the business has no reservation (HTTP 404).
+        HTTPException: If the reservation has a pending or successful payment (HTTP 409).
+    """
+    # The reservation stays locked until the payment is recorded, so concurrent requests wait
+    # for it and see the payment, and the hold sweep cannot delete it while the card is charged
+    reservation = await business_crud.get_latest_reservation(db=db, email=user_email, for_update=True)
+    if not reservation:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="reservation was not found")
+    previous = None
+    if reservation.payment_id is not None:
+        previous = await payment_crud.get_by_id(db=db, obj_id=reservation.payment_id)
+        if previous.payment_status in OPEN_PAYMENT_STATUSES:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="reservation is already paid")
+
     try:
-        # charge = stripe.Charge.create(
-        #     amount=amount,
-        #     currency=currency,
-        #     source=token,
-        #     description="Payment for place on fair",
-        # )
+        charge = await get_payment_gateway().charge(
+            amount=amount,
+            currency=currency.lower(),
+            source=token,
+            description="Payment for place on fair",
+            idempotency_key=reservation_idempotency_key(
+                reservation.id, token, replaces=previous.id if previous else None
+            ),
+        )
+    except PaymentDeclinedError as e:
+        await db.rollback()
+        return {"status": "error", "message": str(e)}
+    except PaymentGatewayError as e:
+        await db.rollback()
+        logger.error(f"Payment for reservation {reservation.id} failed: {e}")
+        return {"status": "error", "message": "Something went wrong. Please try again later."}
 
-        await payment_crud.create_payment(db=db, payment_in=PaymentCreate(payment_status="success", payment_stripe_id=1), user_email=user_email)
+    await payment_crud.create_payment(
+        db=db,
+        payment_in=PaymentCreate(payment_status="pending", payment_stripe_id=charge.charge_id),
+        reservation=reservation,
+        event_in=checkout_payment_event(charge),
+    )
+    return {"status": "success", "charge_id": charge.charge_id}
 
-        return {"status": "success", "charge_id": "charge.id"}
 
-    except stripe.error.CardError as e:
-        return {"status": "error", "message": str(e)}
-    except stripe.error.StripeError as e:
-        return {"status": "error", "message": "Something went wrong. Please try again later."}
+@router.post("/stripe_webhook", status_code=status.HTTP_200_OK)
+async def stripe_webhook(request: Request, stripe_signature: Annotated[str, Header()] = "",
+        db: AsyncSession = Depends(get_db)):
+    """
+    Receive a Stripe webhook and queue the payment status change it carries.
+    The request only stores the event, deduplicated by its id, so bursts and redeliveries
+    are acknowledged quickly. Payments are updated in batches by the payment event job.
+    Args:
+        request (Request): The webhook request, its raw body is verified against the signature.
+        stripe_signature (str): The Stripe-Signature header.
+        db (AsyncSession): The database session.
+    Returns:
+        dict: Whether the event was queued and whether it had been received before.
+    Raises:
+        HTTPException: If the request is not a valid signed Stripe event (HTTP 400).
+    """
+    try:
+        event_in = parse_webhook(await request.body(), stripe_signature)
+    except InvalidWebhookError as e:
+        logger.warning(f"Rejected Stripe webhook: {e}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="invalid webhook")
+
+    if event_in is None:
+        return {"received": True, "queued": False, "duplicate": False}
+    queued = await payment_event_crud.enqueue(db=db, event_in=event_in)
+    await db.commit()
+    return {"received": True, "queued": queued, "duplicate": not queued}
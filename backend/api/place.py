@@ -1,13 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Security
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Security
 from sqlalchemy.ext.asyncio import AsyncSession
 from loguru import logger
-from typing import Annotated
+from typing import Annotated, Literal, Optional
 from backend.services.auth import get_current_user_email
-from backend.schemas.place import PlaceCreate, PlaceResponse
+from backend.core.config import settings
+from backend.schemas.place import (
+    NearestPlaceResponse,
+    PlaceCreate,
+    PlaceImportReport,
+    PlaceImportRequest,
+    PlaceResponse,
+)
 from backend.crud.place import place_crud
 from backend.crud.fair import fair_crud
 from backend.db.session import get_db
 from backend.crud.reservation import reservation_crud
+from backend.schemas.page import Page
+from backend.services.place_import import import_places
+from backend.utils.geo import load_boundary, point_in_polygons
+from backend.utils.pagination import InvalidPageQueryError
 router = APIRouter()
 
 
@@ -54,6 +65,50 @@ async def create_place(place: PlaceCreate, user_email: Annotated[
     return place
 
 
+@router.post(
+    "/import_places", response_model=PlaceImportReport, status_code=status.HTTP_200_OK
+)
+async def import_places_geojson(collection: PlaceImportRequest, user_email: Annotated[
+        str, Security(get_current_user_email, scopes=["admin"])
+    ], fair_name: Optional[str] = None, db: AsyncSession = Depends(get_db)):
+    """
+    Create or update many places from a GeoJSON FeatureCollection of Point features.
+    Places are matched by coordinates, the name and zone are read from the place_name (or name)
+    and place_zona (or zona) properties. With fair_name every imported place is also added to the fair.
+    Args:
+        collection (PlaceImportRequest): The FeatureCollection to import.
+        fair_name (str, optional): Name of the fair to add the places to.
+        db (AsyncSession, optional): The database session dependency. Defaults to Depends(get_db).
+    Returns:
+        PlaceImportReport: Counts and one result per feature.
+    Raises:
+        HTTPException: If the collection has too many features (HTTP 400).
+        HTTPException: If the fair was not found (HTTP 404).
+        HTTPException: If an error occurs during the import (HTTP 500).
+    """
+
+    if len(collection.features) > settings.place_import_max_features:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.place_import_max_features} features can be imported at once.",
+        )
+
+    fair_id = None
+    if fair_name is not None:
+        fair_id = await fair_crud.get_id_by_name(db=db, name=fair_name)
+        if fair_id is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Fair was not found")
+
+    try:
+        return await import_places(db=db, collection=collection, fair_id=fair_id)
+    except Exception as e:
+        logger.error(f"Exception occurred: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Something went wrong.",
+        )
+
+
 @router.post(
     "/add_place_to_fair",
     response_model=PlaceResponse,
@@ -132,3 +187,167 @@ async def place_reservated(place_cordinated: str, fair_name: str, db: AsyncSessi
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Fair or place was not found")
     return result
 
+
+@router.get("/places", response_model=Page[PlaceResponse], status_code=status.HTTP_200_OK)
+async def list_places(
+    cursor: Optional[str] = None,
+    limit: Annotated[int, Query(ge=1, le=200)] = 50,
+    sort: Optional[str] = None,
+    order: Literal["asc", "desc"] = "asc",
+    place_zona: Optional[int] = None,
+    place_reservated: Optional[bool] = None,
+    with_total: bool = False,
+    db: AsyncSession = Depends(get_db),
+) -> Page[PlaceResponse]:
+    """
+    Retrieve places one page at a time.
+    Args:
+        cursor (str, optional): next_cursor of the previous page.
+        limit (int): Maximum number of places per page.
+        sort (str, optional): One of created_at, place_name. Defaults to created_at.
+        order (str): Sort direction, asc or desc.
+        place_zona (int, optional): Only return places of this zone.
+        place_reservated (bool, optional): Only return places with this reservation flag.
+        with_total (bool): Whether to include an estimate of the number of matching places.
+        db (AsyncSession): The database session.
+    Returns:
+        Page[PlaceResponse]: One page of places.
+    Raises:
+        HTTPException: If the sort field or the cursor is invalid (HTTP 400).
+    """
+    try:
+        page = await place_crud.get_page(
+            db=db,
+            limit=limit,
+            cursor=cursor,
+            sort=sort,
+            descending=order == "desc",
+            filters={"place_zona": place_zona, "place_reservated": place_reservated},
+            with_total=with_total,
+        )
+    except InvalidPageQueryError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return Page[PlaceResponse](
+        items=[PlaceResponse.model_validate(place) for place in page.items],
+        next_cursor=page.next_cursor,
+        total=page.total,
+    )
+
+
+@router.get("/places_in_bbox", response_model=list[PlaceResponse], status_code=status.HTTP_200_OK)
+async def places_in_bbox(
+    min_lat: Annotated[float, Query(ge=-90, le=90)],
+    min_lng: Annotated[float, Query(ge=-180, le=180)],
+    max_lat: Annotated[float, Query(ge=-90, le=90)],
+    max_lng: Annotated[float, Query(ge=-180, le=180)],
+    fair_name: Optional[str] = None,
+    limit: Annotated[int, Query(ge=1, le=5000)] = 1000,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Retrieve the places inside a latitude/longitude box, e.g. the visible part of the map.
+    Args:
+        min_lat (float): Southern edge of the box.
+        min_lng (float): Western edge of the box.
+        max_lat (float): Northern edge of the box.
+        max_lng (float): Eastern edge of the box.
+        fair_name (str, optional): Only return places assigned to this fair.
+        limit (int): Maximum number of places to return.
+        db (AsyncSession, optional): The database session dependency. Defaults to Depends(get_db).
+    Returns:
+        list[PlaceResponse]: Places inside the box.
+    Raises:
+        HTTPException: If the box is empty (HTTP 400).
+        HTTPException: If the fair was not found (HTTP 404).
+    """
+
+    if min_lat > max_lat or min_lng > max_lng:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Minimum coordinates must not exceed maximum coordinates.",
+        )
+
+    fair_id = None
+    if fair_name is not None:
+        fair_id = await fair_crud.get_id_by_name(db=db, name=fair_name)
+        if fair_id is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Fair was not found")
+
+    return await place_crud.get_in_bbox(
+        db=db,
+        min_lat=min_lat,
+        min_lng=min_lng,
+        max_lat=max_lat,
+        max_lng=max_lng,
+        limit=limit,
+        fair_id=fair_id,
+    )
+
+
+@router.get("/nearest_free_place", response_model=NearestPlaceResponse, status_code=status.HTTP_200_OK)
+async def nearest_free_place(
+    lat: Annotated[float, Query(ge=-90, le=90)],
+    lng: Annotated[float, Query(ge=-180, le=180)],
+    fair_name: str,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Find the place of a fair without a reservation that is closest to a position.
+    Args:
+        lat (float): Latitude of the position.
+        lng (float): Longitude of the position.
+        fair_name (str): The name of the fair.
+        db (AsyncSession, optional): The database session dependency. Defaults to Depends(get_db).
+    Returns:
+        NearestPlaceResponse: The place and its distance from the position.
+    Raises:
+        HTTPException: If the fair was not found or has no free place (HTTP 404).
+    """
+
+    fair_id = await fair_crud.get_id_by_name(db=db, name=fair_name)
+    if fair_id is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Fair was not found")
+
+    nearest = await place_crud.get_nearest_free(db=db, lat=lat, lng=lng, fair_id=fair_id)
+    if nearest is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No free place was found")
+
+    place, distance = nearest
+    return NearestPlaceResponse(
+        **PlaceResponse.model_validate(place).model_dump(), distance_m=distance
+    )
+
+
+@router.get("/place_in_city", response_model=bool, status_code=status.HTTP_200_OK)
+async def place_in_city(place_cordinates: str, db: AsyncSession = Depends(get_db)):
+    """
+    Check whether a place lies inside the city boundary polygon.
+    Args:
+        place_cordinates (str): The coordinates of the place.
+        db (AsyncSession, optional): The database session dependency. Defaults to Depends(get_db).
+    Returns:
+        bool: True if the place is inside the boundary.
+    Raises:
+        HTTPException: If the place has no valid coordinates (HTTP 400).
+        HTTPException: If the place was not found (HTTP 404).
+        HTTPException: If the city boundary cannot be loaded (HTTP 503).
+    """
+
+    place = await place_crud.get_place_by_cordinates(db=db, place_cordinates=place_cordinates)
+    if not place:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Place was not found")
+    if place.place_lat is None or place.place_lng is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Place has no valid coordinates"
+        )
+
+    try:
+        boundary = load_boundary(settings.city_boundary_path)
+    except (OSError, ValueError) as e:
+        logger.error(f"City boundary could not be loaded: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="City boundary is not available",
+        )
+    return point_in_polygons(place.place_lat, place.place_lng, boundary)
@@ -1,23 +1,49 @@
-import io
-import qrcode
-from typing import Annotated
+from typing import Annotated, Literal
 from backend.services.auth import get_current_user_email
-from fastapi import APIRouter, Security, Depends, HTTPException
-from starlette.responses import StreamingResponse
+from backend.services.checkin import CheckinClaims, CheckinKeyError, checkin_token_expiry, issue_checkin_token
+from backend.services.qr import QR_FORMATS, qr_image
+from fastapi import APIRouter, Security, Depends, HTTPException, Query, Request, Response, status
 from backend.crud.business import business_crud
 from backend.db.session import AsyncSession, get_db
+from loguru import logger
 router = APIRouter()
 
 @router.get("/generate_qr_code")
-async def generate(user_email: Annotated[
+async def generate(request: Request, user_email: Annotated[
         str, Security(get_current_user_email)
-    ], db: AsyncSession = Depends(get_db)):
-    reservation_id = await business_crud.get_reservation_id(db=db, email=user_email)
-    if not reservation_id:
-        raise HTTPException(status_code=404, detail="reservation was not found")
-    message = "0.0.0.0/get_reservation/" + str(reservation_id)
-    img = qrcode.make(message)
-    buf = io.BytesIO()
-    img.save(buf)
-    buf.seek(0) # important here!
-    return StreamingResponse(buf, media_type="image/jpeg")
+    ], image_format: Annotated[Literal["png", "svg"], Query(alias="format")] = "png", db: AsyncSession = Depends(get_db)):
+    """
+    Return the QR code of the current business's latest paid reservation.
+    The code carries a signed check-in token of the reservation, its fair and place, valid until
+    shortly after the fair ends, so gates can verify it offline.
+    Rendered images are cached per reservation and served with an ETag, so repeated
+    downloads are answered from memory or with 304.
+    Args:
+        image_format (str): "png" or "svg", SVG is smaller and faster to render.
+        db (AsyncSession): The database session.
+    Returns:
+        Response: The QR code image.
+    Raises:
+        HTTPException: If the business has no reservation with a successful payment (HTTP 404).
+        HTTPException: If no check-in signing key is configured (HTTP 503).
+    """
+    reservation = await business_crud.get_checkin_reservation(db=db, email=user_email)
+    if not reservation:
+        raise HTTPException(status_code=404, detail="paid reservation was not found")
+
+    try:
+        token = issue_checkin_token(CheckinClaims(
+            reservation_id=reservation.id,
+            fair_id=reservation.fair_id,
+            place_id=reservation.place_id,
+            expires_at=checkin_token_expiry(reservation.end_day),
+        ))
+    except CheckinKeyError as e:
+        logger.error(f"Check-in tokens cannot be issued: {e}")
+        raise HTTPException(status_code=503, detail="QR codes are not available right now.")
+    etag, image = await qr_image(reservation.id, token, image_format)
+    # The ETag belongs to the user's current reservation, so it must not be shared
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Authorization"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=image, media_type=QR_FORMATS[image_format], headers=headers)
@@ -1,17 +1,31 @@
 import uuid
+from datetime import datetime, timedelta, timezone
 
 from fastapi import APIRouter, Depends, HTTPException, status, Security
 from sqlalchemy.ext.asyncio import AsyncSession
 from loguru import logger
 from typing import Annotated
 
+from backend.core.config import settings
 from backend.db.session import get_db
-from backend.crud.reservation import reservation_crud
+from backend.crud.reservation import CLAIM_NOT_FOUND, CLAIM_TAKEN, reservation_crud
 from backend.crud.fair import fair_crud
 from backend.crud.place import place_crud
 from backend.crud.business import business_crud
-from backend.schemas.reservation import ReservationCreate, ReservationResponse
+from backend.schemas.reservation import (
+    CheckInReport,
+    CheckInRequest,
+    CheckInResult,
+    ReservationCreate,
+    ReservationResponse,
+)
 from backend.services.auth import get_current_user_email
+from backend.services.checkin import (
+    CheckinKeyError,
+    ExpiredCheckinTokenError,
+    InvalidCheckinTokenError,
+    verify_checkin_token,
+)
 
 router = APIRouter()
 
@@ -26,21 +40,20 @@ async def create_reservation(
 ) -> ReservationResponse:
     """
     Create a new reservation for a place.
+    Raises:
+        HTTPException: If the place is already reserved on the fair (HTTP 226).
+        HTTPException: If the fair or the place was not found (HTTP 404).
     """
 
-    if await reservation_crud.is_place_reserved(db=db, place_cordinates=place_cordinates, fair_name=fair_name):
-        raise HTTPException(status_code=status.HTTP_226_IM_USED, detail="Place already was registred")
+    claim = await reservation_crud.create_reservation(db=db, business=business_email, place=place_cordinates, fair=fair_name)
 
-    reservation = await reservation_crud.create_reservation(db=db, business=business_email, place=place_cordinates, fair=fair_name)
-
-    if not reservation:
-        logger.error(f"Exception occurred while making reservation")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Something went wrong.",
-        )
+    if claim.status == CLAIM_TAKEN:
+        raise HTTPException(status_code=status.HTTP_226_IM_USED, detail="Place already was registred")
+    if claim.status == CLAIM_NOT_FOUND:
+        logger.error(f"Reservation failed: fair {fair_name} or place {place_cordinates} was not found")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Fair or place was not found")
 
-    return reservation
+    return claim.reservation
 
 
 @router.delete("/delete_reservation_by_id", status_code=status.HTTP_204_NO_CONTENT)
@@ -60,20 +73,26 @@ async def delete_reservation_id(reservation_id: uuid.UUID, business_email: Annot
         )
     return
 
-@router.delete("/delete_unpaid_reservations", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete("/delete_unpaid_reservations", status_code=status.HTTP_200_OK)
 async def expired_payment_delete_reservatoin(db: AsyncSession = Depends(get_db)):
     """
-    Delete a reservation with expired payment.
+    Delete reservations with expired payment.
+    Returns:
+        dict: Number of deleted reservations.
     """
-    await reservation_crud.expired_payment_delete_reservatoin(db=db)
+    deleted = await reservation_crud.expired_payment_delete_reservatoin(db=db)
+    logger.info(f"Deleted {deleted} unpaid reservations")
+    return {"deleted": deleted}
 
 @router.delete("/delete_reservation", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_reservation(business_email: Annotated[
         str, Security(get_current_user_email)
     ], db: AsyncSession = Depends(get_db)):
+    reservation_id = await business_crud.get_reservation_id(db=db, email=business_email)
+    if not reservation_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="reservation was not found")
     try:
-        b = await business_crud.get_by_email(db=db, email=business_email)
-        await delete_reservation_id(reservation_id=b.reservations[-1].id, business_email=business_email, db=db)
+        await reservation_crud.delete_reservation(db=db, reservation_id=reservation_id)
     except Exception as e:
         logger.error(f"Exception occurred: {e}")
         raise HTTPException(
@@ -91,4 +110,88 @@ async def get_reservation(id: uuid.UUID, user_email: Annotated[
     if not reservation:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="reservation was not found")
 
-    return reservation
\ No newline at end of file
+    return reservation
+
+@router.post("/check_in", response_model=CheckInReport, status_code=status.HTTP_200_OK)
+async def check_in(scans_in: CheckInRequest, user_email: Annotated[
+        str, Security(get_current_user_email, scopes=["admin"])
+    ], db: AsyncSession = Depends(get_db)) -> CheckInReport:
+    """
+    Record a batch of gate scans of reservation QR codes.
+    Tokens are verified locally without touching the database, the valid ones are then
+    checked in with one UPDATE. Only paid reservations are checked in, a reservation keeps the
+    time of its first check-in.
+    Scans are checked against their scan time, which may not lie more than
+    settings.checkin_max_scan_age_hours in the past, so an old scan time cannot revive an expired token.
+    Args:
+        scans_in (CheckInRequest): The scans, at most settings.checkin_max_scans.
+        db (AsyncSession): The database session.
+    Returns:
+        CheckInReport: The outcome of every scan, in request order.
+    Raises:
+        HTTPException: If the batch is too large (HTTP 400).
+        HTTPException: If no check-in key is configured (HTTP 503).
+    """
+    if len(scans_in.scans) > settings.checkin_max_scans:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.checkin_max_scans} scans can be recorded at once.",
+        )
+
+    now = datetime.utcnow()
+    oldest = now - timedelta(hours=settings.checkin_max_scan_age_hours)
+    results = []
+    scans = {}
+    for scan in scans_in.scans:
+        scanned_at = scan.scanned_at
+        if scanned_at is None:
+            scanned_at = now
+        elif scanned_at.tzinfo is not None:
+            scanned_at = scanned_at.astimezone(timezone.utc).replace(tzinfo=None)
+        # Device clocks may run ahead, a check-in is never recorded in the future
+        scanned_at = min(scanned_at, now)
+        if scanned_at < oldest:
+            results.append(CheckInResult(token=scan.token, status="stale"))
+            continue
+
+        try:
+            claims = verify_checkin_token(scan.token, now=scanned_at)
+        except CheckinKeyError as e:
+            logger.error(f"Check-in tokens cannot be verified: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Check-in is not configured."
+            )
+        except ExpiredCheckinTokenError:
+            results.append(CheckInResult(token=scan.token, status="expired"))
+            continue
+        except InvalidCheckinTokenError:
+            results.append(CheckInResult(token=scan.token, status="invalid"))
+            continue
+
+        results.append(CheckInResult(
+            token=scan.token,
+            status="not_found",
+            reservation_id=claims.reservation_id,
+            fair_id=claims.fair_id,
+            place_id=claims.place_id,
+        ))
+        previous = scans.get(claims.reservation_id)
+        scans[claims.reservation_id] = scanned_at if previous is None else min(previous, scanned_at)
+
+    outcome = await reservation_crud.check_in(db=db, scans=scans)
+
+    reported = set()
+    for result in results:
+        reservation_id = result.reservation_id
+        if reservation_id in outcome.checked_in:
+            # Repeated scans of the same code in one batch check it in once
+            result.status = "already_checked_in" if reservation_id in reported else "checked_in"
+            result.checked_in_at = outcome.checked_in[reservation_id]
+            reported.add(reservation_id)
+        elif reservation_id in outcome.already_checked_in:
+            result.status = "already_checked_in"
+            result.checked_in_at = outcome.already_checked_in[reservation_id]
+        elif reservation_id in outcome.unpaid:
+            result.status = "unpaid"
+
+    return CheckInReport(checked_in=len(outcome.checked_in), results=results)
@@ -1,9 +1,11 @@
 from pathlib import Path
 
-from pydantic import Field, computed_field
+from pydantic import Field, computed_field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from sqlalchemy import URL
 
+ROOT_DIR = Path(__file__).parent.parent.parent
+
 
 class Settings(BaseSettings):
     # Application settings
@@ -14,6 +16,23 @@ class Settings(BaseSettings):
     access_token_expire_minutes: int = 30
     refresh_token_expire_minutes: int = 1000
     algorithm: str = "HS256"
+    # Resolved token subjects are cached per worker, so changes take up to the TTL to propagate
+    principal_cache_size: int = 10000
+    principal_cache_ttl_seconds: float = 60.0
+    # Argon2 cost parameters and size of the hashing worker pool (0 means one worker per CPU)
+    argon2_time_cost: int = 3
+    argon2_memory_cost: int = 65536
+    argon2_parallelism: int = 4
+    password_hash_workers: int = 0
+    # Check-in tokens in reservation QR codes are signed with an Ed25519 key, base64 encoded raw
+    # 32-byte keys. Gate devices only hold the verify key, which is derived from the signing key
+    # when not set. Tokens expire this long after the fair's last day
+    checkin_signing_key: str = ""
+    checkin_verify_key: str = ""
+    checkin_token_grace_hours: int = 24
+    checkin_max_scans: int = 500
+    # Scans uploaded later than this after they were made are rejected
+    checkin_max_scan_age_hours: int = 24
     # Email settings
     # email_signup_confirmation_token_expire_hours: int = 1
     # mail_from: str
@@ -29,8 +48,88 @@ class Settings(BaseSettings):
     db_password: str = Field(default="password", alias="POSTGRES_PASSWORD")
     db_host: str = Field(default="localhost", alias="DB_HOST")
     db_port: int = 5432
+    db_echo: bool = False
+
+    # Connection pool settings
+    # Keep (db_pool_size + db_pool_max_overflow) * workers below postgres max_connections
+    db_pool_size: int = 10
+    db_pool_max_overflow: int = 10
+    db_pool_pre_ping: bool = True
+    db_pool_recycle_seconds: int = 1800
+    db_pool_timeout_seconds: float = 10.0
+
+    # Reservations are held for this long until a payment is attached
+    reservation_hold_minutes: int = 30
+    reservation_hold_sweep_seconds: float = 30.0
+
+    # Background scheduler
+    scheduler_enabled: bool = True
+    scheduler_jitter_seconds: float = 5.0
+    scheduler_shutdown_timeout_seconds: float = 10.0
+    unpaid_cleanup_interval_seconds: float = 3600.0
+    unpaid_reservation_expire_days: int = 5
+    reservation_cleanup_batch_size: int = 1000
+
+    # Live place change events, shared between workers through Postgres LISTEN/NOTIFY
+    events_pg_notify: bool = True
+    events_queue_size: int = 100
+    events_heartbeat_seconds: float = 15.0
+    events_reconnect_seconds: float = 5.0
+
+    # Read caches
+    exhibitors_cache_ttl_seconds: float = 30.0
+    availability_cache_size: int = 256
+    availability_cache_ttl_seconds: float = 60.0
+    tile_cache_size: int = 4096
+    tile_cache_ttl_seconds: float = 60.0
+    qr_cache_size: int = 2048
+    qr_cache_ttl_seconds: float = 86400.0
+    # QR codes are rendered in a thread pool of this size
+    qr_render_workers: int = 2
+
+    # Bulk place import, rows are upserted in multi-row statements of place_import_batch_size
+    place_import_batch_size: int = 500
+    place_import_max_features: int = 10000
+
+    # GeoJSON polygon of the city, places are checked against it
+    city_boundary_path: Path = ROOT_DIR.joinpath("frontend", "public", "revuca.geo.json")
 
+    # Prometheus /metrics endpoint and request instrumentation, values are per worker process
+    metrics_enabled: bool = True
+
+    # Admin exports are streamed from a server-side cursor in batches of this many rows
+    export_batch_size: int = 1000
+
+    # Payments go to Stripe unless "fake" is opted in, which accepts every charge in-process
+    # for development and tests
+    payment_gateway: str = "stripe"
     stripe_api_key: str
+    stripe_timeout_seconds: float = 10.0
+    stripe_max_retries: int = 3
+    stripe_retry_backoff_seconds: float = 0.5
+    payment_gateway_workers: int = 8
+    # Stripe webhooks are queued and applied to payments in batches by a scheduler job
+    stripe_webhook_secret: str = ""
+    stripe_webhook_tolerance_seconds: int = 300
+    payment_event_interval_seconds: float = 5.0
+    payment_event_batch_size: int = 500
+    payment_event_max_attempts: int = 60
+
+    # Transactional outbox, side effects are delivered at least once by a scheduler job.
+    # Failed messages are retried with exponential backoff and marked dead after the last attempt
+    outbox_dispatch_interval_seconds: float = 2.0
+    outbox_batch_size: int = 100
+    outbox_concurrency: int = 10
+    outbox_handler_timeout_seconds: float = 30.0
+    outbox_lease_seconds: float = 300.0
+    outbox_max_attempts: int = 10
+    outbox_retry_backoff_seconds: float = 5.0
+    outbox_retry_backoff_max_seconds: float = 3600.0
+    # Delivered messages are deleted after outbox_retention_days, in batches of outbox_purge_batch_size
+    outbox_retention_days: int = 7
+    outbox_purge_interval_seconds: float = 3600.0
+    outbox_purge_batch_size: int = 5000
+
     # Google authentication settings
     # google_client_id: str
     # google_client_secret: str
@@ -42,10 +141,18 @@ class Settings(BaseSettings):
     # github_redirect_url: str
 
     model_config = SettingsConfigDict(
-        env_file=Path(__file__).parent.parent.parent.joinpath(".env"),
+        env_file=ROOT_DIR.joinpath(".env"),
         env_file_encoding="utf-8",
     )
 
+    @field_validator("city_boundary_path")
+    @classmethod
+    def resolve_from_root(cls, path: Path) -> Path:
+        """
+        Resolve relative paths against the project root instead of the working directory.
+        """
+        return path if path.is_absolute() else ROOT_DIR.joinpath(path)
+
     @computed_field
     @property
     def db_url(self) -> URL:
@@ -3,6 +3,8 @@ from backend.crud.base import CRUDBase
 from sqlalchemy.future import select
 from backend.models.admin import Admin
 from backend.schemas.admin import AdminCreate, AdminUpdate
+from backend.services.password import hash_password
+from backend.services.principal import invalidate_principal
 
 
 class CRUDAdmin(CRUDBase[Admin, AdminCreate, AdminUpdate]):
@@ -24,17 +26,22 @@ class CRUDAdmin(CRUDBase[Admin, AdminCreate, AdminUpdate]):
         """
         db_obj = Admin(
             email=admin_in.email,
-            password=Admin.hash_password(password=admin_in.password),
+            password=await hash_password(admin_in.password),
         )
         db.add(db_obj)
         await db.commit()
         await db.refresh(db_obj)
+        invalidate_principal(db_obj.email)
         return db_obj
 
     @staticmethod
     async def change_admin(db: AsyncSession, admin_in: AdminUpdate):
         admin = await CRUDAdmin.get_by_email(db=db, email=admin_in.email)
+        admin_in = admin_in.model_copy(
+            update={"password": await hash_password(admin_in.password)}
+        )
         await CRUDBase.update(db=db, db_obj=admin, obj_in=admin_in)
+        invalidate_principal(admin_in.email)
 
 
 
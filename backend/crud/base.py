@@ -1,20 +1,55 @@
-from typing import Generic, List, Optional, TypeVar
+import uuid
+from typing import Any, Generic, List, Mapping, NamedTuple, Optional, Sequence, TypeVar
 
+from sqlalchemy import func, text, tuple_
 from sqlalchemy.future import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.base import ExecutableOption
 
 from backend.models import BaseModel
+from backend.utils.pagination import (
+    InvalidCursorError,
+    InvalidPageQueryError,
+    decode_cursor,
+    encode_cursor,
+)
 
 ModelType = TypeVar("ModelType", bound=BaseModel)
 CreateSchemaType = TypeVar("CreateSchemaType")
 UpdateSchemaType = TypeVar("UpdateSchemaType")
 
+# Loader options applied to a query, e.g. (selectinload(Fair.places),).
+# Relationships are lazy, so every caller names the ones it actually serializes.
+LoadProfile = Sequence[ExecutableOption]
+
+
+class PageResult(NamedTuple):
+    """
+    One page of objects returned by CRUDBase.get_page.
+
+    Attributes:
+        items (list): Objects of the page.
+        next_cursor (str or None): Cursor of the next page, None on the last page.
+        total (int or None): Estimated number of matching objects when requested.
+    """
+
+    items: list
+    next_cursor: Optional[str]
+    total: Optional[int]
+
 
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     """
     Generic CRUD class for basic operations.
+
+    Subclasses whitelist the columns get_page may filter on (by equality) and sort by.
+    Sort columns must be non-nullable, ties are always broken by id.
     """
 
+    filter_fields: tuple[str, ...] = ()
+    sort_fields: tuple[str, ...] = ("created_at",)
+    default_sort: str = "created_at"
+
     def __init__(self, model: ModelType):
         self.model = model
 
@@ -31,24 +66,113 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         await db.refresh(db_obj)
         return db_obj
 
-    async def get_by_id(self, db: AsyncSession, obj_id: int) -> Optional[ModelType]:
+    async def get_by_id(
+        self, db: AsyncSession, obj_id: int, load: LoadProfile = ()
+    ) -> Optional[ModelType]:
         """
         Get an object by ID.
+        :param db: Database session.
+        :param obj_id: ID of the object.
+        :param load: Relationships to load together with the object.
+        :return: Object or None.
         """
-        query = select(self.model).where(self.model.id == obj_id)
+        query = select(self.model).where(self.model.id == obj_id).options(*load)
         result = await db.execute(query)
         return result.scalar_one_or_none()
 
-    async def get_all(self, db: AsyncSession) -> List[ModelType]:
+    async def get_all(self, db: AsyncSession, load: LoadProfile = ()) -> List[ModelType]:
         """
         Get all objects.
         :param db: Database session.
+        :param load: Relationships to load together with the objects.
         :return: List of all objects.
         """
-        query = select(self.model)
+        query = select(self.model).options(*load)
         result = await db.execute(query)
         return result.scalars().all()
 
+    async def get_page(
+        self,
+        db: AsyncSession,
+        limit: int,
+        cursor: Optional[str] = None,
+        sort: Optional[str] = None,
+        descending: bool = False,
+        filters: Optional[Mapping[str, Any]] = None,
+        with_total: bool = False,
+        load: LoadProfile = (),
+    ) -> PageResult:
+        """
+        Get one page of objects using keyset pagination on (sort column, id).
+        :param db: Database session.
+        :param limit: Maximum number of objects on the page.
+        :param cursor: Cursor of the previous page, None for the first page.
+        :param sort: Column to sort by, one of sort_fields. Defaults to default_sort.
+        :param descending: Whether to sort in descending order.
+        :param filters: Column values to filter on, keys must be in filter_fields. None values are ignored.
+        :param with_total: Whether to estimate the number of matching objects.
+        :param load: Relationships to load together with the objects.
+        :return: The page with the cursor of the next one.
+        :raises InvalidPageQueryError: If the sort field, a filter or the cursor is not allowed.
+        """
+        sort = sort or self.default_sort
+        if sort not in self.sort_fields:
+            raise InvalidPageQueryError(f"cannot sort by {sort}")
+        filters = {name: value for name, value in (filters or {}).items() if value is not None}
+        for name in filters:
+            if name not in self.filter_fields:
+                raise InvalidPageQueryError(f"cannot filter by {name}")
+
+        sort_column = getattr(self.model, sort)
+        query = select(self.model).where(
+            *(getattr(self.model, name) == value for name, value in filters.items())
+        )
+        total = await self._estimate_total(db, query, bool(filters)) if with_total else None
+
+        if cursor:
+            after = self._decode_page_cursor(cursor, sort, descending, sort_column)
+            key = tuple_(sort_column, self.model.id)
+            query = query.where(key < after if descending else key > after)
+
+        if descending:
+            query = query.order_by(sort_column.desc(), self.model.id.desc())
+        else:
+            query = query.order_by(sort_column, self.model.id)
+        result = await db.execute(query.options(*load).limit(limit + 1))
+        items = list(result.scalars().all())
+
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            last = items[-1]
+            next_cursor = encode_cursor((sort, descending, getattr(last, sort), last.id))
+        return PageResult(items=items, next_cursor=next_cursor, total=total)
+
+    @staticmethod
+    def _decode_page_cursor(cursor: str, sort: str, descending: bool, sort_column) -> tuple:
+        values = decode_cursor(cursor)
+        if len(values) != 4 or values[0] != sort or values[1] != descending:
+            raise InvalidCursorError("cursor does not match the requested order")
+        value, obj_id = values[2], values[3]
+        if not isinstance(value, sort_column.type.python_type) or not isinstance(obj_id, uuid.UUID):
+            raise InvalidCursorError("unexpected cursor values")
+        return value, obj_id
+
+    async def _estimate_total(self, db: AsyncSession, query, filtered: bool) -> int:
+        """
+        Estimate the number of rows matched by query. Unfiltered tables use the planner
+        statistics instead of scanning, filtered queries are counted exactly.
+        """
+        if not filtered:
+            estimate = await db.scalar(
+                text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:name AS regclass)")
+                .bindparams(name=self.model.__tablename__)
+            )
+            # reltuples is -1 until the table was vacuumed or analyzed for the first time
+            if estimate is not None and estimate >= 0:
+                return estimate
+        return await db.scalar(select(func.count()).select_from(query.subquery()))
+
     @staticmethod
     async def update(
         db: AsyncSession, db_obj: ModelType, obj_in: UpdateSchemaType
@@ -1,23 +1,35 @@
-from sqlalchemy.ext.asyncio import AsyncSession
+import uuid
+from typing import Optional
 
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from backend.crud.base import CRUDBase
-from sqlalchemy.future import select
+from backend.crud.base import CRUDBase, LoadProfile
 from backend.models.business import Business
+from backend.models.fair import Fair
+from backend.models.payment import Payment
+from backend.models.reservation import Reservation
 from backend.schemas.business import BusinessCreate, BusinessUpdate
+from backend.services.password import hash_password
+from backend.services.cache import invalidate_reservation_caches
+from backend.services.principal import invalidate_principal
 
 
 class CRUDBusiness(CRUDBase[Business, BusinessCreate, BusinessUpdate]):
     """
     CRUD class for handling Business entities.
     """
+
+    filter_fields = ("email",)
+    sort_fields = ("created_at", "business_name", "email")
+
     @staticmethod
-    async def get_by_email(db: AsyncSession, email: str):
+    async def get_by_email(db: AsyncSession, email: str, load: LoadProfile = ()):
         """
         Retrieve a Business entity by email.
+        :param load: Relationships to load together with the business.
         """
-        result = await db.execute(select(Business).filter(Business.email == email))
+        result = await db.execute(select(Business).filter(Business.email == email).options(*load))
         return result.scalar_one_or_none()
     @staticmethod
     async def create_business(db: AsyncSession, business_in: BusinessCreate):
@@ -28,28 +40,79 @@ class CRUDBusiness(CRUDBase[Business, BusinessCreate, BusinessUpdate]):
             email=business_in.email,
             phone=business_in.phone,
             business_name=business_in.business_name,
-            password=Business.hash_password(business_in.password),
+            password=await hash_password(business_in.password),
         )
         db.add(db_obj)
         await db.commit()
         await db.refresh(db_obj)
+        invalidate_principal(db_obj.email)
         return db_obj
 
     @staticmethod
     async def change_business(db: AsyncSession, email:str, admin_in: BusinessCreate):
         admin = await CRUDBusiness.get_by_email(db=db, email=email)
+        admin_in = admin_in.model_copy(
+            update={"password": await hash_password(admin_in.password)}
+        )
         await CRUDBase.update(db=db, db_obj=admin, obj_in=admin_in)
+        invalidate_principal(email, admin_in.email)
+        invalidate_reservation_caches()
 
     @staticmethod
-    async def get_reservation_id(db: AsyncSession, email:str):
-        business = await CRUDBusiness.get_by_email(db=db, email=email)
-
-        if not business:
-            return
-        try:
-            reservation = business.reservations[-1]
-        except:
-            return
-        return reservation.id
+    def _latest_reservation(email: str, *columns):
+        return (
+            select(*columns)
+            .join(Business, Business.id == Reservation.business_id)
+            .where(Business.email == email)
+            .order_by(Reservation.created_at.desc(), Reservation.id.desc())
+            .limit(1)
+        )
+
+    @staticmethod
+    async def get_latest_reservation(
+        db: AsyncSession, email: str, for_update: bool = False
+    ) -> Optional[Reservation]:
+        """
+        Retrieve the most recent reservation of a business without loading the others.
+        :param db: Database session.
+        :param email: Email of the business.
+        :param for_update: Lock the reservation until the transaction ends, e.g. while it is paid.
+        :return: The reservation or None if the business has none.
+        """
+        query = CRUDBusiness._latest_reservation(email, Reservation)
+        if for_update:
+            query = query.with_for_update(of=Reservation)
+        result = await db.execute(query)
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def get_reservation_id(db: AsyncSession, email: str) -> Optional[uuid.UUID]:
+        """
+        Retrieve only the id of the most recent reservation of a business.
+        :param db: Database session.
+        :param email: Email of the business.
+        :return: ID of the reservation or None if the business has none.
+        """
+        result = await db.execute(CRUDBusiness._latest_reservation(email, Reservation.id))
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def get_checkin_reservation(db: AsyncSession, email: str) -> Optional[Row]:
+        """
+        Retrieve what the check-in token of the most recent paid reservation of a business is made of.
+        Reservations without a successful payment get no check-in token.
+        :param db: Database session.
+        :param email: Email of the business.
+        :return: Row with the reservation id, fair_id, place_id and the fair's end_day, or None.
+        """
+        result = await db.execute(
+            CRUDBusiness._latest_reservation(
+                email, Reservation.id, Reservation.fair_id, Reservation.place_id, Fair.end_day
+            )
+            .join(Fair, Fair.id == Reservation.fair_id)
+            .join(Payment, Payment.id == Reservation.payment_id)
+            .where(Payment.payment_status == "success")
+        )
+        return result.first()
 
 business_crud = CRUDBusiness(Business)
@@ -1,10 +1,18 @@
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from typing import Optional, List
+from sqlalchemy.orm import selectinload
+import uuid
+from typing import Optional, List, Tuple
 from datetime import datetime
-from backend.crud.base import CRUDBase
+from backend.crud.base import CRUDBase, LoadProfile
+from backend.models.base import fair_place_association
+from backend.models.business import Business
 from backend.models.fair import Fair
+from backend.models.place import Place
+from backend.models.reservation import Reservation
 from backend.schemas.fair import FairCreate, FairUpdate
+from backend.services.cache import invalidate_reservation_caches
 
 
 
@@ -13,6 +21,12 @@ class CRUDFair(CRUDBase[Fair, FairCreate, FairUpdate]):
     """
     CRUD operations for the Fair model.
     """
+
+    filter_fields = ("name",)
+    sort_fields = ("created_at", "name", "start_day", "end_day")
+
+    WITH_PLACES: LoadProfile = (selectinload(Fair.places),)
+
     @staticmethod
     async def get_all_active_fairs(db: AsyncSession) -> List[Fair]:
         """
@@ -26,14 +40,99 @@ class CRUDFair(CRUDBase[Fair, FairCreate, FairUpdate]):
 
 
     @staticmethod
-    async def get_by_name(db: AsyncSession, name: str) -> Optional[Fair]:
+    async def get_active_exhibitors(db: AsyncSession) -> Optional[List[Row]]:
+        """
+        Retrieve the businesses holding a reservation on any active fair with one joined query.
+        :param db: Database session.
+        :return: One row per reservation with the business columns, or None if there is no active fair.
+        """
+        stmt = (
+            select(
+                Business.id,
+                Business.email,
+                Business.phone,
+                Business.business_name,
+            )
+            .select_from(Fair)
+            .outerjoin(Reservation, Reservation.fair_id == Fair.id)
+            .outerjoin(Business, Business.id == Reservation.business_id)
+            .where(Fair.end_day >= datetime.now())
+            .order_by(Fair.start_day, Reservation.created_at)
+        )
+        rows = (await db.execute(stmt)).all()
+        if not rows:
+            return None
+        return [row for row in rows if row.id is not None]
+
+    @staticmethod
+    async def get_place_availability(
+        db: AsyncSession,
+        fair_name: str,
+        bounds: Optional[Tuple[float, float, float, float]] = None,
+    ) -> Optional[Tuple[uuid.UUID, List[Row]]]:
+        """
+        Retrieve every place of a fair with its reservation state in one query.
+        :param db: Database session.
+        :param fair_name: Name of the fair.
+        :param bounds: Only include places with min_lat <= lat < max_lat and min_lng <= lng < max_lng,
+            given as (min_lat, min_lng, max_lat, max_lng).
+        :return: The fair id and its places ordered by id, each row with id, place_cordinates,
+            place_zona, place_lat, place_lng and reserved, or None if the fair does not exist.
+        """
+        place_join = Place.id == fair_place_association.c.place_id
+        if bounds is not None:
+            min_lat, min_lng, max_lat, max_lng = bounds
+            # Half-open bounds, so a place on the edge of two tiles belongs to one of them
+            place_join = place_join & (Place.place_lat >= min_lat) & (Place.place_lat < max_lat) & (
+                Place.place_lng >= min_lng
+            ) & (Place.place_lng < max_lng)
+
+        stmt = (
+            select(
+                Fair.id.label("fair_id"),
+                Place.id,
+                Place.place_cordinates,
+                Place.place_zona,
+                Place.place_lat,
+                Place.place_lng,
+                Reservation.id.is_not(None).label("reserved"),
+            )
+            .select_from(Fair)
+            .outerjoin(fair_place_association, fair_place_association.c.fair_id == Fair.id)
+            .outerjoin(Place, place_join)
+            .outerjoin(
+                Reservation,
+                (Reservation.fair_id == Fair.id) & (Reservation.place_id == Place.id),
+            )
+            .where(Fair.name == fair_name)
+            .order_by(Place.id)
+        )
+        rows = (await db.execute(stmt)).all()
+        if not rows:
+            return None
+        return rows[0].fair_id, [row for row in rows if row.id is not None]
+
+    @staticmethod
+    async def get_id_by_name(db: AsyncSession, name: str) -> Optional[uuid.UUID]:
+        """
+        Retrieve only the id of a fair by name.
+        :param db: Database session.
+        :param name: Name of the fair.
+        :return: ID of the fair or None.
+        """
+        result = await db.execute(select(Fair.id).where(Fair.name == name).limit(1))
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def get_by_name(db: AsyncSession, name: str, load: LoadProfile = ()) -> Optional[Fair]:
         """
         Retrieve a fair by name.
         :param db: Database session.
         :param name: Name of the fair.
+        :param load: Relationships to load together with the fair.
         :return: Retrieved Fair or None.
         """
-        result = await db.execute(select(Fair).filter(Fair.name == name))
+        result = await db.execute(select(Fair).filter(Fair.name == name).options(*load))
         return result.scalar_one_or_none()
 
     @staticmethod
@@ -53,6 +152,7 @@ class CRUDFair(CRUDBase[Fair, FairCreate, FairUpdate]):
         db.add(new_fair)
         await db.commit()
         await db.refresh(new_fair)
+        invalidate_reservation_caches()
         return new_fair
 
     @staticmethod
@@ -78,13 +178,20 @@ class CRUDFair(CRUDBase[Fair, FairCreate, FairUpdate]):
 
         await db.commit()
         await db.refresh(fair)
+        invalidate_reservation_caches()
         return fair
 
     @staticmethod
-    async def get_places(db: AsyncSession, fair_name: str):
-        fair = await fair_crud.get_by_name(db=db, name=fair_name)
-        print("\n\n\n\n\n\\n\n\n\n")
-        print(fair.places)
+    async def get_places(db: AsyncSession, fair_name: str) -> Optional[List[Place]]:
+        """
+        Retrieve the places assigned to a fair.
+        :param db: Database session.
+        :param fair_name: Name of the fair.
+        :return: Places of the fair or None if the fair does not exist.
+        """
+        fair = await CRUDFair.get_by_name(db=db, name=fair_name, load=CRUDFair.WITH_PLACES)
+        if not fair:
+            return None
         return fair.places
 
 
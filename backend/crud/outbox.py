@@ -0,0 +1,193 @@
+import random
+import uuid
+from datetime import datetime, timedelta
+from typing import Iterable, NamedTuple
+
+from sqlalchemy import Row, delete, func, insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from backend.core.config import settings
+from backend.crud.base import CRUDBase
+from backend.models.outbox import OutboxMessage
+
+TOPIC_RESERVATION_CREATED = "reservation.created"
+TOPIC_RESERVATION_DELETED = "reservation.deleted"
+TOPIC_RESERVATION_CHECKED_IN = "reservation.checked_in"
+TOPIC_PAYMENT_CREATED = "payment.created"
+TOPIC_PAYMENT_STATUS_CHANGED = "payment.status_changed"
+
+OUTBOX_PENDING = "pending"
+OUTBOX_DELIVERED = "delivered"
+OUTBOX_DEAD = "dead"
+
+
+class OutboxFailure(NamedTuple):
+    """
+    Failed delivery attempt of a claimed outbox message.
+
+    Attributes:
+        message_id (UUID): ID of the message.
+        attempts (int): Attempts made so far, including the failed one.
+        error (str): Why the delivery failed.
+    """
+
+    message_id: uuid.UUID
+    attempts: int
+    error: str
+
+
+def retry_delay(attempts: int) -> float:
+    """
+    Exponential backoff with jitter before the next delivery attempt.
+    :param attempts: Attempts made so far.
+    :return: Seconds to wait.
+    """
+    delay = min(
+        settings.outbox_retry_backoff_seconds * 2 ** (attempts - 1),
+        settings.outbox_retry_backoff_max_seconds,
+    )
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class CRUDOutbox(CRUDBase[OutboxMessage, OutboxMessage, OutboxMessage]):
+    """
+    CRUD operations for the transactional outbox.
+    """
+
+    @staticmethod
+    async def add(db: AsyncSession, topic: str, payloads: Iterable[dict]) -> None:
+        """
+        Record messages in the current transaction, the caller commits.
+        They are only delivered if the transaction commits.
+        :param db: Database session.
+        :param topic: Topic of the messages.
+        :param payloads: JSON serializable payload of every message.
+        """
+        rows = [{"topic": topic, "payload": payload} for payload in payloads]
+        if rows:
+            await db.execute(insert(OutboxMessage), rows)
+
+    @staticmethod
+    async def claim(db: AsyncSession, batch_size: int) -> list[Row]:
+        """
+        Lease the next due messages for delivery and commit.
+        Claimed messages become due again after settings.outbox_lease_seconds, so messages of a
+        dispatcher that crashed mid-delivery are delivered again.
+        :param db: Database session.
+        :param batch_size: Maximum number of messages to claim.
+        :return: Rows with id, topic, payload and attempts of the claimed messages.
+        """
+        now = datetime.utcnow()
+        due = (
+            select(OutboxMessage.id)
+            .where(OutboxMessage.status == OUTBOX_PENDING, OutboxMessage.available_at <= now)
+            .order_by(OutboxMessage.available_at, OutboxMessage.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        result = await db.execute(
+            update(OutboxMessage)
+            .where(OutboxMessage.id.in_(due.scalar_subquery()))
+            .values(
+                attempts=OutboxMessage.attempts + 1,
+                available_at=now + timedelta(seconds=settings.outbox_lease_seconds),
+            )
+            .returning(
+                OutboxMessage.id, OutboxMessage.topic, OutboxMessage.payload, OutboxMessage.attempts
+            )
+            .execution_options(synchronize_session=False)
+        )
+        rows = result.all()
+        await db.commit()
+        return rows
+
+    @staticmethod
+    async def complete(
+        db: AsyncSession, delivered: list[uuid.UUID], failed: list[OutboxFailure]
+    ) -> int:
+        """
+        Record the outcome of delivering claimed messages and commit.
+        Failed messages are rescheduled with exponential backoff, or marked dead once
+        settings.outbox_max_attempts is reached.
+        :param db: Database session.
+        :param delivered: IDs of the delivered messages.
+        :param failed: Failed deliveries.
+        :return: Number of messages marked dead.
+        """
+        now = datetime.utcnow()
+        if delivered:
+            await db.execute(
+                update(OutboxMessage)
+                .where(OutboxMessage.id.in_(delivered))
+                .values(status=OUTBOX_DELIVERED, delivered_at=now, last_error=None)
+                .execution_options(synchronize_session=False)
+            )
+
+        dead = 0
+        changes = []
+        for failure in failed:
+            change = {"id": failure.message_id, "last_error": failure.error[:2000]}
+            if failure.attempts >= settings.outbox_max_attempts:
+                change["status"] = OUTBOX_DEAD
+                dead += 1
+            else:
+                change["available_at"] = now + timedelta(seconds=retry_delay(failure.attempts))
+            changes.append(change)
+        # Rows differ in their columns, so dead and rescheduled messages are updated separately
+        for group in (
+            [change for change in changes if "status" in change],
+            [change for change in changes if "status" not in change],
+        ):
+            if group:
+                await db.execute(update(OutboxMessage), group)
+
+        await db.commit()
+        return dead
+
+    @staticmethod
+    async def purge_delivered(db: AsyncSession, before: datetime, batch_size: int) -> int:
+        """
+        Delete one batch of messages delivered before a point in time and commit.
+        :param db: Database session.
+        :param before: Messages delivered earlier than this are deleted.
+        :param batch_size: Maximum number of messages to delete.
+        :return: Number of deleted messages.
+        """
+        expired = (
+            select(OutboxMessage.id)
+            .where(OutboxMessage.status == OUTBOX_DELIVERED, OutboxMessage.delivered_at < before)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        result = await db.execute(
+            delete(OutboxMessage)
+            .where(OutboxMessage.id.in_(expired.scalar_subquery()))
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        return result.rowcount
+
+    @staticmethod
+    async def stats(db: AsyncSession) -> dict:
+        """
+        Count the messages that need attention.
+        Both counts are answered from the partial indexes, delivered messages are not counted
+        since they are only kept until the retention sweep deletes them.
+        :param db: Database session.
+        :return: Pending and dead message counts and the time the oldest pending message became due.
+        """
+        pending, oldest = (
+            await db.execute(
+                select(func.count(), func.min(OutboxMessage.available_at)).where(
+                    OutboxMessage.status == OUTBOX_PENDING
+                )
+            )
+        ).one()
+        dead = await db.scalar(
+            select(func.count()).select_from(OutboxMessage).where(OutboxMessage.status == OUTBOX_DEAD)
+        )
+        return {OUTBOX_PENDING: pending, OUTBOX_DEAD: dead, "oldest_pending_at": oldest}
+
+
+outbox_crud = CRUDOutbox(OutboxMessage)
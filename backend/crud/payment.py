@@ -1,47 +1,137 @@
+import uuid
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import Row, Select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import selectinload
 
-from backend.crud.base import CRUDBase
+from backend.crud.base import CRUDBase, LoadProfile
+from backend.models.business import Business
 from backend.models.payment import Payment
-from backend.crud.business import business_crud
-from backend.schemas.payment import PaymentCreate, PaymentBase
+from backend.models.reservation import Reservation
+from backend.crud.outbox import TOPIC_PAYMENT_CREATED, outbox_crud
+from backend.crud.payment_event import payment_event_crud
+from backend.schemas.payment import PaymentCreate, PaymentEventCreate
 from backend.models.fair import Fair
 
+# Statuses of a payment that keep its reservation from being paid again
+OPEN_PAYMENT_STATUSES = ("pending", "success")
+
 
 class CRUDPayment(CRUDBase[Payment, PaymentCreate, PaymentCreate]):
     """
     CRUD operations for the Place model.
     """
 
+    filter_fields = ("payment_status",)
+
+    WITH_RESERVATION: LoadProfile = (selectinload(Payment.reservation),)
+
     @staticmethod
-    async def create_payment(db: AsyncSession, payment_in: "PaymentCreate", user_email: str) -> "PaymentBase":
+    async def create_payment(
+        db: AsyncSession,
+        payment_in: "PaymentCreate",
+        reservation: Reservation,
+        event_in: Optional[PaymentEventCreate] = None,
+    ) -> Payment:
         """
-        Create a new place in the database.
+        Record a payment for a reservation and end its hold.
+        A failed or refunded payment of the reservation is replaced, its row is kept.
+        The payment keeps the status it is created with until queued payment events move it,
+        event_in is queued in the same transaction so the payment and its first status change
+        are committed together.
         Args:
             db (AsyncSession): The database session.
-            place (PlaceCreate): The place data to create.
+            payment_in (PaymentCreate): The payment data to create.
+            reservation (Reservation): The reservation being paid.
+            event_in (PaymentEventCreate, optional): Status change to queue for the payment.
         Returns:
-            Place: The newly created place.
+            Payment: The newly created payment.
         """
 
         pay = Payment(
             payment_status=payment_in.payment_status,
             payment_stripe_id=payment_in.payment_stripe_id
         )
-        business = (await business_crud.get_by_email(db=db, email=user_email))
-
-        if not business:
-            return
-        try:
-            reservation = business.reservations[-1]
-        except:
-            return
         reservation.payment = pay
+        reservation.hold_expires_at = None
         db.add(reservation)
+        # Flush so the payment id is assigned for the outbox payload
+        await db.flush()
+        if event_in is not None:
+            await payment_event_crud.enqueue(db=db, event_in=event_in)
+        await outbox_crud.add(
+            db=db,
+            topic=TOPIC_PAYMENT_CREATED,
+            payloads=[{
+                "payment_id": str(pay.id),
+                "reservation_id": str(reservation.id),
+                "charge_id": pay.payment_stripe_id,
+                "payment_status": pay.payment_status,
+            }],
+        )
         await db.commit()
         await db.refresh(pay)
         return pay
 
+    @staticmethod
+    async def get_by_business(
+        db: AsyncSession,
+        email: str,
+        limit: int,
+        after: Optional[tuple[datetime, uuid.UUID]] = None,
+    ) -> List[Row]:
+        """
+        Retrieve one page of a business's payments with a single joined query.
+        Args:
+            db (AsyncSession): The database session.
+            email (str): The email of the business.
+            limit (int): Maximum number of payments to return.
+            after (tuple[datetime, UUID], optional): Keyset (created_at, id) of the last payment of the previous page.
+        Returns:
+            List[Row]: Rows with the Payment and the id of its reservation, ordered by creation time and id.
+        """
+
+        stmt = (
+            select(Payment, Reservation.id.label("reservation_id"))
+            .join(Reservation, Reservation.payment_id == Payment.id)
+            .join(Business, Business.id == Reservation.business_id)
+            .where(Business.email == email)
+            .order_by(Payment.created_at, Payment.id)
+            .limit(limit)
+        )
+        if after is not None:
+            stmt = stmt.where(tuple_(Payment.created_at, Payment.id) > tuple_(*after))
+
+        result = await db.execute(stmt)
+        return result.all()
+
+
+    @staticmethod
+    def export_query() -> Select:
+        """
+        Build the query listing every payment with its reservation, business and fair.
+        Returns:
+            Select: Query with one flat row per payment, oldest first.
+        """
+        return (
+            select(
+                Payment.id.label("payment_id"),
+                Payment.created_at,
+                Payment.payment_status,
+                Payment.payment_stripe_id,
+                Reservation.id.label("reservation_id"),
+                Business.email,
+                Business.business_name,
+                Fair.name.label("fair_name"),
+            )
+            .outerjoin(Reservation, Reservation.payment_id == Payment.id)
+            .outerjoin(Business, Business.id == Reservation.business_id)
+            .outerjoin(Fair, Fair.id == Reservation.fair_id)
+            .order_by(Payment.created_at, Payment.id)
+        )
 
 
 payment_crud = CRUDPayment(Payment)
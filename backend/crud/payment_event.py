@@ -0,0 +1,174 @@
+import uuid
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+from sqlalchemy import tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from backend.core.config import settings
+from backend.crud.base import CRUDBase
+from backend.crud.outbox import TOPIC_PAYMENT_STATUS_CHANGED, outbox_crud
+from backend.models.payment import Payment
+from backend.models.payment_event import PaymentEvent
+from backend.schemas.payment import PaymentEventCreate
+
+# Status changes a payment accepts, anything else is stale or out of order and ignored
+PAYMENT_TRANSITIONS = {
+    "pending": {"success", "failed"},
+    "success": {"refunded"},
+    "failed": set(),
+    "refunded": set(),
+}
+
+
+class PaymentEventBatch(NamedTuple):
+    """
+    Outcome of applying one batch of queued payment events.
+
+    Attributes:
+        fetched (int): Events taken from the queue.
+        applied (int): Payments whose status changed.
+        deferred (int): Events left queued because their payment does not exist yet.
+        ignored (int): Events taken out of the queue because they ran out of attempts.
+        cursor (tuple): Queue position of the last fetched event, the next batch starts after it.
+    """
+
+    fetched: int
+    applied: int
+    deferred: int
+    ignored: int = 0
+    cursor: Optional[tuple[datetime, uuid.UUID]] = None
+
+
+class CRUDPaymentEvent(CRUDBase[PaymentEvent, PaymentEventCreate, PaymentEventCreate]):
+    """
+    CRUD operations for the PaymentEvent queue.
+    """
+
+    @staticmethod
+    async def enqueue(db: AsyncSession, event_in: PaymentEventCreate) -> bool:
+        """
+        Queue a payment status change in the current transaction, the caller commits.
+        Args:
+            db (AsyncSession): The database session.
+            event_in (PaymentEventCreate): The status change.
+        Returns:
+            bool: False if an event with the same id was already queued.
+        """
+        result = await db.execute(
+            pg_insert(PaymentEvent)
+            .values(**event_in.model_dump())
+            .on_conflict_do_nothing(index_elements=[PaymentEvent.event_id])
+            .returning(PaymentEvent.id)
+        )
+        return result.scalar_one_or_none() is not None
+
+    @staticmethod
+    async def apply_batch(
+        db: AsyncSession,
+        batch_size: int,
+        after: Optional[tuple[datetime, uuid.UUID]] = None,
+    ) -> PaymentEventBatch:
+        """
+        Apply the oldest queued events to their payments and commit.
+        The batch is locked with SKIP LOCKED and the payments are loaded and updated with
+        one statement each. Events whose payment is not recorded yet, e.g. a webhook that
+        overtook the checkout request, stay queued. After settings.payment_event_max_attempts
+        they are marked ignored and leave the queue.
+        Args:
+            db (AsyncSession): The database session.
+            batch_size (int): Maximum number of events to apply.
+            after (tuple, optional): Cursor of the previous batch, to continue past deferred events.
+        Returns:
+            PaymentEventBatch: Counts of fetched, applied, deferred and ignored events.
+        """
+        query = select(PaymentEvent).where(PaymentEvent.processed_at.is_(None))
+        if after is not None:
+            query = query.where(tuple_(PaymentEvent.occurred_at, PaymentEvent.id) > after)
+        result = await db.execute(
+            query.order_by(PaymentEvent.occurred_at, PaymentEvent.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        events = result.scalars().all()
+        if not events:
+            await db.rollback()
+            return PaymentEventBatch(fetched=0, applied=0, deferred=0)
+
+        result = await db.execute(
+            select(Payment.id, Payment.payment_stripe_id, Payment.payment_status).where(
+                Payment.payment_stripe_id.in_({event.charge_id for event in events})
+            )
+        )
+        payments = {row.payment_stripe_id: row for row in result.all()}
+
+        statuses = {}
+        processed, deferred, ignored = [], [], []
+        for event in events:
+            payment = payments.get(event.charge_id)
+            if payment is None:
+                if event.attempts + 1 >= settings.payment_event_max_attempts:
+                    ignored.append(event.id)
+                else:
+                    deferred.append(event.id)
+                continue
+            current = statuses.get(payment.id, payment.payment_status)
+            if event.payment_status in PAYMENT_TRANSITIONS.get(current, ()):
+                statuses[payment.id] = event.payment_status
+            processed.append(event.id)
+
+        changed = [
+            payment
+            for payment in payments.values()
+            if statuses.get(payment.id, payment.payment_status) != payment.payment_status
+        ]
+        if changed:
+            await db.execute(
+                update(Payment),
+                [{"id": payment.id, "payment_status": statuses[payment.id]} for payment in changed],
+            )
+            await outbox_crud.add(
+                db=db,
+                topic=TOPIC_PAYMENT_STATUS_CHANGED,
+                payloads=[
+                    {
+                        "payment_id": str(payment.id),
+                        "charge_id": payment.payment_stripe_id,
+                        "payment_status": statuses[payment.id],
+                        "previous_status": payment.payment_status,
+                    }
+                    for payment in changed
+                ],
+            )
+        now = datetime.utcnow()
+        if processed:
+            await db.execute(
+                update(PaymentEvent)
+                .where(PaymentEvent.id.in_(processed))
+                .values(processed_at=now)
+            )
+        if deferred:
+            await db.execute(
+                update(PaymentEvent)
+                .where(PaymentEvent.id.in_(deferred))
+                .values(attempts=PaymentEvent.attempts + 1)
+            )
+        if ignored:
+            await db.execute(
+                update(PaymentEvent)
+                .where(PaymentEvent.id.in_(ignored))
+                .values(attempts=PaymentEvent.attempts + 1, processed_at=now, ignored_at=now)
+            )
+        await db.commit()
+        return PaymentEventBatch(
+            fetched=len(events),
+            applied=len(changed),
+            deferred=len(deferred),
+            ignored=len(ignored),
+            cursor=(events[-1].occurred_at, events[-1].id),
+        )
+
+
+payment_event_crud = CRUDPaymentEvent(PaymentEvent)
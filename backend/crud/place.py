@@ -1,10 +1,26 @@
+import math
+import uuid
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import and_, delete, func, literal_column
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
+from backend.core.config import settings
 from backend.crud.base import CRUDBase
+from backend.models.base import fair_place_association
 from backend.models.place import Place
 from backend.schemas.place import PlaceCreate, PlaceUpdate
 from backend.models.fair import Fair
+from backend.models.reservation import Reservation
+from backend.services.cache import invalidate_reservation_caches
+from backend.utils.geo import bounding_box, haversine_m, parse_cordinates
+from backend.utils.uuid7 import uuid7
+
+# Radii of the boxes searched for the nearest place before falling back to a full scan
+NEAREST_SEARCH_RADII_M = (250, 1000, 4000, 16000, 64000)
 
 
 class CRUDPlace(CRUDBase[Place, PlaceCreate, PlaceUpdate]):
@@ -12,6 +28,9 @@ class CRUDPlace(CRUDBase[Place, PlaceCreate, PlaceUpdate]):
     CRUD operations for the Place model.
     """
 
+    filter_fields = ("place_zona", "place_reservated")
+    sort_fields = ("created_at", "place_name")
+
     @staticmethod
     async def create_place(db: AsyncSession, place: "PlaceCreate") -> "Place":
         """
@@ -72,11 +91,16 @@ class CRUDPlace(CRUDBase[Place, PlaceCreate, PlaceUpdate]):
         place = await CRUDPlace.get_place_by_cordinates(
             db=db, place_cordinates=place_cordinates
         )
-        await db.run_sync(lambda sync_session: place.fairs.append(fair))
-        db.add(place)
+        # Write the association row directly instead of loading every fair of the place
+        await db.execute(
+            pg_insert(fair_place_association)
+            .values(fair_id=fair.id, place_id=place.id)
+            .on_conflict_do_nothing()
+        )
 
         await db.commit()
         await db.refresh(place)
+        invalidate_reservation_caches()
         return place
 
     @staticmethod
@@ -98,18 +122,181 @@ class CRUDPlace(CRUDBase[Place, PlaceCreate, PlaceUpdate]):
         place = await CRUDPlace.get_place_by_cordinates(
             db=db, place_cordinates=place_cordinates
         )
-
-        # if fair not in place.fairs:
-        #     return place
-        try:
-            await db.run_sync(lambda sync_session: place.fairs.remove(fair))
-        except:
-            pass
-        db.add(place)
+        await db.execute(
+            delete(fair_place_association).where(
+                fair_place_association.c.fair_id == fair.id,
+                fair_place_association.c.place_id == place.id,
+            )
+        )
 
         await db.commit()
         await db.refresh(place)
+        invalidate_reservation_caches()
         return place
 
 
+    @staticmethod
+    async def bulk_upsert(
+        db: AsyncSession, places: list[dict], fair_id: Optional[uuid.UUID] = None
+    ) -> dict[str, tuple[uuid.UUID, bool]]:
+        """
+        Insert or update many places and optionally assign them to a fair in one transaction.
+        Places are matched by coordinates, an existing place gets its name and zone updated.
+        Rows are written in multi-row statements of settings.place_import_batch_size.
+        Args:
+            db (AsyncSession): The database session.
+            places (list[dict]): place_name, place_zona and place_cordinates of each place,
+                coordinates must be unique within the list.
+            fair_id (UUID, optional): Fair to assign every place to.
+        Returns:
+            dict[str, tuple[UUID, bool]]: ID of the place and whether it was created, by coordinates.
+        """
+
+        now = datetime.utcnow()
+        imported = {}
+        batch_size = settings.place_import_batch_size
+        for start in range(0, len(places), batch_size):
+            rows = []
+            for place in places[start:start + batch_size]:
+                lat, lng = parse_cordinates(place["place_cordinates"]) or (None, None)
+                rows.append(
+                    {
+                        "id": uuid7(),
+                        "created_at": now,
+                        "updated_at": now,
+                        "place_name": place["place_name"],
+                        "place_zona": place["place_zona"],
+                        "place_cordinates": place["place_cordinates"],
+                        "place_reservated": False,
+                        "place_lat": lat,
+                        "place_lng": lng,
+                    }
+                )
+            stmt = pg_insert(Place).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Place.place_cordinates],
+                set_={
+                    "place_name": stmt.excluded.place_name,
+                    "place_zona": stmt.excluded.place_zona,
+                    "updated_at": stmt.excluded.updated_at,
+                },
+            ).returning(
+                Place.id,
+                Place.place_cordinates,
+                # xmax is 0 for freshly inserted rows and set for rows updated by the conflict clause
+                literal_column("xmax = 0").label("created"),
+            )
+            result = await db.execute(stmt)
+            batch = {row.place_cordinates: (row.id, row.created) for row in result}
+            imported.update(batch)
+
+            if fair_id is not None:
+                await db.execute(
+                    pg_insert(fair_place_association)
+                    .values([{"fair_id": fair_id, "place_id": place_id} for place_id, _ in batch.values()])
+                    .on_conflict_do_nothing()
+                )
+
+        await db.commit()
+        invalidate_reservation_caches()
+        return imported
+
+
+    @staticmethod
+    async def get_in_bbox(
+        db: AsyncSession,
+        min_lat: float,
+        min_lng: float,
+        max_lat: float,
+        max_lng: float,
+        limit: int,
+        fair_id: Optional[uuid.UUID] = None,
+    ) -> List[Place]:
+        """
+        Retrieve the places inside a latitude/longitude box.
+        Args:
+            db (AsyncSession): The database session.
+            min_lat (float): Southern edge of the box.
+            min_lng (float): Western edge of the box.
+            max_lat (float): Northern edge of the box.
+            max_lng (float): Eastern edge of the box.
+            limit (int): Maximum number of places to return.
+            fair_id (UUID, optional): Only return places assigned to this fair.
+        Returns:
+            List[Place]: Places inside the box.
+        """
+
+        query = select(Place).where(
+            Place.place_lat.between(min_lat, max_lat),
+            Place.place_lng.between(min_lng, max_lng),
+        )
+        if fair_id is not None:
+            query = query.join(
+                fair_place_association,
+                and_(
+                    fair_place_association.c.place_id == Place.id,
+                    fair_place_association.c.fair_id == fair_id,
+                ),
+            )
+        result = await db.execute(query.order_by(Place.place_lat, Place.place_lng).limit(limit))
+        return result.scalars().all()
+
+    @staticmethod
+    async def get_nearest_free(
+        db: AsyncSession, lat: float, lng: float, fair_id: uuid.UUID
+    ) -> Optional[tuple[Place, float]]:
+        """
+        Find the place of a fair without a reservation that is closest to a position.
+        Boxes of growing radius are searched first so the lat/lng index limits the candidates,
+        only when none of them holds a free place are all places of the fair considered.
+        Args:
+            db (AsyncSession): The database session.
+            lat (float): Latitude of the position.
+            lng (float): Longitude of the position.
+            fair_id (UUID): ID of the fair.
+        Returns:
+            tuple[Place, float] or None: The place and its distance in meters, or None if every place is taken.
+        """
+
+        # Equirectangular distance orders candidates correctly at city scale
+        cos_lat = math.cos(math.radians(lat))
+        approx_distance = func.power(Place.place_lat - lat, 2) + func.power(
+            (Place.place_lng - lng) * cos_lat, 2
+        )
+        base = (
+            select(Place)
+            .join(
+                fair_place_association,
+                and_(
+                    fair_place_association.c.place_id == Place.id,
+                    fair_place_association.c.fair_id == fair_id,
+                ),
+            )
+            .outerjoin(
+                Reservation,
+                and_(Reservation.place_id == Place.id, Reservation.fair_id == fair_id),
+            )
+            .where(Reservation.id.is_(None), Place.place_lat.is_not(None), Place.place_lng.is_not(None))
+            .order_by(approx_distance)
+            .limit(1)
+        )
+
+        for radius_m in (*NEAREST_SEARCH_RADII_M, None):
+            query = base
+            if radius_m is not None:
+                min_lat, min_lng, max_lat, max_lng = bounding_box(lat, lng, radius_m)
+                query = query.where(
+                    Place.place_lat.between(min_lat, max_lat),
+                    Place.place_lng.between(min_lng, max_lng),
+                )
+            place = (await db.execute(query)).scalar_one_or_none()
+            if place is None:
+                continue
+            distance = haversine_m(lat, lng, place.place_lat, place.place_lng)
+            # A place in the corner of the box may be farther than a free place just outside it
+            if radius_m is None or distance <= radius_m:
+                return place, distance
+        return None
+
+
 place_crud = CRUDPlace(Place)
@@ -1,20 +1,76 @@
 import uuid
+from collections import defaultdict
 from datetime import timedelta
+from sqlalchemy.dialects.postgresql import UUID as PUUID, insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from typing import List, Optional
+from sqlalchemy.orm import aliased
+from typing import List, NamedTuple, Optional
 from datetime import datetime
-from sqlalchemy import or_
+from sqlalchemy import DateTime, Select, column, delete, exists, literal, or_, true, update, values
 
+from backend.core.config import settings
 from backend.models import Payment
+from backend.models.business import Business
+from backend.models.fair import Fair
 from backend.models.place import Place
 
 from backend.crud.base import CRUDBase
-from backend.crud.business import business_crud
-from backend.crud.fair import fair_crud
-from backend.crud.place import place_crud
+from backend.crud.outbox import (
+    TOPIC_RESERVATION_CHECKED_IN,
+    TOPIC_RESERVATION_CREATED,
+    TOPIC_RESERVATION_DELETED,
+    outbox_crud,
+)
 from backend.models.reservation import Reservation
 from backend.schemas.reservation import ReservationCreate
+from backend.services.events import publish_place_changes
+from backend.utils.uuid7 import uuid7
+
+CLAIM_CREATED = "created"
+CLAIM_TAKEN = "taken"
+CLAIM_NOT_FOUND = "not_found"
+
+
+def _reservation_payload(reservation, **extra) -> dict:
+    """
+    Outbox payload identifying a reservation, its business, fair and place.
+    """
+    return {
+        "reservation_id": str(reservation.id),
+        "business_id": str(reservation.business_id),
+        "fair_id": str(reservation.fair_id),
+        "place_id": str(reservation.place_id),
+        **extra,
+    }
+
+
+class ReservationClaim(NamedTuple):
+    """
+    Outcome of claiming a place on a fair.
+
+    Attributes:
+        reservation (Reservation or None): The created reservation, if the claim succeeded.
+        status (str): One of CLAIM_CREATED, CLAIM_TAKEN or CLAIM_NOT_FOUND.
+    """
+
+    reservation: Optional[Reservation]
+    status: str
+
+
+class CheckInOutcome(NamedTuple):
+    """
+    Outcome of recording a batch of gate scans.
+
+    Attributes:
+        checked_in (dict[UUID, datetime]): Reservations checked in by this batch and when.
+        already_checked_in (dict[UUID, datetime]): Reservations checked in before and when.
+        unpaid (set[UUID]): Reservations without a successful payment, they are not checked in.
+    """
+
+    checked_in: dict[uuid.UUID, datetime]
+    already_checked_in: dict[uuid.UUID, datetime]
+    unpaid: set[uuid.UUID]
 
 
 class CRUDReservation(CRUDBase[Reservation, ReservationCreate, ReservationCreate]):
@@ -34,29 +90,166 @@ class CRUDReservation(CRUDBase[Reservation, ReservationCreate, ReservationCreate
         reservation = await db.execute(select(Reservation).where(
             Reservation.id == reservation_id))
         reservation = reservation.scalar_one_or_none()
-        await CRUDBase.delete(db=db, db_obj=reservation)
+
+        if reservation is None:
+            return
+
+        await db.delete(reservation)
+        await db.flush()
+        await db.execute(
+            update(Place)
+            .where(
+                Place.id == reservation.place_id,
+                ~exists().where(Reservation.place_id == Place.id),
+            )
+            .values(place_reservated=False)
+        )
+        await publish_place_changes(
+            db=db, fair_id=reservation.fair_id, place_ids=[reservation.place_id], reserved=False
+        )
+        await outbox_crud.add(
+            db=db,
+            topic=TOPIC_RESERVATION_DELETED,
+            payloads=[_reservation_payload(reservation, reason="cancelled")],
+        )
         await db.commit()
+        return reservation
 
     @staticmethod
-    async def expired_payment_delete_reservatoin(db: AsyncSession) -> Optional[Reservation]:
-
-        reservations = await db.execute(
-        select(Reservation)
-        .where(
-            or_(
-                Reservation.payment.has() == False,
-                Reservation.payment.has(payment_status="pending")
-            ) & ((datetime.now() - Reservation.created_at) > timedelta(days=5))
-            ))
-        reservations = reservations.scalars().all()
-
-        if not reservations:
-            return
+    async def _delete_in_batches(db: AsyncSession, condition, batch_size: int, reason: str) -> int:
+        """
+        Delete reservations matching a condition in batches of set-based statements.
+        Every batch runs one DELETE ... RETURNING over rows locked with SKIP LOCKED and clears the
+        place_reservated flag of places left without reservations, then commits.
+        :param db: Database session.
+        :param condition: SQL expression selecting the reservations to delete.
+        :param batch_size: Maximum number of reservations deleted per transaction.
+        :param reason: Why the reservations are deleted, passed on in the outbox messages.
+        :return: Number of deleted reservations.
+        """
 
-        for reservation in reservations:
-            await db.delete(reservation)
+        deleted = 0
+        while True:
+            batch = (
+                select(Reservation.id)
+                .where(condition)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            result = await db.execute(
+                delete(Reservation)
+                .where(Reservation.id.in_(batch.scalar_subquery()))
+                .returning(
+                    Reservation.id, Reservation.business_id, Reservation.fair_id, Reservation.place_id
+                )
+                .execution_options(synchronize_session=False)
+            )
+            rows = result.all()
 
-        await db.commit()
+            if not rows:
+                await db.rollback()
+                break
+
+            places_by_fair = defaultdict(set)
+            for row in rows:
+                places_by_fair[row.fair_id].add(row.place_id)
+
+            await db.execute(
+                update(Place)
+                .where(
+                    Place.id.in_({row.place_id for row in rows}),
+                    ~exists().where(Reservation.place_id == Place.id),
+                )
+                .values(place_reservated=False)
+            )
+            for fair_id, place_ids in places_by_fair.items():
+                await publish_place_changes(
+                    db=db, fair_id=fair_id, place_ids=place_ids, reserved=False
+                )
+            await outbox_crud.add(
+                db=db,
+                topic=TOPIC_RESERVATION_DELETED,
+                payloads=[_reservation_payload(row, reason=reason) for row in rows],
+            )
+            await db.commit()
+            deleted += len(rows)
+
+            if len(rows) < batch_size:
+                break
+
+        return deleted
+
+    @staticmethod
+    async def expired_payment_delete_reservatoin(db: AsyncSession) -> int:
+        """
+        Delete reservations without a completed payment that are older than the payment window.
+        Pending and failed payments do not count as completed.
+        :param db: Database session.
+        :return: Number of deleted reservations.
+        """
+
+        cutoff = datetime.utcnow() - timedelta(days=settings.unpaid_reservation_expire_days)
+        condition = (Reservation.created_at < cutoff) & or_(
+            Reservation.payment_id.is_(None),
+            Reservation.payment_id.in_(
+                select(Payment.id).where(Payment.payment_status.in_(("pending", "failed")))
+            ),
+        )
+        return await CRUDReservation._delete_in_batches(
+            db=db,
+            condition=condition,
+            batch_size=settings.reservation_cleanup_batch_size,
+            reason="unpaid",
+        )
+
+    @staticmethod
+    async def release_expired_holds(db: AsyncSession) -> int:
+        """
+        Delete unpaid reservations whose hold has expired and free their places.
+        :param db: Database session.
+        :return: Number of released reservations.
+        """
+
+        condition = Reservation.payment_id.is_(None) & (
+            Reservation.hold_expires_at < datetime.utcnow()
+        )
+        return await CRUDReservation._delete_in_batches(
+            db=db,
+            condition=condition,
+            batch_size=settings.reservation_cleanup_batch_size,
+            reason="hold_expired",
+        )
+
+    @staticmethod
+    def exhibitors_export_query(fair_name: Optional[str] = None) -> Select:
+        """
+        Build the query listing every reservation with its fair, place, business and payment.
+        :param fair_name: Only export reservations of this fair.
+        :return: Query with one flat row per reservation, oldest first.
+        """
+        query = (
+            select(
+                Reservation.id.label("reservation_id"),
+                Reservation.created_at.label("reserved_at"),
+                Fair.name.label("fair_name"),
+                Place.place_name,
+                Place.place_cordinates,
+                Place.place_zona,
+                Business.business_name,
+                Business.email,
+                Business.phone,
+                Payment.payment_status,
+                Payment.created_at.label("paid_at"),
+            )
+            .join(Fair, Fair.id == Reservation.fair_id)
+            .join(Place, Place.id == Reservation.place_id)
+            .join(Business, Business.id == Reservation.business_id)
+            .outerjoin(Payment, Payment.id == Reservation.payment_id)
+            .order_by(Reservation.created_at, Reservation.id)
+        )
+        if fair_name is not None:
+            query = query.where(Fair.name == fair_name)
+        return query
 
     @staticmethod
     async def get_business_by_reservatoin_id(obj):
@@ -68,44 +261,173 @@ class CRUDReservation(CRUDBase[Reservation, ReservationCreate, ReservationCreate
         return obj.business
 
     @staticmethod
-    async def create_reservation(db: AsyncSession, business: str, place: str, fair: str) -> Reservation:
-        business = await business_crud.get_by_email(db=db, email=business)
-        fair = await fair_crud.get_by_name(db=db, name=fair)
-        place = await place_crud.get_place_by_cordinates(db=db, place_cordinates=place)
-
-        if not business or not fair or not place:
-            return
+    async def create_reservation(db: AsyncSession, business: str, place: str, fair: str) -> ReservationClaim:
+        """
+        Atomically claim a place on a fair for a business.
+        The business, fair and place are resolved, the reservation is inserted and the place is flagged
+        as reserved in one statement. A concurrent claim of the same (fair, place) slot does not raise,
+        it is reported as taken. The place is held for settings.reservation_hold_minutes until a payment
+        is attached.
+        Args:
+            db (AsyncSession): The database session.
+            business (str): The email of the business.
+            place (str): The coordinates of the place.
+            fair (str): The name of the fair.
+        Returns:
+            ReservationClaim: The created reservation and CLAIM_CREATED, or no reservation and
+            CLAIM_TAKEN / CLAIM_NOT_FOUND.
+        """
 
-        reservation = Reservation()
-        reservation.business = business
-        reservation.fair = fair
-        reservation.place = place
+        now = datetime.utcnow()
+        hold_expires_at = now + timedelta(minutes=settings.reservation_hold_minutes)
+        source = (
+            select(
+                literal(uuid7(), PUUID(as_uuid=True)),
+                literal(now),
+                literal(now),
+                literal(hold_expires_at),
+                Business.id,
+                Fair.id,
+                Place.id,
+            )
+            .select_from(Business)
+            .join(Fair, true())
+            .join(Place, true())
+            .where(
+                Business.email == business,
+                Fair.name == fair,
+                Place.place_cordinates == place,
+            )
+            .limit(1)
+        )
+        claimed = (
+            pg_insert(Reservation)
+            .from_select(
+                ["id", "created_at", "updated_at", "hold_expires_at", "business_id", "fair_id", "place_id"],
+                source,
+                include_defaults=False,
+            )
+            .on_conflict_do_nothing(constraint="uq_reservation_fair_place")
+            .returning(*Reservation.__table__.c)
+            .cte("claimed")
+        )
+        flagged = (
+            update(Place)
+            .where(Place.id.in_(select(claimed.c.place_id)))
+            # Python-side onupdate defaults are not applied to statements inside a CTE
+            .values(place_reservated=True, updated_at=now)
+            .cte("flagged")
+        )
 
-        # business.reservations = reservation
-        place.place_reservated = True
+        result = await db.execute(select(aliased(Reservation, claimed)).add_cte(flagged))
+        reservation = result.scalar_one_or_none()
 
-        db.add(reservation)
+        if reservation is None:
+            await db.rollback()
+            taken = await CRUDReservation.is_place_reserved(
+                db=db, place_cordinates=place, fair_name=fair
+            )
+            return ReservationClaim(None, CLAIM_TAKEN if taken else CLAIM_NOT_FOUND)
 
+        await publish_place_changes(
+            db=db, fair_id=reservation.fair_id, place_ids=[reservation.place_id], reserved=True
+        )
+        await outbox_crud.add(
+            db=db, topic=TOPIC_RESERVATION_CREATED, payloads=[_reservation_payload(reservation)]
+        )
         await db.commit()
-        await db.refresh(reservation)
-        return reservation
+        return ReservationClaim(reservation, CLAIM_CREATED)
 
     @staticmethod
-    async def is_place_reserved(db: AsyncSession, place_cordinates: str, fair_name: str):
-        fair = await fair_crud.get_by_name(db=db, name=fair_name)
-        place = await place_crud.get_place_by_cordinates(db=db, place_cordinates=place_cordinates)
-
-        if not fair or not place:
-            return
+    async def check_in(db: AsyncSession, scans: dict[uuid.UUID, datetime]) -> CheckInOutcome:
+        """
+        Record gate scans of many reservations with one UPDATE over a VALUES list.
+        Only reservations with a successful payment are checked in, and only their first
+        check-in is kept, later scans report the original time.
+        Reservations missing from the outcome do not exist anymore.
+        :param db: Database session.
+        :param scans: Scan time of every scanned reservation.
+        :return: Newly and previously checked-in reservations.
+        """
+        if not scans:
+            return CheckInOutcome({}, {}, set())
 
+        scanned = values(
+            column("id", PUUID(as_uuid=True)), column("scanned_at", DateTime), name="scanned"
+        ).data(list(scans.items()))
         result = await db.execute(
-            select(Reservation).where((Reservation.fair_id == fair.id) & (Reservation.place_id == place.id)))
-        result = result.scalar_one_or_none()
+            update(Reservation)
+            .where(
+                Reservation.id == scanned.c.id,
+                Reservation.checked_in_at.is_(None),
+                Reservation.payment_id == Payment.id,
+                Payment.payment_status == "success",
+            )
+            .values(checked_in_at=scanned.c.scanned_at)
+            .returning(
+                Reservation.id,
+                Reservation.business_id,
+                Reservation.fair_id,
+                Reservation.place_id,
+                Reservation.checked_in_at,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        rows = result.all()
+        checked_in = {row.id: row.checked_in_at for row in rows}
+
+        already_checked_in = {}
+        unpaid = set()
+        remaining = scans.keys() - checked_in.keys()
+        if remaining:
+            result = await db.execute(
+                select(Reservation.id, Reservation.checked_in_at).where(Reservation.id.in_(remaining))
+            )
+            for row in result.all():
+                if row.checked_in_at is None:
+                    unpaid.add(row.id)
+                else:
+                    already_checked_in[row.id] = row.checked_in_at
 
-        if result:
-            return True
-        else:
-            return False
+        await outbox_crud.add(
+            db=db,
+            topic=TOPIC_RESERVATION_CHECKED_IN,
+            payloads=[
+                _reservation_payload(row, checked_in_at=row.checked_in_at.isoformat())
+                for row in rows
+            ],
+        )
+        await db.commit()
+        return CheckInOutcome(checked_in, already_checked_in, unpaid)
+
+    @staticmethod
+    async def is_place_reserved(db: AsyncSession, place_cordinates: str, fair_name: str) -> Optional[bool]:
+        """
+        Check whether a place is reserved on a fair with a single query.
+        Args:
+            db (AsyncSession): The database session.
+            place_cordinates (str): The coordinates of the place.
+            fair_name (str): The name of the fair.
+        Returns:
+            bool or None: Whether the place is reserved, or None if the fair or the place does not exist.
+        """
+
+        stmt = (
+            select(Reservation.id)
+            .select_from(Fair)
+            .join(Place, true())
+            .outerjoin(
+                Reservation,
+                (Reservation.fair_id == Fair.id) & (Reservation.place_id == Place.id),
+            )
+            .where(Fair.name == fair_name, Place.place_cordinates == place_cordinates)
+            .limit(1)
+        )
+        row = (await db.execute(stmt)).first()
+
+        if row is None:
+            return
+        return row.id is not None
 
 
 reservation_crud = CRUDReservation(Reservation)
\ No newline at end of file
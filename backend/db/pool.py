@@ -0,0 +1,95 @@
+import threading
+import time
+from bisect import bisect_left
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+# Upper bounds (seconds) of the connection acquire wait-time histogram buckets
+WAIT_TIME_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class WaitTimeHistogram:
+    """
+    Cumulative histogram of connection acquire wait times.
+
+    Attributes:
+        buckets (tuple[float, ...]): Upper bounds of the buckets in seconds.
+        counts (list[int]): Number of observations per bucket, the last one is +Inf.
+        total (float): Sum of all observed wait times in seconds.
+        count (int): Number of observations.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = WAIT_TIME_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        """
+        Record a single wait time.
+        :param seconds: Observed wait time in seconds.
+        """
+        with self._lock:
+            self.counts[bisect_left(self.buckets, seconds)] += 1
+            self.total += seconds
+            self.count += 1
+
+    def snapshot(self) -> dict:
+        """
+        Return a copy of the histogram with cumulative bucket counts.
+        """
+        with self._lock:
+            cumulative = []
+            running = 0
+            for bound, count in zip((*self.buckets, "+Inf"), self.counts):
+                running += count
+                cumulative.append({"le": bound, "count": running})
+            return {"buckets": cumulative, "sum": self.total, "count": self.count}
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Async queue pool that tracks waiters, the time spent acquiring a connection and failed checkouts.
+    Timeouts waiting for a free connection are counted apart from errors opening a new one,
+    e.g. a refused connection or bad credentials.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.waiters = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.wait_time = WaitTimeHistogram()
+
+    def _do_get(self):
+        self.waiters += 1
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self.waiters -= 1
+            self.wait_time.observe(time.perf_counter() - started)
+
+    def stats(self) -> dict:
+        """
+        Return live pool statistics.
+        """
+        return {
+            "size": self.size(),
+            "checked_in": self.checkedin(),
+            "checked_out": self.checkedout(),
+            "overflow": self.overflow(),
+            "waiters": self.waiters,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "wait_time": self.wait_time.snapshot(),
+        }
@@ -2,14 +2,31 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from backend.core.config import settings
+from backend.db.pool import InstrumentedQueuePool
 
 # Ensure the DATABASE_URL uses asyncpg
-engine = create_async_engine(settings.db_url, echo=True)
+engine = create_async_engine(
+    settings.db_url,
+    echo=settings.db_echo,
+    poolclass=InstrumentedQueuePool,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_pool_max_overflow,
+    pool_pre_ping=settings.db_pool_pre_ping,
+    pool_recycle=settings.db_pool_recycle_seconds,
+    pool_timeout=settings.db_pool_timeout_seconds,
+)
 
 # Create the session factory for async sessions
 AsyncSessionLocal = sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
 
 
+def get_pool_stats() -> dict:
+    """
+    Return live statistics of the engine connection pool.
+    """
+    return engine.sync_engine.pool.stats()
+
+
 # Dependency for FastAPI routes
 async def get_db():
     async with AsyncSessionLocal() as session:
@@ -1,3 +1,5 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
@@ -6,15 +8,51 @@ from loguru import logger
 import sys
 
 from backend.core.config import settings
+from backend.db.session import engine
+from backend.services.events import place_events
+from backend.services.jobs import register_jobs
+from backend.services.metrics import MetricsMiddleware, instrument_engine
+from backend.services.password import shutdown_password_pool
+from backend.services.payment_gateway import shutdown_payment_gateway
+from backend.services.qr import shutdown_qr_pool
+from backend.services.scheduler import scheduler
 from backend.api.reservation import router as reservation_router
 from backend.api.place import router as place_router
 from backend.api.fair import router as fair_router
 from backend.api.auth import router as auth_router
 from backend.api.payment import router as pay_router
 from backend.api.qrcode import router as qr_router
+from backend.api.internal import router as internal_router
+from backend.api.export import router as export_router
+from backend.api.metrics import router as metrics_router
+
+register_jobs(scheduler)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Start background resources when the app starts and release them when it shuts down.
+    """
+    logger.info("Application startup: Initializing resources.")
+    if settings.scheduler_enabled:
+        scheduler.start()
+    if settings.events_pg_notify:
+        place_events.start_listener()
+
+    yield
+
+    logger.info("Application shutdown: Cleaning up resources.")
+    await scheduler.stop()
+    await place_events.stop_listener()
+    shutdown_password_pool()
+    shutdown_payment_gateway()
+    shutdown_qr_pool()
+    await engine.dispose()
+
 
 # Initialize FastAPI app
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 app.include_router(place_router, tags=["Place"])
 app.include_router(fair_router, tags=["Fair"])
@@ -22,6 +60,10 @@ app.include_router(auth_router, tags=["Auth"])
 app.include_router(reservation_router, tags=["Reservation"])
 app.include_router(pay_router, tags=["Payment"])
 app.include_router(qr_router, tags=["QRCode"])
+app.include_router(internal_router, tags=["Internal"])
+app.include_router(export_router, tags=["Export"])
+if settings.metrics_enabled:
+    app.include_router(metrics_router, tags=["Metrics"])
 
 
 app.add_middleware(
@@ -34,6 +76,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Paginated endpoints return the cursor of the next page in this header
+    expose_headers=["X-Next-Cursor"],
 )
 # Configure Loguru
 logger.remove()  # Remove default logger to configure custom settings
@@ -47,24 +91,6 @@ logger.add(
 )
 
 
-@app.on_event("startup")
-async def startup_event():
-    """
-    Code to run when the app starts.
-    For example, database connection setup or loading configurations.
-    """
-    logger.info("Application startup: Initializing resources.")
-
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    """
-    Code to run when the app shuts down.
-    For example, closing database connections or cleaning up.
-    """
-    logger.info("Application shutdown: Cleaning up resources.")
-
-
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
     """
@@ -76,6 +102,12 @@ async def log_requests(request: Request, call_next):
     return response
 
 
+# Added last so it wraps every other middleware and times the whole request
+if settings.metrics_enabled:
+    instrument_engine(engine)
+    app.add_middleware(MetricsMiddleware)
+
+
 # Example route
 @app.get("/")
 async def read_root():
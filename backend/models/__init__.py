@@ -4,5 +4,8 @@ from backend.models.place import Place
 from backend.models.fair import Fair
 from backend.models.admin import Admin
 from backend.models.payment import Payment
+from backend.models.payment_event import PaymentEvent
+from backend.models.outbox import OutboxMessage
+from backend.models.scheduler_job import SchedulerJob
 from backend.models.userbase import UserBase
 from backend.models.base import BaseModel
@@ -1,10 +1,12 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, Column, Table
+from sqlalchemy import DateTime, ForeignKey, Column, Index, Table
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, DeclarativeBase
 
+from backend.utils.uuid7 import uuid7
+
 
 # @as_declarative()
 class BaseModel(DeclarativeBase):
@@ -15,11 +17,11 @@ class BaseModel(DeclarativeBase):
 
     __abstract__ = True
 
+    # Time-ordered ids keep primary key inserts on the right edge of the index
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         primary_key=True,
-        default=uuid.uuid4,
-        unique=True,
+        default=uuid7,
         nullable=False,
     )
     created_at: Mapped[datetime] = mapped_column(
@@ -31,9 +33,11 @@ class BaseModel(DeclarativeBase):
 
 
 # Many-to-Many Association Table for Fair <-> Place
+# The composite primary key covers lookups by fair, the reverse index covers lookups by place
 fair_place_association = Table(
     "fair_place_association",
     BaseModel.metadata,
-    Column("fair_id", UUID, ForeignKey("fair.id")),
-    Column("place_id", UUID, ForeignKey("place.id")),
+    Column("fair_id", UUID, ForeignKey("fair.id"), primary_key=True),
+    Column("place_id", UUID, ForeignKey("place.id"), primary_key=True),
+    Index("ix_fair_place_association_place_id_fair_id", "place_id", "fair_id"),
 )
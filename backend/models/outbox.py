@@ -0,0 +1,52 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, Index, INT, String, Text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from backend.models.base import BaseModel
+
+
+class OutboxMessage(BaseModel):
+    """
+    Side effect recorded in the same transaction as the change causing it and delivered
+    later by the outbox dispatcher.
+    Attributes:
+        __tablename__ (str): The name of the table in the database.
+        topic (str): Kind of the message, selects the handlers it is delivered to.
+        payload (dict): JSON payload passed to the handlers.
+        status (str): "pending" until delivered, then "delivered", or "dead" once retries are exhausted.
+        attempts (int): Number of delivery attempts so far.
+        available_at (datetime): Earliest time of the next delivery attempt.
+        last_error (str): Error of the last failed attempt.
+        delivered_at (datetime): When all handlers succeeded.
+    Constraints:
+        __table_args__ (tuple): Partial indexes over pending messages in delivery order, over
+            delivered messages by age for the retention sweep, and over dead messages.
+    """
+
+    __tablename__ = "outbox_message"
+
+    topic: Mapped[str] = mapped_column(String(100))
+    payload: Mapped[dict] = mapped_column(JSONB)
+    status: Mapped[str] = mapped_column(String(20), default="pending")
+    attempts: Mapped[int] = mapped_column(INT, default=0)
+    available_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    delivered_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index(
+            "ix_outbox_message_pending",
+            "available_at",
+            "id",
+            postgresql_where=status == "pending",
+        ),
+        Index(
+            "ix_outbox_message_delivered",
+            "delivered_at",
+            postgresql_where=status == "delivered",
+        ),
+        Index("ix_outbox_message_dead", "id", postgresql_where=status == "dead"),
+    )
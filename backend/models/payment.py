@@ -8,12 +8,15 @@ class Payment(BaseModel):
     Attributes:
         __tablename__ (str): The name of the table in the database.
         payment_status (Mapped[str]): The status of the payment, defaults to "pending".
+            Moves to "success", "failed" or "refunded" as payment events are applied.
+        payment_stripe_id (Mapped[str]): ID of the charge at Stripe, unique.
         reservation (relationship): A one-to-one relationship with the Reservation model.
     """
 
     __tablename__ = "payment"
     payment_status: Mapped[str] = mapped_column(default="pending")
-    payment_stripe_id : Mapped[int]
+    # Webhook events are matched to their payment by the charge id
+    payment_stripe_id: Mapped[str] = mapped_column(unique=True)
 
     # 1:1 with Reservation
     reservation = relationship("Reservation", back_populates="payment", uselist=False)
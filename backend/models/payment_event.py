@@ -0,0 +1,43 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, Index, INT, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from backend.models.base import BaseModel
+
+
+class PaymentEvent(BaseModel):
+    """
+    Queued payment status change, received from a Stripe webhook or recorded at checkout.
+    Attributes:
+        __tablename__ (str): The name of the table in the database.
+        event_id (str): ID of the Stripe event, unique so redelivered events are stored once.
+        charge_id (str): ID of the charge at Stripe, matched against Payment.payment_stripe_id.
+        payment_status (str): Status the payment moves to.
+        occurred_at (datetime): When the change happened at Stripe, events are applied in this order.
+        attempts (int): How often the event was deferred because its payment did not exist yet.
+        processed_at (datetime): When the event left the queue, None while it is queued.
+        ignored_at (datetime): When the event was given up on because its payment never appeared.
+    Constraints:
+        __table_args__ (tuple): Partial index over the queued events, in the order they are applied.
+    """
+
+    __tablename__ = "payment_event"
+
+    event_id: Mapped[str] = mapped_column(String(255), unique=True)
+    charge_id: Mapped[str] = mapped_column(String(255))
+    payment_status: Mapped[str] = mapped_column(String(50))
+    occurred_at: Mapped[datetime] = mapped_column(DateTime)
+    attempts: Mapped[int] = mapped_column(INT, default=0)
+    processed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    ignored_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index(
+            "ix_payment_event_queued",
+            "occurred_at",
+            "id",
+            postgresql_where=processed_at.is_(None),
+        ),
+    )
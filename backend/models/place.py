@@ -1,7 +1,10 @@
-from sqlalchemy import String, INT, BOOLEAN
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from typing import Optional
+
+from sqlalchemy import String, INT, BOOLEAN, Double, Index
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 
 from backend.models.base import BaseModel, fair_place_association
+from backend.utils.geo import parse_cordinates
 
 
 class Place(BaseModel):
@@ -13,6 +16,8 @@ class Place(BaseModel):
         place_zona (int): The zone of the place, nullable.
         place_cordinates (str): The coordinates of the place, unique and nullable.
         place_reservated (bool): Indicates if the place is reserved, defaults to False.
+        place_lat (float): Latitude parsed from place_cordinates, kept in sync on assignment.
+        place_lng (float): Longitude parsed from place_cordinates, kept in sync on assignment.
         fairs (List[Fair]): Many-to-Many relationship with the Fair entity.
         reservations (List[Reservation]): One-to-Many relationship with the Reservation entity, limited to one per Fair via constraint.
     """
@@ -25,6 +30,11 @@ class Place(BaseModel):
         String(50), nullable=True, unique=True
     )
     place_reservated: Mapped[bool] = mapped_column(BOOLEAN, default=False)
+    place_lat: Mapped[Optional[float]] = mapped_column(Double, nullable=True)
+    place_lng: Mapped[Optional[float]] = mapped_column(Double, nullable=True)
+
+    # Bounding box and nearest place searches range over latitude and filter on longitude
+    __table_args__ = (Index("ix_place_lat_lng", "place_lat", "place_lng"),)
 
     # Many-to-Many with Fair
     fairs = relationship(
@@ -32,3 +42,9 @@ class Place(BaseModel):
     )
     # 1 Place -> Many Reservations (but limited to 1 per Fair via constraint)
     reservations = relationship("Reservation", back_populates="place")
+
+    @validates("place_cordinates")
+    def _sync_position(self, key: str, place_cordinates: Optional[str]) -> Optional[str]:
+        position = parse_cordinates(place_cordinates)
+        self.place_lat, self.place_lng = position if position else (None, None)
+        return place_cordinates
@@ -1,4 +1,4 @@
-from sqlalchemy import ForeignKey, UniqueConstraint
+from sqlalchemy import DateTime, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID as PUUID
 from sqlalchemy.orm import mapped_column, relationship
 from backend.models.base import BaseModel
@@ -13,8 +13,11 @@ class Reservation(BaseModel):
         payment_id (UUID): Foreign key referencing the payment entity, must be unique.
         fair_id (UUID): Foreign key referencing the fair entity.
         place_id (UUID): Foreign key referencing the place entity.
+        hold_expires_at (datetime): Until when the place is held without a payment, None once paid or for permanent reservations.
+        checked_in_at (datetime): When the exhibitor was first scanned at the gate, None until then.
     Constraints:
-        __table_args__ (tuple): Unique constraint ensuring one place per fair per reservation.
+        __table_args__ (tuple): Unique constraint ensuring one place per fair per reservation
+            and a partial index over unpaid holds for the expiry sweep.
     Relationships:
         business (relationship): Relationship to the Business model.
         payment (relationship): Relationship to the Payment model.
@@ -24,14 +27,22 @@ class Reservation(BaseModel):
 
     __tablename__ = "reservation"
 
-    business_id = mapped_column(PUUID, ForeignKey("business.id"))
+    business_id = mapped_column(PUUID, ForeignKey("business.id"), index=True)
     payment_id = mapped_column(PUUID, ForeignKey("payment.id"), unique=True)
+    # Lookups by fair_id are covered by uq_reservation_fair_place
     fair_id = mapped_column(PUUID, ForeignKey("fair.id"))
-    place_id = mapped_column(PUUID, ForeignKey("place.id"))
+    place_id = mapped_column(PUUID, ForeignKey("place.id"), index=True)
+    hold_expires_at = mapped_column(DateTime, nullable=True)
+    checked_in_at = mapped_column(DateTime, nullable=True)
 
     # Unique Constraint: 1 Place per Fair per Reservation
     __table_args__ = (
         UniqueConstraint("fair_id", "place_id", name="uq_reservation_fair_place"),
+        Index(
+            "ix_reservation_unpaid_hold_expires_at",
+            "hold_expires_at",
+            postgresql_where=payment_id.is_(None),
+        ),
     )
 
     # Relationships
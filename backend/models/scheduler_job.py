@@ -0,0 +1,22 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from backend.models.base import BaseModel
+
+
+class SchedulerJob(BaseModel):
+    """
+    Last run of a leader-only scheduler job, shared by all workers.
+    Attributes:
+        __tablename__ (str): The name of the table in the database.
+        name (str): Name of the job, unique.
+        last_run_at (datetime): When a worker last started the job, in UTC database time.
+    """
+
+    __tablename__ = "scheduler_job"
+
+    name: Mapped[str] = mapped_column(String(100), unique=True)
+    last_run_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
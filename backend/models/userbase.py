@@ -1,13 +1,8 @@
 from sqlalchemy import String
-from passlib.context import CryptContext
 from sqlalchemy.orm import Mapped, mapped_column
-from hashlib import sha256
 
-from backend.core.config import settings
 from backend.models.base import BaseModel
-
-
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+from backend.services.password import hash_password_sync, verify_password_sync
 
 
 class UserBase(BaseModel):
@@ -42,21 +37,19 @@ class UserBase(BaseModel):
     def hash_password(password: str) -> str:
         """
         Hashes a password with a secret key and Argon2.
+        Blocks the calling thread, async code should use backend.services.password.hash_password.
         :param password: The plaintext password.
         :return: The hashed password.
         """
-        salted_password = sha256((password + settings.secret_key).encode()).hexdigest()
-        return pwd_context.hash(salted_password)
+        return hash_password_sync(password)
 
     @staticmethod
     def verify_password(plain_password: str, hashed_password: str) -> bool:
         """
         Verifies a plaintext password against a hashed password.
+        Blocks the calling thread, async code should use backend.services.password.verify_password.
         :param plain_password: The plaintext password.
         :param hashed_password: The hashed password.
         :return: True if the password matches, False otherwise.
         """
-        salted_password = sha256(
-            (plain_password + settings.secret_key).encode()
-        ).hexdigest()
-        return pwd_context.verify(salted_password, hashed_password)
+        return verify_password_sync(plain_password, hashed_password)
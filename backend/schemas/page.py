@@ -0,0 +1,20 @@
+from typing import Generic, Optional, TypeVar
+
+from pydantic import BaseModel
+
+ItemType = TypeVar("ItemType")
+
+
+class Page(BaseModel, Generic[ItemType]):
+    """
+    Page schema for cursor paginated list responses.
+
+    Attributes:
+        items (list): Items of the page.
+        next_cursor (str, optional): Cursor to request the next page with, None on the last page.
+        total (int, optional): Estimated number of matching items, only set when requested.
+    """
+
+    items: list[ItemType]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
@@ -1,3 +1,4 @@
+from typing import Optional
 from uuid import UUID
 from pydantic import BaseModel, EmailStr
 from pydantic_extra_types.phone_numbers import PhoneNumber
@@ -90,13 +91,14 @@ class PaymentBase(BaseModel):
         payment_invoice (PaymentInvoice): The invoice associated with the payment.
         payment_item (PaymentItem): The item associated with the payment.
         payment_status (str): The status of the payment.
+        payment_stripe_id (str): ID of the charge at Stripe.
     """
 
     # payment_client: PaymentClient
     # payment_invoice: PaymentInvoice
     # payment_item: PaymentItem
     payment_status: str
-    payment_stripe_id: int
+    payment_stripe_id: str
 
 
 class PaymentCreate(PaymentBase):
@@ -117,7 +119,7 @@ class PaymentResponse(PaymentBase):
     Attributes:
         id (UUID): Unique identifier for the payment.
         created_at (datetime): Timestamp when the payment was created.
-        reservation_id (UUID): Unique identifier for the associated reservation.
+        reservation_id (UUID, optional): Unique identifier for the associated reservation.
 
     Config:
         orm_mode (bool): Enables ORM mode for compatibility with ORMs.
@@ -125,7 +127,24 @@ class PaymentResponse(PaymentBase):
 
     id: UUID
     created_at: datetime
-    reservation_id: UUID
+    reservation_id: Optional[UUID] = None
 
     class Config:
         from_attributes = True
+
+
+class PaymentEventCreate(BaseModel):
+    """
+    Schema for queueing a payment status change.
+
+    Attributes:
+        event_id (str): ID of the event, used to drop redelivered events.
+        charge_id (str): ID of the charge at Stripe.
+        payment_status (str): Status the payment moves to.
+        occurred_at (datetime): When the change happened at Stripe.
+    """
+
+    event_id: str
+    charge_id: str
+    payment_status: str
+    occurred_at: datetime
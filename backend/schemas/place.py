@@ -1,5 +1,9 @@
+import math
+from typing import Any, Literal, Optional
 from uuid import UUID
-from pydantic import BaseModel
+from pydantic import AliasChoices, BaseModel, Field, field_validator
+
+from backend.utils.geo import format_cordinates
 
 
 class PlaceBase(BaseModel):
@@ -46,12 +50,196 @@ class PlaceResponse(PlaceBase):
 
     Attributes:
         id (UUID): Unique identifier for the place.
+        place_zona (int, optional): The zone number, None for places imported without one.
+        place_lat (float, optional): Latitude of the place.
+        place_lng (float, optional): Longitude of the place.
 
     Config:
         orm_mode (bool): Enables ORM mode for compatibility with ORMs like SQLAlchemy.
     """
 
     id: UUID
+    place_zona: Optional[int] = None
+    place_lat: Optional[float] = None
+    place_lng: Optional[float] = None
 
     class Config:
         from_attributes = True
+
+
+class NearestPlaceResponse(PlaceResponse):
+    """
+    NearestPlaceResponse schema for the place closest to a requested position.
+
+    Attributes:
+        distance_m (float): Great-circle distance from the requested position in meters.
+    """
+
+    distance_m: float
+
+
+class PlaceAvailabilityResponse(BaseModel):
+    """
+    PlaceAvailabilityResponse schema for the availability of every place of a fair.
+
+    Places are listed column-wise in a stable order. Bit i of the reserved bitset
+    (most significant bit of each byte first) tells whether the i-th place is reserved.
+
+    Attributes:
+        fair_id (UUID): Unique identifier for the fair.
+        ids (list[UUID]): Identifiers of the places.
+        cordinates (list[str]): Coordinates of the places.
+        zones (list[int | None]): Zones of the places.
+        reserved (str): Base64 encoded bitset of reserved places.
+    """
+
+    fair_id: UUID
+    ids: list[UUID]
+    cordinates: list[Optional[str]]
+    zones: list[Optional[int]]
+    reserved: str
+
+
+class PlaceTileResponse(BaseModel):
+    """
+    PlaceTileResponse schema for the places of a fair inside one XYZ map tile.
+
+    Places are listed column-wise in a stable order, the reserved bitset is encoded
+    as in PlaceAvailabilityResponse.
+
+    Attributes:
+        fair_id (UUID): Unique identifier for the fair.
+        z (int): Zoom level of the tile.
+        x (int): Column of the tile.
+        y (int): Row of the tile.
+        ids (list[UUID]): Identifiers of the places.
+        lat (list[float]): Latitudes of the places.
+        lng (list[float]): Longitudes of the places.
+        zones (list[int | None]): Zones of the places.
+        reserved (str): Base64 encoded bitset of reserved places.
+    """
+
+    fair_id: UUID
+    z: int
+    x: int
+    y: int
+    ids: list[UUID]
+    lat: list[float]
+    lng: list[float]
+    zones: list[Optional[int]]
+    reserved: str
+
+
+class PlaceFeatureProperties(BaseModel):
+    """
+    Properties of a GeoJSON place feature.
+
+    Attributes:
+        place_name (str): The name of the place, also accepted as "name".
+        place_zona (int, optional): The zone number of the place, also accepted as "zona".
+    """
+
+    place_name: str = Field(
+        min_length=1, max_length=50, validation_alias=AliasChoices("place_name", "name")
+    )
+    place_zona: Optional[int] = Field(
+        default=None, validation_alias=AliasChoices("place_zona", "zona")
+    )
+
+
+class PointGeometry(BaseModel):
+    """
+    GeoJSON Point geometry.
+
+    Attributes:
+        type (str): Always "Point".
+        coordinates (list[float]): Longitude and latitude, in this order as GeoJSON requires.
+            An optional altitude is ignored.
+    """
+
+    type: Literal["Point"]
+    coordinates: list[float] = Field(min_length=2, max_length=3)
+
+    @field_validator("coordinates")
+    @classmethod
+    def check_range(cls, coordinates: list[float]) -> list[float]:
+        lng, lat = coordinates[0], coordinates[1]
+        if not (math.isfinite(lng) and math.isfinite(lat)):
+            raise ValueError("coordinates must be finite numbers")
+        if not (-180 <= lng <= 180 and -90 <= lat <= 90):
+            raise ValueError("coordinates must be [longitude, latitude]")
+        return coordinates
+
+
+class PlaceFeature(BaseModel):
+    """
+    GeoJSON Feature describing one place.
+
+    Attributes:
+        type (str): Always "Feature".
+        geometry (PointGeometry): Position of the place.
+        properties (PlaceFeatureProperties): Name and zone of the place.
+    """
+
+    type: Literal["Feature"]
+    geometry: PointGeometry
+    properties: PlaceFeatureProperties
+
+    @property
+    def place_cordinates(self) -> str:
+        """
+        Coordinates in the "lat lng" format stored on Place.
+        """
+        return format_cordinates(self.geometry.coordinates[1], self.geometry.coordinates[0])
+
+
+class PlaceImportRequest(BaseModel):
+    """
+    GeoJSON FeatureCollection of places to import.
+
+    Features are validated one by one, so that a single invalid feature is reported
+    instead of rejecting the whole collection.
+
+    Attributes:
+        type (str): Always "FeatureCollection".
+        features (list[dict]): GeoJSON features, see PlaceFeature.
+    """
+
+    type: Literal["FeatureCollection"]
+    features: list[Any]
+
+
+class PlaceImportResult(BaseModel):
+    """
+    Outcome of importing one feature.
+
+    Attributes:
+        index (int): Position of the feature in the collection.
+        status (str): "created", "updated" or "error".
+        id (UUID, optional): Identifier of the imported place.
+        place_cordinates (str, optional): Coordinates of the place.
+        detail (str, optional): Why the feature was not imported.
+    """
+
+    index: int
+    status: Literal["created", "updated", "error"]
+    id: Optional[UUID] = None
+    place_cordinates: Optional[str] = None
+    detail: Optional[str] = None
+
+
+class PlaceImportReport(BaseModel):
+    """
+    Report of a bulk place import.
+
+    Attributes:
+        created (int): Number of new places.
+        updated (int): Number of existing places whose name or zone was updated.
+        failed (int): Number of features that were not imported.
+        results (list[PlaceImportResult]): One result per feature, in input order.
+    """
+
+    created: int
+    updated: int
+    failed: int
+    results: list[PlaceImportResult]
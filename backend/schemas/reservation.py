@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 from pydantic import BaseModel
 from datetime import datetime
@@ -40,11 +40,74 @@ class ReservationResponse(ReservationBase):
 
     Attributes:
         id (UUID): Unique identifier for the reservation.
+        hold_expires_at (datetime, optional): Until when the place is held without a payment.
+        checked_in_at (datetime, optional): When the exhibitor was checked in at the gate.
 
     Config:
         orm_mode (bool): Enables ORM mode for compatibility with ORMs.
     """
 
     id: UUID
+    hold_expires_at: Optional[datetime] = None
+    checked_in_at: Optional[datetime] = None
     class Config:
         from_attributes = True
+
+
+class CheckInScan(BaseModel):
+    """
+    One QR code scanned at the gate.
+
+    Attributes:
+        token (str): The check-in token read from the QR code.
+        scanned_at (datetime, optional): When the code was scanned, defaults to when the batch is received.
+    """
+
+    token: str
+    scanned_at: Optional[datetime] = None
+
+
+class CheckInRequest(BaseModel):
+    """
+    Batch of gate scans, e.g. everything a gate device collected since its last upload.
+
+    Attributes:
+        scans (List[CheckInScan]): The scans.
+    """
+
+    scans: List[CheckInScan]
+
+
+class CheckInResult(BaseModel):
+    """
+    Outcome of one scan.
+
+    Attributes:
+        token (str): The scanned token.
+        status (str): "checked_in", "already_checked_in", "invalid", "expired", "stale" (scanned
+            longer ago than the upload window), "unpaid" (no successful payment) or "not_found".
+        reservation_id (UUID, optional): The reservation of a validly signed token.
+        fair_id (UUID, optional): The fair of a validly signed token.
+        place_id (UUID, optional): The place of a validly signed token.
+        checked_in_at (datetime, optional): When the reservation was checked in.
+    """
+
+    token: str
+    status: str
+    reservation_id: Optional[UUID] = None
+    fair_id: Optional[UUID] = None
+    place_id: Optional[UUID] = None
+    checked_in_at: Optional[datetime] = None
+
+
+class CheckInReport(BaseModel):
+    """
+    Outcome of a batch of gate scans, in the order of the request.
+
+    Attributes:
+        checked_in (int): Reservations checked in by this batch.
+        results (List[CheckInResult]): Outcome of every scan.
+    """
+
+    checked_in: int
+    results: List[CheckInResult]
@@ -5,12 +5,17 @@ from backend.core.config import settings
 from backend.schemas.token import Token, TokenData
 from backend.db.session import get_db, AsyncSession
 from backend.crud.business import business_crud
-from backend.models.business import Business
 from backend.crud.admin import admin_crud
+from backend.services.password import verify_password
+from backend.services.principal import (
+    Principal,
+    get_principal_credentials,
+    resolve_principal,
+)
 from fastapi.security import SecurityScopes, OAuth2PasswordBearer
 from fastapi import Depends, HTTPException
 from jwt.exceptions import InvalidTokenError
-from typing import Annotated
+from typing import Annotated, Optional
 from pydantic import ValidationError
 from fastapi import status
 
@@ -82,7 +87,7 @@ async def auth_business(db: AsyncSession, email: str, password: str):
     if not business:
         return
 
-    if not Business.verify_password(
+    if not await verify_password(
         plain_password=password, hashed_password=business.password
     ):
         return
@@ -106,7 +111,7 @@ async def auth_admin(db: AsyncSession, email: str, password: str):
     if not admin:
         return
 
-    if not Business.verify_password(
+    if not await verify_password(
         plain_password=password, hashed_password=admin.password
     ):
         return
@@ -114,6 +119,28 @@ async def auth_admin(db: AsyncSession, email: str, password: str):
     return admin
 
 
+async def authenticate(db: AsyncSession, email: str, password: str) -> Optional[Principal]:
+    """
+    Authenticate an admin or business user by email and password.
+    The accounts are fetched with one query, admins taking precedence. When an email is used by
+    both an admin and a business, the business password is checked if the admin one does not match.
+    Args:
+        db (AsyncSession): The database session.
+        email (str): The email of the user.
+        password (str): The plain text password of the user.
+    Returns:
+        Principal or None: The authenticated account if the credentials are valid, otherwise None.
+    """
+
+    credentials = await get_principal_credentials(db=db, email=email)
+
+    for principal, hashed_password in credentials:
+        if await verify_password(
+            plain_password=password, hashed_password=hashed_password
+        ):
+            return principal
+
+
 async def get_current_user_email(
     security_scopes: SecurityScopes,
     token: Annotated[str, Depends(oauth2_scheme)],
@@ -156,11 +183,7 @@ async def get_current_user_email(
                 detail="Not enough permissions",
                 headers={"WWW-Authenticate": authenticate_value},
             )
-    user = await admin_crud.get_by_email(db=db, email=token_data.email)
-    if user:
-        return user.email
-
-    user = await business_crud.get_by_email(db=db, email=token_data.email)
-    if user is None:
+    principal = await resolve_principal(db=db, email=token_data.email)
+    if principal is None:
         raise credentials_exception
-    return user.email
+    return principal.email
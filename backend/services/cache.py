@@ -0,0 +1,33 @@
+from backend.core.config import settings
+from backend.utils.cache import TTLCache
+
+# Serialized /info payload, keyed by a single constant key
+exhibitors_cache: TTLCache[bytes] = TTLCache(
+    maxsize=1, ttl=settings.exhibitors_cache_ttl_seconds
+)
+
+# (ETag, serialized payload) of /fair_availability, keyed by fair name
+availability_cache: TTLCache[tuple[str, bytes]] = TTLCache(
+    maxsize=settings.availability_cache_size, ttl=settings.availability_cache_ttl_seconds
+)
+
+# (ETag, serialized payload) of /fair_tiles, keyed by (fair name, z, x, y)
+tile_cache: TTLCache[tuple[str, bytes]] = TTLCache(
+    maxsize=settings.tile_cache_size, ttl=settings.tile_cache_ttl_seconds
+)
+
+# (encoded text, ETag, image) of a reservation's QR code, keyed by (reservation id, format).
+# Not dropped with the caches below because entries are only used for the same encoded text,
+# entries of deleted reservations are dropped by an outbox handler
+qr_cache: TTLCache[tuple[str, str, bytes]] = TTLCache(
+    maxsize=settings.qr_cache_size, ttl=settings.qr_cache_ttl_seconds
+)
+
+
+def invalidate_reservation_caches() -> None:
+    """
+    Drop cached read models that depend on reservations, businesses, fairs or places.
+    """
+    exhibitors_cache.clear()
+    availability_cache.clear()
+    tile_cache.clear()
@@ -0,0 +1,159 @@
+import base64
+import calendar
+import struct
+import uuid
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey, Ed25519PublicKey
+
+from backend.core.config import settings
+
+TOKEN_VERSION = 2
+# version, reservation id, fair id, place id, expiry as unix seconds
+_CLAIMS = struct.Struct(">B16s16s16sI")
+_SIGNATURE_BYTES = 64
+
+
+class CheckinClaims(NamedTuple):
+    """
+    Claims carried by a check-in token.
+
+    Attributes:
+        reservation_id (UUID): ID of the reservation.
+        fair_id (UUID): ID of the fair.
+        place_id (UUID): ID of the reserved place.
+        expires_at (datetime): Naive UTC time after which the token is rejected.
+    """
+
+    reservation_id: uuid.UUID
+    fair_id: uuid.UUID
+    place_id: uuid.UUID
+    expires_at: datetime
+
+
+class InvalidCheckinTokenError(ValueError):
+    """
+    Raised when a check-in token is malformed or its signature does not match.
+    """
+
+
+class ExpiredCheckinTokenError(InvalidCheckinTokenError):
+    """
+    Raised when a validly signed check-in token has expired.
+    """
+
+
+class CheckinKeyError(RuntimeError):
+    """
+    Raised when the check-in key needed for an operation is not configured or malformed.
+    """
+
+
+def _raw_key(name: str, value: str) -> bytes:
+    try:
+        raw = base64.b64decode(value, validate=True)
+    except ValueError:
+        raise CheckinKeyError(f"{name} is not valid base64")
+    if len(raw) != 32:
+        raise CheckinKeyError(f"{name} must be a raw 32-byte Ed25519 key")
+    return raw
+
+
+@lru_cache
+def _signing_key(value: str) -> Ed25519PrivateKey:
+    if not value:
+        raise CheckinKeyError("CHECKIN_SIGNING_KEY is not configured")
+    return Ed25519PrivateKey.from_private_bytes(_raw_key("CHECKIN_SIGNING_KEY", value))
+
+
+@lru_cache
+def _verify_key(value: str, signing_key: str) -> Ed25519PublicKey:
+    if not value:
+        return _signing_key(signing_key).public_key()
+    return Ed25519PublicKey.from_public_bytes(_raw_key("CHECKIN_VERIFY_KEY", value))
+
+
+def generate_checkin_keys() -> tuple[str, str]:
+    """
+    Generate a new key pair for check-in tokens.
+    :return: Base64 encoded signing key and verify key, for CHECKIN_SIGNING_KEY and CHECKIN_VERIFY_KEY.
+    """
+    key = Ed25519PrivateKey.generate()
+    private = key.private_bytes(
+        serialization.Encoding.Raw, serialization.PrivateFormat.Raw, serialization.NoEncryption()
+    )
+    public = key.public_key().public_bytes(
+        serialization.Encoding.Raw, serialization.PublicFormat.Raw
+    )
+    return base64.b64encode(private).decode(), base64.b64encode(public).decode()
+
+
+def checkin_token_expiry(fair_end_day: datetime) -> datetime:
+    """
+    Expiry of the check-in tokens of a fair.
+    :param fair_end_day: Last day of the fair.
+    :return: settings.checkin_token_grace_hours after the end of that day.
+    """
+    end_of_day = datetime.combine(fair_end_day.date(), datetime.min.time()) + timedelta(days=1)
+    return end_of_day + timedelta(hours=settings.checkin_token_grace_hours)
+
+
+def issue_checkin_token(claims: CheckinClaims) -> str:
+    """
+    Sign check-in claims into a compact URL-safe token.
+    The token is 156 characters long and can be verified without a database by any holder of
+    the verify key, e.g. a gate device, which cannot issue tokens itself.
+    :param claims: The claims to sign.
+    :return: The token.
+    :raises CheckinKeyError: If settings.checkin_signing_key is not configured.
+    """
+    message = _CLAIMS.pack(
+        TOKEN_VERSION,
+        claims.reservation_id.bytes,
+        claims.fair_id.bytes,
+        claims.place_id.bytes,
+        calendar.timegm(claims.expires_at.utctimetuple()),
+    )
+    signature = _signing_key(settings.checkin_signing_key).sign(message)
+    return base64.urlsafe_b64encode(message + signature).rstrip(b"=").decode()
+
+
+def verify_checkin_token(token: str, now: Optional[datetime] = None) -> CheckinClaims:
+    """
+    Verify a check-in token and return its claims.
+    :param token: The token.
+    :param now: Naive UTC time to check the expiry against, defaults to the current time.
+    :return: The claims.
+    :raises InvalidCheckinTokenError: If the token is malformed or not signed with the check-in key.
+    :raises ExpiredCheckinTokenError: If the token has expired.
+    :raises CheckinKeyError: If neither key is configured.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+    except (ValueError, TypeError):
+        raise InvalidCheckinTokenError("Malformed check-in token")
+    if len(raw) != _CLAIMS.size + _SIGNATURE_BYTES:
+        raise InvalidCheckinTokenError("Malformed check-in token")
+
+    message, signature = raw[:_CLAIMS.size], raw[_CLAIMS.size:]
+    try:
+        _verify_key(settings.checkin_verify_key, settings.checkin_signing_key).verify(signature, message)
+    except InvalidSignature:
+        raise InvalidCheckinTokenError("Invalid check-in token signature")
+    version, reservation_id, fair_id, place_id, expires = _CLAIMS.unpack(message)
+    if version != TOKEN_VERSION:
+        raise InvalidCheckinTokenError(f"Unsupported check-in token version {version}")
+
+    claims = CheckinClaims(
+        reservation_id=uuid.UUID(bytes=reservation_id),
+        fair_id=uuid.UUID(bytes=fair_id),
+        place_id=uuid.UUID(bytes=place_id),
+        expires_at=datetime.utcfromtimestamp(expires),
+    )
+    if claims.expires_at < (now or datetime.utcnow()):
+        raise ExpiredCheckinTokenError("Check-in token has expired")
+    return claims
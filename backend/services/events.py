@@ -0,0 +1,192 @@
+import asyncio
+import json
+import uuid
+from collections import defaultdict
+from typing import Iterable, Optional
+
+import asyncpg
+from loguru import logger
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from backend.core.config import settings
+from backend.services.cache import invalidate_reservation_caches
+
+CHANNEL = "place_changes"
+# NOTIFY payloads are limited to 8000 bytes, a place id takes about 40 of them
+_PLACES_PER_NOTIFICATION = 150
+_PENDING_KEY = "pending_place_events"
+_ORIGIN = uuid.uuid4().hex
+
+
+class PlaceEventBroadcaster:
+    """
+    Fans out place state changes of a fair to the event streams of this worker.
+
+    Changes published inside a database transaction are dispatched locally once the
+    transaction commits. With settings.events_pg_notify they are also sent through
+    Postgres NOTIFY, so every other worker listening on the channel dispatches them too.
+    """
+
+    def __init__(self):
+        self._subscribers: dict[uuid.UUID, set[asyncio.Queue]] = defaultdict(set)
+        self._listener: Optional[asyncio.Task] = None
+
+    def subscribe(self, fair_id: uuid.UUID) -> asyncio.Queue:
+        """
+        Register a new subscriber for the changes of a fair.
+        :param fair_id: ID of the fair.
+        :return: Queue receiving the events of the fair.
+        """
+        queue = asyncio.Queue(maxsize=settings.events_queue_size)
+        self._subscribers[fair_id].add(queue)
+        return queue
+
+    def unsubscribe(self, fair_id: uuid.UUID, queue: asyncio.Queue) -> None:
+        """
+        Remove a subscriber registered with subscribe.
+        :param fair_id: ID of the fair.
+        :param queue: Queue returned by subscribe.
+        """
+        subscribers = self._subscribers.get(fair_id)
+        if subscribers is None:
+            return
+        subscribers.discard(queue)
+        if not subscribers:
+            del self._subscribers[fair_id]
+
+    def dispatch(self, fair_id: uuid.UUID, place_ids: list[str], reserved: bool) -> None:
+        """
+        Deliver a change to the local subscribers of a fair and drop the caches depending on it.
+        :param fair_id: ID of the fair.
+        :param place_ids: IDs of the changed places.
+        :param reserved: New reservation state of the places.
+        """
+        invalidate_reservation_caches()
+        self._put(
+            self._subscribers.get(fair_id, ()),
+            {"event": "place", "data": {"place_ids": place_ids, "reserved": reserved}},
+        )
+
+    def resync(self) -> None:
+        """
+        Ask every local subscriber to reload the full snapshot, used after events may have been missed.
+        """
+        invalidate_reservation_caches()
+        for subscribers in self._subscribers.values():
+            self._put(subscribers, {"event": "resync", "data": {}})
+
+    @staticmethod
+    def _put(subscribers: Iterable[asyncio.Queue], message: dict) -> None:
+        for queue in list(subscribers):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # A slow client lost events, make it reload the snapshot instead
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({"event": "resync", "data": {}})
+
+    def _on_notification(self, connection, pid, channel, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+            if message["o"] == _ORIGIN:
+                return
+            self.dispatch(uuid.UUID(message["f"]), message["p"], message["r"])
+        except Exception as e:
+            logger.error(f"Invalid place change notification {payload!r}: {e}")
+
+    async def _listen(self) -> None:
+        first = True
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(
+                    host=settings.db_host,
+                    port=settings.db_port,
+                    user=settings.db_user,
+                    password=settings.db_password,
+                    database=settings.db_name,
+                )
+                await connection.add_listener(CHANNEL, self._on_notification)
+                if not first:
+                    self.resync()
+                first = False
+                logger.info(f"Listening for place changes on channel {CHANNEL}")
+                while not connection.is_closed():
+                    await asyncio.sleep(settings.events_heartbeat_seconds)
+                    await connection.execute("SELECT 1")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Place change listener failed: {e}")
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            first = False
+            await asyncio.sleep(settings.events_reconnect_seconds)
+
+    def start_listener(self) -> None:
+        """
+        Start listening for changes published by other workers.
+        """
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen(), name="place-events-listener")
+
+    async def stop_listener(self) -> None:
+        """
+        Stop listening for changes published by other workers.
+        """
+        if self._listener is None:
+            return
+        self._listener.cancel()
+        await asyncio.gather(self._listener, return_exceptions=True)
+        self._listener = None
+
+
+place_events = PlaceEventBroadcaster()
+
+
+async def publish_place_changes(
+    db: AsyncSession, fair_id: uuid.UUID, place_ids: Iterable[uuid.UUID], reserved: bool
+) -> None:
+    """
+    Publish reservation state changes of places within the current transaction.
+    Nothing is delivered if the transaction is rolled back.
+    Args:
+        db (AsyncSession): The session whose transaction makes the change.
+        fair_id (UUID): ID of the fair.
+        place_ids (Iterable[UUID]): IDs of the changed places.
+        reserved (bool): New reservation state of the places.
+    """
+    place_ids = sorted({str(place_id) for place_id in place_ids})
+    if not place_ids:
+        return
+
+    db.sync_session.info.setdefault(_PENDING_KEY, []).append((fair_id, place_ids, reserved))
+
+    if not settings.events_pg_notify:
+        return
+    for start in range(0, len(place_ids), _PLACES_PER_NOTIFICATION):
+        payload = json.dumps(
+            {
+                "o": _ORIGIN,
+                "f": str(fair_id),
+                "p": place_ids[start:start + _PLACES_PER_NOTIFICATION],
+                "r": reserved,
+            },
+            separators=(",", ":"),
+        )
+        await db.execute(select(func.pg_notify(CHANNEL, payload)))
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_committed_events(session: Session) -> None:
+    for fair_id, place_ids, reserved in session.info.pop(_PENDING_KEY, ()):
+        place_events.dispatch(fair_id, place_ids, reserved)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_rolled_back_events(session: Session, previous_transaction) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,80 @@
+import csv
+import io
+import json
+import uuid
+from datetime import datetime
+from typing import Any, AsyncIterator
+
+from loguru import logger
+from sqlalchemy import Select
+
+from backend.core.config import settings
+from backend.db.session import AsyncSessionLocal
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError(f"Cannot export value of type {type(value).__name__}")
+
+
+# Spreadsheets evaluate cells starting with these characters as formulas
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _csv_cell(value: Any) -> Any:
+    if value is None:
+        return ""
+    # User-controlled text such as business names is kept as text when the file is opened in Excel
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+async def stream_export(query: Select, export_format: str) -> AsyncIterator[str]:
+    """
+    Stream the rows of a query as NDJSON lines or CSV records.
+
+    Rows are fetched from a server-side cursor in batches of settings.export_batch_size and
+    every batch is emitted as one chunk, so memory use does not grow with the size of the export.
+    The generator opens its own session because it outlives the request handler.
+    Args:
+        query (Select): Query with labelled columns, each row becomes one record.
+        export_format (str): Either "ndjson" or "csv".
+    Yields:
+        str: One chunk of the export per batch of rows, the CSV header first.
+    """
+    async with AsyncSessionLocal() as db:
+        try:
+            result = await db.stream(
+                query.execution_options(yield_per=settings.export_batch_size)
+            )
+            columns = list(result.keys())
+
+            if export_format == "csv":
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerow(columns)
+                yield buffer.getvalue()
+
+            async for rows in result.partitions():
+                if export_format == "csv":
+                    buffer.seek(0)
+                    buffer.truncate()
+                    writer.writerows([_csv_cell(value) for value in row] for row in rows)
+                    yield buffer.getvalue()
+                else:
+                    yield "".join(
+                        json.dumps(dict(zip(columns, row)), default=_json_default) + "\n"
+                        for row in rows
+                    )
+        except Exception as e:
+            logger.error(f"Export failed: {e}")
+            raise
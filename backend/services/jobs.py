@@ -0,0 +1,84 @@
+from loguru import logger
+
+from backend.core.config import settings
+from backend.crud.payment_event import payment_event_crud
+from backend.crud.reservation import reservation_crud
+from backend.db.session import AsyncSessionLocal
+from backend.services.outbox import dispatch_outbox, purge_outbox
+from backend.services.scheduler import Scheduler
+
+
+async def release_expired_holds() -> None:
+    """
+    Release reservations whose payment hold has expired.
+    """
+    async with AsyncSessionLocal() as db:
+        released = await reservation_crud.release_expired_holds(db=db)
+    if released:
+        logger.info(f"Released {released} expired reservation holds")
+
+
+async def delete_unpaid_reservations() -> None:
+    """
+    Delete reservations that stayed unpaid past the payment window.
+    """
+    async with AsyncSessionLocal() as db:
+        deleted = await reservation_crud.expired_payment_delete_reservatoin(db=db)
+    if deleted:
+        logger.info(f"Deleted {deleted} unpaid reservations")
+
+
+async def apply_payment_events() -> None:
+    """
+    Apply queued payment events in batches until the queue is drained.
+    Each run walks the queue once, deferred events are skipped and retried on the next run.
+    """
+    applied = ignored = 0
+    cursor = None
+    async with AsyncSessionLocal() as db:
+        while True:
+            batch = await payment_event_crud.apply_batch(
+                db=db, batch_size=settings.payment_event_batch_size, after=cursor
+            )
+            applied += batch.applied
+            ignored += batch.ignored
+            cursor = batch.cursor
+            if batch.fetched < settings.payment_event_batch_size:
+                break
+    if applied:
+        logger.info(f"Applied {applied} payment status changes")
+    if ignored:
+        logger.warning(f"Ignored {ignored} payment events whose charge was never recorded")
+
+
+def register_jobs(scheduler: Scheduler) -> None:
+    """
+    Register the periodic maintenance jobs of the application.
+    """
+    scheduler.add_job(
+        "release_expired_holds",
+        release_expired_holds,
+        interval=settings.reservation_hold_sweep_seconds,
+    )
+    scheduler.add_job(
+        "delete_unpaid_reservations",
+        delete_unpaid_reservations,
+        interval=settings.unpaid_cleanup_interval_seconds,
+    )
+    scheduler.add_job(
+        "apply_payment_events",
+        apply_payment_events,
+        interval=settings.payment_event_interval_seconds,
+        jitter=0,
+    )
+    scheduler.add_job(
+        "dispatch_outbox",
+        dispatch_outbox,
+        interval=settings.outbox_dispatch_interval_seconds,
+        jitter=0,
+    )
+    scheduler.add_job(
+        "purge_outbox",
+        purge_outbox,
+        interval=settings.outbox_purge_interval_seconds,
+    )
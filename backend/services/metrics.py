@@ -0,0 +1,255 @@
+import contextvars
+import time
+from bisect import bisect_left
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from backend.db.session import get_pool_stats
+
+# Upper bounds (seconds) of the request latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Upper bounds of the SQL statements per request histogram buckets
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+UNMATCHED_ROUTE = "<unmatched>"
+# Any other request method is labelled OTHER, so clients cannot create series at will
+HTTP_METHODS = frozenset(
+    ("GET", "HEAD", "POST", "PUT", "DELETE", "CONNECT", "OPTIONS", "TRACE", "PATCH")
+)
+
+Labels = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Labels, values: Labels, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_bound(bound) -> str:
+    return bound if isinstance(bound, str) else repr(float(bound))
+
+
+class Counter:
+    """
+    Monotonic counter with a fixed set of label names.
+
+    Metrics are updated from the event loop thread only, so no locking is needed.
+    """
+
+    def __init__(self, name: str, documentation: str, labels: Labels = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values: dict[Labels, float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values: str) -> float:
+        return self._values.get(label_values, 0)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for values, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, values)} {value}")
+        return lines
+
+
+class Gauge(Counter):
+    """
+    Value that can go up and down, with a fixed set of label names.
+    """
+
+    def dec(self, *label_values: str, amount: float = 1) -> None:
+        self.inc(*label_values, amount=-amount)
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class Histogram:
+    """
+    Cumulative histogram with a fixed set of label names.
+    """
+
+    def __init__(self, name: str, documentation: str, buckets: tuple[float, ...], labels: Labels = ()):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self.labels = labels
+        # Per label values: bucket counts (the last one is +Inf), sum and count
+        self._values: dict[Labels, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        entry = self._values.get(label_values)
+        if entry is None:
+            entry = self._values[label_values] = ([0] * (len(self.buckets) + 1), [0.0, 0])
+        entry[0][bisect_left(self.buckets, value)] += 1
+        entry[1][0] += value
+        entry[1][1] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for values, (counts, (total, count)) in sorted(self._values.items()):
+            running = 0
+            for bound, bucket_count in zip((*self.buckets, "+Inf"), counts):
+                running += bucket_count
+                le = f'le="{_format_bound(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, values, le)} {running}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, values)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, values)} {count}")
+        return lines
+
+
+http_requests = Counter(
+    "http_requests_total", "HTTP requests by route and status.", ("method", "route", "status")
+)
+http_request_duration = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency until the response body was sent.",
+    LATENCY_BUCKETS,
+    ("method", "route"),
+)
+http_requests_in_flight = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being handled.", ("method",)
+)
+db_statements = Counter(
+    "db_statements_total", "SQL statements executed while handling requests.", ("method", "route")
+)
+db_statements_per_request = Histogram(
+    "db_statements_per_request",
+    "SQL statements executed per HTTP request.",
+    STATEMENT_BUCKETS,
+    ("method", "route"),
+)
+db_rows = Counter(
+    "db_rows_total",
+    "Rows returned by SQL statements while handling requests, streamed results are not counted.",
+    ("method", "route"),
+)
+
+# Statements executed and rows returned by the request running in the current context.
+# SQLAlchemy runs the sync engine in a greenlet that shares the context of the awaiting task,
+# so the hooks see it.
+_statement_count: contextvars.ContextVar[Optional[list[int]]] = contextvars.ContextVar(
+    "statement_count", default=None
+)
+
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany) -> None:
+    counter = _statement_count.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+def _count_rows(conn, cursor, statement, parameters, context, executemany) -> None:
+    counter = _statement_count.get()
+    # Only statements with a result, rowcount is -1 for server-side cursors
+    if counter is not None and cursor.description is not None and cursor.rowcount > 0:
+        counter[1] += cursor.rowcount
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """
+    Count the SQL statements and returned rows of every request on this engine.
+    :param engine: Engine to instrument.
+    """
+    if not event.contains(engine.sync_engine, "before_cursor_execute", _count_statement):
+        event.listen(engine.sync_engine, "before_cursor_execute", _count_statement)
+    if not event.contains(engine.sync_engine, "after_cursor_execute", _count_rows):
+        event.listen(engine.sync_engine, "after_cursor_execute", _count_rows)
+
+
+def _render_pool() -> list[str]:
+    stats = get_pool_stats()
+    lines = []
+    for name, key, kind, documentation in (
+        ("db_pool_size", "size", "gauge", "Configured number of pooled connections."),
+        ("db_pool_checked_out", "checked_out", "gauge", "Connections currently in use."),
+        ("db_pool_overflow", "overflow", "gauge", "Connections open beyond the pool size."),
+        ("db_pool_waiters", "waiters", "gauge", "Tasks waiting for a connection."),
+        ("db_pool_timeouts_total", "timeouts", "counter", "Connection acquire timeouts."),
+        ("db_pool_errors_total", "errors", "counter", "Failed attempts to open a connection."),
+    ):
+        lines += [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}", f"{name} {stats[key]}"]
+
+    wait_time = stats["wait_time"]
+    name = "db_pool_wait_seconds"
+    lines += [f"# HELP {name} Time spent acquiring a connection.", f"# TYPE {name} histogram"]
+    for bucket in wait_time["buckets"]:
+        lines.append(f'{name}_bucket{{le="{_format_bound(bucket["le"])}"}} {bucket["count"]}')
+    lines += [f"{name}_sum {wait_time['sum']}", f"{name}_count {wait_time['count']}"]
+    return lines
+
+
+def render_metrics() -> str:
+    """
+    Render all metrics of this worker in the Prometheus text exposition format.
+    """
+    lines = []
+    for metric in (
+        http_requests,
+        http_request_duration,
+        http_requests_in_flight,
+        db_statements,
+        db_statements_per_request,
+        db_rows,
+    ):
+        lines += metric.render()
+    lines += _render_pool()
+    return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording request counts, latency, in-flight requests, SQL statements
+    and returned rows per route. Routes are labelled with their path template, not the raw
+    path, and unknown methods as OTHER, so the number of series stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"] if scope["method"] in HTTP_METHODS else "OTHER"
+        status_code = 500
+        # Statements and rows
+        statements = [0, 0]
+        token = _statement_count.set(statements)
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc(method)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - started
+            _statement_count.reset(token)
+            http_requests_in_flight.dec(method)
+
+            route = scope.get("route")
+            path = getattr(route, "path", UNMATCHED_ROUTE)
+            http_requests.inc(method, path, str(status_code))
+            http_request_duration.observe(duration, method, path)
+            db_statements.inc(method, path, amount=statements[0])
+            db_statements_per_request.observe(statements[0], method, path)
+            db_rows.inc(method, path, amount=statements[1])
@@ -0,0 +1,103 @@
+import asyncio
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable
+
+from loguru import logger
+from sqlalchemy import Row
+
+from backend.core.config import settings
+from backend.crud.outbox import OutboxFailure, outbox_crud
+from backend.db.session import AsyncSessionLocal
+
+OutboxHandler = Callable[[dict], Awaitable[object]]
+
+_handlers: dict[str, list[OutboxHandler]] = defaultdict(list)
+
+# Topics already reported as having no handler in this process
+_unhandled_topics: set[str] = set()
+
+
+def outbox_handler(topic: str) -> Callable[[OutboxHandler], OutboxHandler]:
+    """
+    Register a coroutine function as a handler of an outbox topic.
+    Delivery is at least once, so handlers must tolerate receiving the same payload again.
+    :param topic: Topic to handle.
+    :return: Decorator registering the handler.
+    """
+
+    def register(handler: OutboxHandler) -> OutboxHandler:
+        _handlers[topic].append(handler)
+        return handler
+
+    return register
+
+
+async def _deliver(message: Row, semaphore: asyncio.Semaphore) -> None:
+    handlers = _handlers.get(message.topic)
+    if not handlers:
+        if message.topic not in _unhandled_topics:
+            _unhandled_topics.add(message.topic)
+            logger.warning(
+                f"Outbox topic {message.topic} has no handler, its messages are marked delivered"
+            )
+        return
+    async with semaphore:
+        for handler in handlers:
+            await asyncio.wait_for(
+                handler(message.payload), timeout=settings.outbox_handler_timeout_seconds
+            )
+
+
+async def dispatch_outbox() -> None:
+    """
+    Deliver due outbox messages in batches until none are left.
+    Messages of a batch are delivered concurrently, up to settings.outbox_concurrency at a time.
+    Messages without handlers count as delivered, a warning is logged once per topic.
+    """
+    semaphore = asyncio.Semaphore(settings.outbox_concurrency)
+    async with AsyncSessionLocal() as db:
+        while True:
+            messages = await outbox_crud.claim(db=db, batch_size=settings.outbox_batch_size)
+            if not messages:
+                return
+
+            results = await asyncio.gather(
+                *(_deliver(message, semaphore) for message in messages), return_exceptions=True
+            )
+            delivered, failed = [], []
+            for message, result in zip(messages, results):
+                if isinstance(result, BaseException):
+                    error = repr(result)
+                    logger.warning(
+                        f"Outbox message {message.id} ({message.topic}) failed on attempt "
+                        f"{message.attempts}: {error}"
+                    )
+                    failed.append(OutboxFailure(message.id, message.attempts, error))
+                else:
+                    delivered.append(message.id)
+
+            dead = await outbox_crud.complete(db=db, delivered=delivered, failed=failed)
+            if dead:
+                logger.error(f"{dead} outbox messages exhausted their retries and were marked dead")
+            if len(messages) < settings.outbox_batch_size:
+                return
+
+
+async def purge_outbox() -> None:
+    """
+    Delete messages delivered more than settings.outbox_retention_days ago, in batches so
+    the table is not locked for long.
+    """
+    before = datetime.utcnow() - timedelta(days=settings.outbox_retention_days)
+    purged = 0
+    async with AsyncSessionLocal() as db:
+        while True:
+            deleted = await outbox_crud.purge_delivered(
+                db=db, before=before, batch_size=settings.outbox_purge_batch_size
+            )
+            purged += deleted
+            if deleted < settings.outbox_purge_batch_size:
+                break
+    if purged:
+        logger.info(f"Purged {purged} delivered outbox messages")
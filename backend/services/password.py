@@ -0,0 +1,75 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import sha256
+
+from passlib.context import CryptContext
+
+from backend.core.config import settings
+
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__rounds=settings.argon2_time_cost,
+    argon2__memory_cost=settings.argon2_memory_cost,
+    argon2__parallelism=settings.argon2_parallelism,
+)
+
+# argon2-cffi releases the GIL while hashing, so a thread pool spreads the work over all cores
+_executor = ThreadPoolExecutor(
+    max_workers=settings.password_hash_workers or os.cpu_count(),
+    thread_name_prefix="password",
+)
+
+
+def _salt_password(password: str) -> str:
+    return sha256((password + settings.secret_key).encode()).hexdigest()
+
+
+def hash_password_sync(password: str) -> str:
+    """
+    Hashes a password with a secret key and Argon2 on the calling thread.
+    :param password: The plaintext password.
+    :return: The hashed password.
+    """
+    return pwd_context.hash(_salt_password(password))
+
+
+def verify_password_sync(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verifies a plaintext password against a hashed password on the calling thread.
+    :param plain_password: The plaintext password.
+    :param hashed_password: The hashed password.
+    :return: True if the password matches, False otherwise.
+    """
+    return pwd_context.verify(_salt_password(plain_password), hashed_password)
+
+
+async def hash_password(password: str) -> str:
+    """
+    Hashes a password in the password worker pool without blocking the event loop.
+    :param password: The plaintext password.
+    :return: The hashed password.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, hash_password_sync, password)
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verifies a password in the password worker pool without blocking the event loop.
+    :param plain_password: The plaintext password.
+    :param hashed_password: The hashed password.
+    :return: True if the password matches, False otherwise.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _executor, verify_password_sync, plain_password, hashed_password
+    )
+
+
+def shutdown_password_pool() -> None:
+    """
+    Stop the password worker pool, waiting for running hashes to finish.
+    """
+    _executor.shutdown(wait=True, cancel_futures=True)
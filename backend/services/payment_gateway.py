@@ -0,0 +1,295 @@
+import asyncio
+import hashlib
+import json
+import random
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import NamedTuple, Optional
+
+import stripe
+from loguru import logger
+
+from backend.core.config import settings
+from backend.schemas.payment import PaymentEventCreate
+
+
+class ChargeResult(NamedTuple):
+    """
+    Outcome of a successful charge.
+
+    Attributes:
+        charge_id (str): ID of the charge at the payment provider.
+        status (str): Status reported by the provider, e.g. "succeeded" or "pending".
+    """
+
+    charge_id: str
+    status: str
+
+
+class PaymentGatewayError(Exception):
+    """
+    Raised when the payment provider could not be reached or failed after all retries.
+    """
+
+
+class PaymentDeclinedError(PaymentGatewayError):
+    """
+    Raised when the payment provider declined the charge. Retrying will not help.
+    """
+
+
+class InvalidWebhookError(PaymentGatewayError):
+    """
+    Raised when a webhook request is not signed by Stripe or its payload cannot be read.
+    """
+
+
+# Payment.payment_status values for the charge statuses reported by Stripe
+PAYMENT_STATUSES = {"succeeded": "success", "pending": "pending"}
+
+
+def payment_status(charge_status: str) -> str:
+    """
+    Map a Stripe charge status to the status stored on Payment.
+    :param charge_status: Status of the charge.
+    :return: "success", "pending" or "failed".
+    """
+    return PAYMENT_STATUSES.get(charge_status, "failed")
+
+
+# Payment.payment_status values for the Stripe webhook events that change a charge
+WEBHOOK_EVENT_STATUSES = {
+    "charge.pending": "pending",
+    "charge.succeeded": "success",
+    "charge.failed": "failed",
+    "charge.refunded": "refunded",
+}
+
+
+def reservation_idempotency_key(
+    reservation_id: uuid.UUID, source: str, replaces: Optional[uuid.UUID] = None
+) -> str:
+    """
+    Idempotency key of the charge of a reservation with one card, so a retried or repeated
+    request can never charge it twice. Stripe also replays declines for a key, so the card
+    is part of the key and paying with another card after a decline creates a new charge.
+    :param reservation_id: ID of the reservation.
+    :param source: Card token of the charge.
+    :param replaces: ID of the failed payment the charge replaces, so it is a new charge.
+    :return: The idempotency key.
+    """
+    card = hashlib.sha256(source.encode()).hexdigest()[:16]
+    key = f"reservation-charge-{reservation_id}-{card}"
+    return f"{key}-{replaces}" if replaces else key
+
+
+def checkout_payment_event(charge: ChargeResult) -> PaymentEventCreate:
+    """
+    Queued status change for the charge result returned at checkout. It goes through the
+    same queue as webhooks, so Stripe redelivering the same state later is a no-op.
+    :param charge: The created charge.
+    :return: The payment event.
+    """
+    return PaymentEventCreate(
+        event_id=f"checkout-{charge.charge_id}",
+        charge_id=charge.charge_id,
+        payment_status=payment_status(charge.status),
+        occurred_at=datetime.utcnow(),
+    )
+
+
+def parse_webhook(payload: bytes, signature: str) -> Optional[PaymentEventCreate]:
+    """
+    Verify a Stripe webhook request and extract the payment status change it carries.
+    :param payload: Raw request body, the signature covers these exact bytes.
+    :param signature: Value of the Stripe-Signature header.
+    :return: The payment event, or None for event types that do not change a payment.
+    :raises InvalidWebhookError: If webhooks are not configured, the signature does not match
+        or is older than settings.stripe_webhook_tolerance_seconds, or the payload is malformed.
+    """
+    if not settings.stripe_webhook_secret:
+        raise InvalidWebhookError("Stripe webhook secret is not configured")
+    try:
+        body = payload.decode("utf-8")
+        stripe.WebhookSignature.verify_header(
+            body,
+            signature,
+            settings.stripe_webhook_secret,
+            tolerance=settings.stripe_webhook_tolerance_seconds,
+        )
+        event = json.loads(body)
+        status = WEBHOOK_EVENT_STATUSES.get(event["type"])
+        if status is None:
+            return None
+        return PaymentEventCreate(
+            event_id=event["id"],
+            charge_id=event["data"]["object"]["id"],
+            payment_status=status,
+            # Stored naive in UTC like every other timestamp
+            occurred_at=datetime.fromtimestamp(event["created"], timezone.utc).replace(tzinfo=None),
+        )
+    except stripe.SignatureVerificationError as e:
+        raise InvalidWebhookError(str(e)) from e
+    except (UnicodeDecodeError, ValueError, KeyError, TypeError) as e:
+        raise InvalidWebhookError(f"Malformed webhook payload: {e}") from e
+
+
+class StripeGateway:
+    """
+    Stripe payment gateway that keeps blocking SDK calls off the event loop.
+
+    Calls run in a bounded thread pool, so a burst of payments uses at most
+    settings.payment_gateway_workers connections while other requests keep being served.
+    Network errors, rate limiting and provider errors are retried with exponential backoff.
+    The idempotency key makes the retries safe.
+    """
+
+    RETRYABLE_ERRORS = (stripe.APIConnectionError, stripe.RateLimitError, stripe.APIError)
+
+    def __init__(self):
+        self._client = stripe.StripeClient(
+            settings.stripe_api_key,
+            http_client=stripe.new_default_http_client(timeout=settings.stripe_timeout_seconds),
+            # Retries are done here, so they do not hold a worker thread while backing off
+            max_network_retries=0,
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.payment_gateway_workers, thread_name_prefix="stripe"
+        )
+
+    def _create_charge(self, amount: int, currency: str, source: str, description: str, idempotency_key: str):
+        return self._client.charges.create(
+            params={
+                "amount": amount,
+                "currency": currency,
+                "source": source,
+                "description": description,
+            },
+            options={"idempotency_key": idempotency_key},
+        )
+
+    async def charge(
+        self, amount: int, currency: str, source: str, description: str, idempotency_key: str
+    ) -> ChargeResult:
+        """
+        Charge a card.
+        Args:
+            amount (int): Amount in the smallest currency unit.
+            currency (str): Three-letter ISO currency code.
+            source (str): Card token.
+            description (str): Description shown on the charge.
+            idempotency_key (str): Key identifying the charge across retries.
+        Returns:
+            ChargeResult: The created charge.
+        Raises:
+            PaymentDeclinedError: If the card was declined or the request was rejected.
+            PaymentGatewayError: If Stripe could not be reached after all retries.
+        """
+        loop = asyncio.get_running_loop()
+        attempts = settings.stripe_max_retries + 1
+        for attempt in range(attempts):
+            try:
+                # The HTTP client enforces settings.stripe_timeout_seconds and raises APIConnectionError
+                charge = await loop.run_in_executor(
+                    self._executor,
+                    self._create_charge,
+                    amount,
+                    currency,
+                    source,
+                    description,
+                    idempotency_key,
+                )
+                return ChargeResult(charge_id=charge.id, status=charge.status)
+            except (stripe.CardError, stripe.InvalidRequestError) as e:
+                raise PaymentDeclinedError(e.user_message or str(e)) from e
+            except self.RETRYABLE_ERRORS as e:
+                if attempt == attempts - 1:
+                    raise PaymentGatewayError(f"Stripe is unavailable: {e}") from e
+                delay = settings.stripe_retry_backoff_seconds * 2 ** attempt
+                delay += random.uniform(0, delay)
+                logger.warning(
+                    f"Stripe charge {idempotency_key} failed ({e}), retrying in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+            except stripe.StripeError as e:
+                raise PaymentGatewayError(str(e)) from e
+
+    def shutdown(self) -> None:
+        """
+        Stop the worker pool, waiting for running calls to finish.
+        """
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+class FakeStripeGateway:
+    """
+    In-process stand-in for Stripe used in development and tests.
+
+    Charges succeed immediately except for Stripe's declined test token. Outcomes are
+    remembered by idempotency key like Stripe does: repeating a request returns the original
+    charge or raises the original decline, and reusing a key with other parameters is rejected.
+    """
+
+    DECLINED_SOURCE = "tok_chargeDeclined"
+
+    def __init__(self):
+        self.charges: dict[str, tuple[tuple, ChargeResult | PaymentDeclinedError]] = {}
+
+    async def charge(
+        self, amount: int, currency: str, source: str, description: str, idempotency_key: str
+    ) -> ChargeResult:
+        """
+        Charge a card, see StripeGateway.charge.
+        """
+        await asyncio.sleep(0)
+        params = (amount, currency, source, description)
+        if idempotency_key in self.charges:
+            stored_params, outcome = self.charges[idempotency_key]
+            if stored_params != params:
+                raise PaymentDeclinedError(
+                    "Keys for idempotent requests can only be used with the same parameters "
+                    "they were first used with."
+                )
+        elif source == self.DECLINED_SOURCE:
+            outcome = PaymentDeclinedError("Your card was declined.")
+            self.charges[idempotency_key] = (params, outcome)
+        else:
+            outcome = ChargeResult(charge_id=f"ch_fake_{uuid.uuid4().hex[:24]}", status="succeeded")
+            self.charges[idempotency_key] = (params, outcome)
+        if isinstance(outcome, PaymentDeclinedError):
+            raise PaymentDeclinedError(*outcome.args)
+        return outcome
+
+    def shutdown(self) -> None:
+        """
+        Nothing to release.
+        """
+
+
+_gateway: Optional[StripeGateway | FakeStripeGateway] = None
+
+
+def get_payment_gateway() -> StripeGateway | FakeStripeGateway:
+    """
+    Return the gateway selected by settings.payment_gateway, created on first use.
+    """
+    global _gateway
+    if _gateway is None:
+        if settings.payment_gateway == "stripe":
+            _gateway = StripeGateway()
+        elif settings.payment_gateway == "fake":
+            _gateway = FakeStripeGateway()
+        else:
+            raise ValueError(f"Unknown payment gateway {settings.payment_gateway}")
+    return _gateway
+
+
+def shutdown_payment_gateway() -> None:
+    """
+    Release the resources of the payment gateway if it was created.
+    """
+    global _gateway
+    if _gateway is not None:
+        _gateway.shutdown()
+        _gateway = None
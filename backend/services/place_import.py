@@ -0,0 +1,82 @@
+import uuid
+from typing import Optional
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.crud.place import place_crud
+from backend.schemas.place import (
+    PlaceFeature,
+    PlaceImportReport,
+    PlaceImportRequest,
+    PlaceImportResult,
+)
+
+
+def _validation_detail(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}" for e in error.errors()
+    )
+
+
+async def import_places(
+    db: AsyncSession, collection: PlaceImportRequest, fair_id: Optional[uuid.UUID] = None
+) -> PlaceImportReport:
+    """
+    Import the places of a GeoJSON FeatureCollection.
+    Every feature is validated on its own. Valid features are upserted by coordinates and
+    optionally assigned to a fair in one transaction, invalid ones are only reported.
+    Args:
+        db (AsyncSession): The database session.
+        collection (PlaceImportRequest): Point features with place_name and place_zona properties.
+        fair_id (UUID, optional): Fair to assign the imported places to.
+    Returns:
+        PlaceImportReport: Counts and one result per feature in input order.
+    """
+
+    results: list[Optional[PlaceImportResult]] = [None] * len(collection.features)
+    places = []
+    indexes = {}
+    for index, raw in enumerate(collection.features):
+        try:
+            feature = PlaceFeature.model_validate(raw)
+        except ValidationError as e:
+            results[index] = PlaceImportResult(
+                index=index, status="error", detail=_validation_detail(e)
+            )
+            continue
+
+        cordinates = feature.place_cordinates
+        if cordinates in indexes:
+            results[index] = PlaceImportResult(
+                index=index,
+                status="error",
+                place_cordinates=cordinates,
+                detail=f"duplicate of feature {indexes[cordinates]}",
+            )
+            continue
+        indexes[cordinates] = index
+        places.append(
+            {
+                "place_name": feature.properties.place_name,
+                "place_zona": feature.properties.place_zona,
+                "place_cordinates": cordinates,
+            }
+        )
+
+    imported = await place_crud.bulk_upsert(db=db, places=places, fair_id=fair_id) if places else {}
+    for cordinates, (place_id, created) in imported.items():
+        index = indexes[cordinates]
+        results[index] = PlaceImportResult(
+            index=index,
+            status="created" if created else "updated",
+            id=place_id,
+            place_cordinates=cordinates,
+        )
+
+    return PlaceImportReport(
+        created=sum(result.status == "created" for result in results),
+        updated=sum(result.status == "updated" for result in results),
+        failed=sum(result.status == "error" for result in results),
+        results=results,
+    )
@@ -0,0 +1,95 @@
+from typing import NamedTuple, Optional
+
+from sqlalchemy import literal, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.core.config import settings
+from backend.models.admin import Admin
+from backend.models.business import Business
+from backend.utils.cache import TTLCache
+
+
+class Principal(NamedTuple):
+    """
+    Authenticated account behind a token subject.
+
+    Attributes:
+        email (str): The email address of the account.
+        kind (str): Either "admin" or "business".
+    """
+
+    email: str
+    kind: str
+
+
+def _account_lookup(email: str, with_password: bool = False):
+    """
+    Build a single query that finds an email in the admin and business tables, admins first.
+    Without passwords only the first account is returned, with them every account using the email.
+    """
+    admin_columns = [Admin.email, literal("admin").label("kind"), literal(0).label("rank")]
+    business_columns = [Business.email, literal("business").label("kind"), literal(1).label("rank")]
+    if with_password:
+        admin_columns.append(Admin.password)
+        business_columns.append(Business.password)
+
+    query = union_all(
+        select(*admin_columns).where(Admin.email == email),
+        select(*business_columns).where(Business.email == email),
+    ).order_by("rank")
+    return query if with_password else query.limit(1)
+
+
+principal_cache: TTLCache[Principal] = TTLCache(
+    maxsize=settings.principal_cache_size,
+    ttl=settings.principal_cache_ttl_seconds,
+)
+
+
+async def resolve_principal(db: AsyncSession, email: str) -> Optional[Principal]:
+    """
+    Resolve a token subject to an account with one narrow lookup across the admin and business tables.
+    Admins take precedence when the same email exists in both tables.
+    Args:
+        db (AsyncSession): The database session.
+        email (str): The token subject.
+    Returns:
+        Principal or None: The resolved account, or None if no account uses the email.
+    """
+
+    principal = principal_cache.get(email)
+    if principal:
+        return principal
+
+    row = (await db.execute(_account_lookup(email))).first()
+    if row is None:
+        return None
+
+    principal = Principal(email=row.email, kind=row.kind)
+    principal_cache.set(email, principal)
+    return principal
+
+
+async def get_principal_credentials(
+    db: AsyncSession, email: str
+) -> list[tuple[Principal, str]]:
+    """
+    Fetch the accounts and password hashes for an email with one query, bypassing the cache.
+    Args:
+        db (AsyncSession): The database session.
+        email (str): The email to look up.
+    Returns:
+        list[tuple[Principal, str]]: Every account using the email with its password hash, admins first.
+    """
+
+    rows = (await db.execute(_account_lookup(email, with_password=True))).all()
+    return [(Principal(email=row.email, kind=row.kind), row.password) for row in rows]
+
+
+def invalidate_principal(*emails: str) -> None:
+    """
+    Drop cached principals after an account was created, changed or deleted.
+    :param emails: Emails of the affected accounts.
+    """
+    for email in emails:
+        principal_cache.invalidate(email)
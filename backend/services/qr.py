@@ -0,0 +1,75 @@
+import asyncio
+import hashlib
+import io
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import qrcode
+from qrcode.image.pil import PilImage
+from qrcode.image.svg import SvgPathImage
+
+from backend.core.config import settings
+from backend.crud.outbox import TOPIC_RESERVATION_DELETED
+from backend.services.cache import qr_cache
+from backend.services.outbox import outbox_handler
+
+# Media types of the supported image formats
+QR_FORMATS = {"png": "image/png", "svg": "image/svg+xml"}
+
+# Rendering is CPU bound, a small pool keeps it off the event loop without starving other work
+_executor = ThreadPoolExecutor(max_workers=settings.qr_render_workers, thread_name_prefix="qr")
+
+
+def render_qr_sync(data: str, image_format: str) -> bytes:
+    """
+    Render a QR code on the calling thread.
+    :param data: Text to encode.
+    :param image_format: One of QR_FORMATS.
+    :return: The encoded image.
+    """
+    qr = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_M, box_size=10, border=4)
+    qr.add_data(data)
+    qr.make(fit=True)
+    if image_format == "svg":
+        return qr.make_image(image_factory=SvgPathImage).to_string()
+    buf = io.BytesIO()
+    qr.make_image(image_factory=PilImage).save(buf, format="PNG", optimize=True)
+    return buf.getvalue()
+
+
+async def qr_image(reservation_id: uuid.UUID, data: str, image_format: str) -> tuple[str, bytes]:
+    """
+    Return the QR code of a reservation, rendered in the QR worker pool on a cache miss.
+    A cached image is only used while the reservation encodes the same text.
+    :param reservation_id: ID of the reservation the code belongs to.
+    :param data: Text to encode.
+    :param image_format: One of QR_FORMATS.
+    :return: The ETag and the encoded image.
+    """
+    key = (reservation_id, image_format)
+    cached = qr_cache.get(key)
+    if cached is None or cached[0] != data:
+        loop = asyncio.get_running_loop()
+        image = await loop.run_in_executor(_executor, render_qr_sync, data, image_format)
+        cached = (data, f'"{hashlib.sha1(image).hexdigest()}"', image)
+        qr_cache.set(key, cached)
+    return cached[1], cached[2]
+
+
+@outbox_handler(TOPIC_RESERVATION_DELETED)
+async def drop_reservation_qr(payload: dict) -> None:
+    """
+    Drop the cached QR codes of a deleted reservation. The outbox is dispatched by one worker,
+    the copies on other workers are never served for another reservation and expire with the TTL.
+    :param payload: Outbox payload of the deleted reservation.
+    """
+    reservation_id = uuid.UUID(payload["reservation_id"])
+    for image_format in QR_FORMATS:
+        qr_cache.invalidate((reservation_id, image_format))
+
+
+def shutdown_qr_pool() -> None:
+    """
+    Stop the QR worker pool, waiting for running renders to finish.
+    """
+    _executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,230 @@
+import asyncio
+import random
+import time
+import zlib
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Optional
+
+from loguru import logger
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from backend.core.config import settings
+from backend.db.session import engine
+from backend.models.scheduler_job import SchedulerJob
+
+JobFunc = Callable[[], Awaitable[object]]
+
+
+class Job:
+    """
+    Periodic job registered on the Scheduler together with its run metrics.
+
+    Attributes:
+        name (str): Unique name of the job, also used to derive its advisory lock key.
+        func (JobFunc): Coroutine function executed on every run.
+        interval (float): Seconds between two runs.
+        jitter (float): Maximum random delay in seconds added to every interval.
+        leader_only (bool): Whether a run is shared by all workers instead of done by each of them.
+    """
+
+    def __init__(self, name: str, func: JobFunc, interval: float, jitter: float, leader_only: bool):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.jitter = jitter
+        self.leader_only = leader_only
+        self.lock_key = zlib.crc32(f"scheduler:{name}".encode())
+
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+        self.running = False
+        self.last_started_at: Optional[datetime] = None
+        self.last_duration: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def stats(self) -> dict:
+        """
+        Return the job configuration and run metrics.
+        """
+        return {
+            "interval": self.interval,
+            "jitter": self.jitter,
+            "leader_only": self.leader_only,
+            "runs": self.runs,
+            "failures": self.failures,
+            "skipped": self.skipped,
+            "running": self.running,
+            "last_started_at": self.last_started_at,
+            "last_duration": self.last_duration,
+            "last_error": self.last_error,
+        }
+
+
+class Scheduler:
+    """
+    Runs periodic async jobs inside the application process.
+
+    Each job has its own task. A leader-only job runs once per interval across all workers:
+    the worker whose turn comes first claims the run by moving the job's last_run_at row
+    forward, the others find it ran less than an interval ago and count their turn as skipped.
+    A Postgres advisory lock held during the run also keeps runs longer than the interval from
+    overlapping.
+    """
+
+    def __init__(self):
+        self._jobs: dict[str, Job] = {}
+        self._tasks: list[asyncio.Task] = []
+        self._stopping = asyncio.Event()
+
+    def add_job(
+        self,
+        name: str,
+        func: JobFunc,
+        interval: float,
+        jitter: Optional[float] = None,
+        leader_only: bool = True,
+    ) -> Job:
+        """
+        Register a periodic job.
+        :param name: Unique name of the job.
+        :param func: Coroutine function executed on every run.
+        :param interval: Seconds between two runs.
+        :param jitter: Maximum random delay added to every interval, defaults to settings.scheduler_jitter_seconds.
+        :param leader_only: Whether the run is guarded by a Postgres advisory lock.
+        :return: The registered job.
+        """
+        if name in self._jobs:
+            raise ValueError(f"Job {name} is already registered")
+        job = Job(
+            name=name,
+            func=func,
+            interval=interval,
+            jitter=settings.scheduler_jitter_seconds if jitter is None else jitter,
+            leader_only=leader_only,
+        )
+        self._jobs[name] = job
+        return job
+
+    def start(self) -> None:
+        """
+        Start one task per registered job.
+        """
+        self._stopping = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._loop(job), name=f"scheduler:{job.name}")
+            for job in self._jobs.values()
+        ]
+        logger.info(f"Scheduler started with jobs: {', '.join(self._jobs) or 'none'}")
+
+    async def stop(self) -> None:
+        """
+        Stop all jobs, letting running ones finish within settings.scheduler_shutdown_timeout_seconds
+        before cancelling them.
+        """
+        if not self._tasks:
+            return
+        self._stopping.set()
+        _, pending = await asyncio.wait(
+            self._tasks, timeout=settings.scheduler_shutdown_timeout_seconds
+        )
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        self._tasks = []
+        logger.info("Scheduler stopped")
+
+    def stats(self) -> dict:
+        """
+        Return the metrics of all registered jobs.
+        """
+        return {name: job.stats() for name, job in self._jobs.items()}
+
+    async def _sleep(self, seconds: float) -> bool:
+        """
+        Sleep unless the scheduler is stopping. Returns False when it is.
+        """
+        try:
+            await asyncio.wait_for(self._stopping.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            return True
+        return False
+
+    async def _loop(self, job: Job) -> None:
+        # Stagger the first run so workers started together do not contend for the lock
+        if not await self._sleep(random.uniform(0, job.jitter)):
+            return
+        while True:
+            await self._run(job)
+            if not await self._sleep(job.interval + random.uniform(0, job.jitter)):
+                return
+
+    @staticmethod
+    async def _claim_run(conn: AsyncConnection, job: Job) -> bool:
+        """
+        Record a run of the job unless one started less than an interval ago and commit.
+        Uses the database clock, so workers with skewed clocks agree.
+        """
+        now = func.timezone("utc", func.clock_timestamp())
+        claim = pg_insert(SchedulerJob).values(name=job.name, last_run_at=now)
+        claim = claim.on_conflict_do_update(
+            index_elements=[SchedulerJob.name],
+            set_={"last_run_at": claim.excluded.last_run_at, "updated_at": datetime.utcnow()},
+            where=SchedulerJob.last_run_at.is_(None)
+            | (SchedulerJob.last_run_at <= claim.excluded.last_run_at - timedelta(seconds=job.interval)),
+        ).returning(SchedulerJob.id)
+        claimed = (await conn.execute(claim)).first() is not None
+        await conn.commit()
+        return claimed
+
+    async def _run(self, job: Job) -> None:
+        if not job.leader_only:
+            await self._execute(job)
+            return
+
+        try:
+            async with engine.connect() as conn:
+                try:
+                    acquired = await conn.scalar(select(func.pg_try_advisory_lock(job.lock_key)))
+                    await conn.commit()
+                    if not acquired:
+                        job.skipped += 1
+                        return
+                    try:
+                        if await self._claim_run(conn, job):
+                            await self._execute(job)
+                        else:
+                            job.skipped += 1
+                    finally:
+                        await conn.scalar(select(func.pg_advisory_unlock(job.lock_key)))
+                        await conn.commit()
+                except BaseException:
+                    # The advisory lock belongs to the session, never return it to the pool still held
+                    await conn.invalidate()
+                    raise
+        except Exception as e:
+            job.failures += 1
+            job.last_error = str(e)
+            logger.error(f"Scheduler run of job {job.name} failed: {e}")
+
+    @staticmethod
+    async def _execute(job: Job) -> None:
+        job.running = True
+        job.last_started_at = datetime.utcnow()
+        started = time.perf_counter()
+        try:
+            await job.func()
+            job.runs += 1
+            job.last_error = None
+        except Exception as e:
+            job.failures += 1
+            job.last_error = str(e)
+            logger.error(f"Exception occurred in scheduled job {job.name}: {e}")
+        finally:
+            job.running = False
+            job.last_duration = time.perf_counter() - started
+
+
+scheduler = Scheduler()
@@ -0,0 +1,71 @@
+import time
+from collections import OrderedDict
+from typing import Any, Generic, Hashable, Optional, TypeVar
+
+ValueType = TypeVar("ValueType")
+
+_MISSING = object()
+
+
+class TTLCache(Generic[ValueType]):
+    """
+    Bounded in-process cache with per-entry time to live and LRU eviction.
+
+    The cache is local to a worker process and is meant to be used from the
+    event loop thread only.
+
+    Attributes:
+        maxsize (int): Maximum number of entries kept before evicting the least recently used one.
+        ttl (float): Number of seconds an entry stays valid.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, ValueType]] = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Optional[ValueType]:
+        """
+        Return a cached value or default when it is missing or expired.
+        :param key: Cache key.
+        :param default: Value returned on a miss.
+        :return: Cached value or default.
+        """
+        item = self._data.get(key, _MISSING)
+        if item is _MISSING:
+            return default
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: ValueType) -> None:
+        """
+        Store a value, evicting the least recently used entries when full.
+        :param key: Cache key.
+        :param value: Value to store.
+        """
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        """
+        Remove a single entry if present.
+        :param key: Cache key.
+        """
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Remove all entries.
+        """
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,131 @@
+import json
+import math
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+EARTH_RADIUS_M = 6371008.8
+
+Ring = list[tuple[float, float]]
+
+
+def parse_cordinates(place_cordinates: Optional[str]) -> Optional[tuple[float, float]]:
+    """
+    Parse coordinates stored in the "lat lng" format of Place.place_cordinates.
+    :param place_cordinates: Coordinates string.
+    :return: (lat, lng) or None if the string is not a valid position.
+    """
+    if not place_cordinates:
+        return None
+    parts = place_cordinates.split()
+    if len(parts) != 2:
+        return None
+    try:
+        lat, lng = float(parts[0]), float(parts[1])
+    except ValueError:
+        return None
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return None
+    return lat, lng
+
+
+def format_cordinates(lat: float, lng: float) -> str:
+    """
+    Format a position in the "lat lng" format of Place.place_cordinates.
+    """
+    return f"{lat} {lng}"
+
+
+def haversine_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """
+    Great-circle distance between two positions in meters.
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def bounding_box(lat: float, lng: float, radius_m: float) -> tuple[float, float, float, float]:
+    """
+    Smallest latitude/longitude box containing the circle of radius_m around a position.
+    :return: (min_lat, min_lng, max_lat, max_lng), clamped to valid ranges.
+    """
+    dlat = math.degrees(radius_m / EARTH_RADIUS_M)
+    cos_lat = max(math.cos(math.radians(lat)), 1e-6)
+    dlng = min(math.degrees(radius_m / (EARTH_RADIUS_M * cos_lat)), 180.0)
+    return (
+        max(lat - dlat, -90.0),
+        max(lng - dlng, -180.0),
+        min(lat + dlat, 90.0),
+        min(lng + dlng, 180.0),
+    )
+
+
+def tile_bounds(z: int, x: int, y: int) -> tuple[float, float, float, float]:
+    """
+    Latitude/longitude bounds of a Web Mercator (XYZ) map tile.
+    :return: (min_lat, min_lng, max_lat, max_lng).
+    """
+    n = 2 ** z
+
+    def lat(tile_y: int) -> float:
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * tile_y / n))))
+
+    return lat(y + 1), x / n * 360.0 - 180.0, lat(y), (x + 1) / n * 360.0 - 180.0
+
+
+def _in_ring(lng: float, lat: float, ring: Ring) -> bool:
+    # Ray casting on [lng, lat] vertices, the closing vertex may or may not repeat the first one
+    inside = False
+    j = len(ring) - 1
+    for i in range(len(ring)):
+        xi, yi = ring[i]
+        xj, yj = ring[j]
+        if (yi > lat) != (yj > lat) and lng < (xj - xi) * (lat - yi) / (yj - yi) + xi:
+            inside = not inside
+        j = i
+    return inside
+
+
+def point_in_polygons(lat: float, lng: float, polygons: list[list[Ring]]) -> bool:
+    """
+    Check whether a position lies inside any of the polygons.
+    :param polygons: Polygons as GeoJSON rings of [lng, lat], the first ring is the outer one,
+        the others are holes.
+    """
+    for rings in polygons:
+        if rings and _in_ring(lng, lat, rings[0]) and not any(
+            _in_ring(lng, lat, hole) for hole in rings[1:]
+        ):
+            return True
+    return False
+
+
+@lru_cache(maxsize=4)
+def load_boundary(path: Path) -> list[list[Ring]]:
+    """
+    Load the Polygon and MultiPolygon geometries of a GeoJSON file.
+    :param path: Path to a GeoJSON FeatureCollection, Feature or geometry.
+    :return: Polygons as lists of rings.
+    :raises OSError: If the file cannot be read.
+    :raises ValueError: If the file contains no polygon.
+    """
+    data = json.loads(Path(path).read_text())
+    if data.get("type") == "FeatureCollection":
+        geometries = [feature.get("geometry") or {} for feature in data.get("features", [])]
+    elif data.get("type") == "Feature":
+        geometries = [data.get("geometry") or {}]
+    else:
+        geometries = [data]
+
+    polygons = []
+    for geometry in geometries:
+        if geometry.get("type") == "Polygon":
+            polygons.append(geometry["coordinates"])
+        elif geometry.get("type") == "MultiPolygon":
+            polygons.extend(geometry["coordinates"])
+    if not polygons:
+        raise ValueError(f"{path} contains no polygon")
+    return [[[(float(x), float(y)) for x, y, *_ in ring] for ring in rings] for rings in polygons]
@@ -0,0 +1,61 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Sequence
+
+
+class InvalidPageQueryError(ValueError):
+    """
+    Raised when a page is requested with a filter, sort field or cursor that is not allowed.
+    """
+
+
+class InvalidCursorError(InvalidPageQueryError):
+    """
+    Raised when a pagination cursor cannot be decoded.
+    """
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, uuid.UUID):
+        return {"uuid": str(value)}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "uuid" in value:
+            return uuid.UUID(value["uuid"])
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Encode the sort key of the last row of a page into an opaque cursor.
+    :param values: Sort key values, usually ending with the row id.
+    :return: URL-safe cursor string.
+    """
+    raw = json.dumps([_encode_value(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list[Any]:
+    """
+    Decode a cursor produced by encode_cursor.
+    :param cursor: Cursor string.
+    :return: Sort key values.
+    :raises InvalidCursorError: If the cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list):
+            raise ValueError("cursor must encode a list")
+        return [_decode_value(value) for value in values]
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError(str(e)) from e
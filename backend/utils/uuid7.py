@@ -0,0 +1,48 @@
+import os
+import threading
+import time
+import uuid
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+_COUNTER_BITS = 12
+_COUNTER_MAX = (1 << _COUNTER_BITS) - 1
+
+
+def uuid7() -> uuid.UUID:
+    """
+    Generate a time-ordered UUID version 7 (RFC 9562).
+
+    The first 48 bits hold the Unix time in milliseconds, so new ids are appended to the
+    right edge of a B-tree index instead of landing on random pages. Ids generated within
+    the same millisecond stay monotonic in this process through a 12 bit counter stored in
+    rand_a, which starts from a random value every millisecond. The remaining 62 bits are random.
+    :return: The generated UUID.
+    """
+    global _last_ms, _counter
+
+    with _lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms > _last_ms:
+            _last_ms = now_ms
+            # Leave headroom so a burst within one millisecond rarely exhausts the counter
+            _counter = int.from_bytes(os.urandom(2), "big") & (_COUNTER_MAX >> 1)
+        else:
+            _counter += 1
+            if _counter > _COUNTER_MAX:
+                # Counter exhausted or clock went backwards, borrow the next millisecond
+                _last_ms += 1
+                _counter = 0
+        timestamp, counter = _last_ms, _counter
+
+    rand_b = int.from_bytes(os.urandom(8), "big") & ((1 << 62) - 1)
+    value = (
+        (timestamp & ((1 << 48) - 1)) << 80
+        | 0x7 << 76
+        | counter << 64
+        | 0b10 << 62
+        | rand_b
+    )
+    return uuid.UUID(int=value)
@@ -0,0 +1,163 @@
+"""
+Benchmark reservation claims under contention.
+
+Runs --claims concurrent create_reservation calls, spread over --places places of one
+fair, against the database configured in .env. With the default single place every claim
+races for the same slot: exactly one is created and the rest must be reported as taken.
+
+Usage:
+    python scripts/bench_reservations.py --claims 500 --concurrency 50 --places 1
+
+The script creates its own fair, places and businesses and deletes them afterwards.
+Use --create-schema against a scratch database that has not been migrated.
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import delete, insert  # noqa: E402
+
+from backend.crud.outbox import TOPIC_RESERVATION_CREATED  # noqa: E402
+from backend.crud.reservation import reservation_crud  # noqa: E402
+from backend.db.session import AsyncSessionLocal, engine  # noqa: E402
+from backend.models import Business, Fair, OutboxMessage, Place, Reservation  # noqa: E402
+from backend.models.base import BaseModel, fair_place_association  # noqa: E402
+from backend.utils.uuid7 import uuid7  # noqa: E402
+
+
+async def setup(run_id: str, places: int, businesses: int) -> tuple[uuid.UUID, list[str], list[str]]:
+    now = datetime.utcnow()
+    fair_id = uuid7()
+    place_rows = [
+        {
+            "id": uuid7(),
+            "place_name": f"bench {i}",
+            "place_cordinates": f"48.{i:06d} 20.{run_id}",
+            "place_lat": float(f"48.{i:06d}"),
+            "place_lng": float(f"20.{run_id}"),
+        }
+        for i in range(places)
+    ]
+    business_rows = [
+        {
+            "id": uuid7(),
+            "email": f"bench-{run_id}-{i}@example.com",
+            "password": "-",
+            "business_name": f"bench {i}",
+            "phone": "+421900000000",
+        }
+        for i in range(businesses)
+    ]
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            insert(Fair).values(
+                id=fair_id, name=f"bench-{run_id}", start_day=now, end_day=now + timedelta(days=1)
+            )
+        )
+        await db.execute(insert(Place), place_rows)
+        await db.execute(insert(Business), business_rows)
+        await db.execute(
+            insert(fair_place_association),
+            [{"fair_id": fair_id, "place_id": row["id"]} for row in place_rows],
+        )
+        await db.commit()
+    return (
+        fair_id,
+        [row["place_cordinates"] for row in place_rows],
+        [row["email"] for row in business_rows],
+    )
+
+
+async def teardown(fair_id: uuid.UUID, run_id: str) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            delete(OutboxMessage).where(
+                OutboxMessage.topic == TOPIC_RESERVATION_CREATED,
+                OutboxMessage.payload["fair_id"].astext == str(fair_id),
+            )
+        )
+        await db.execute(delete(Reservation).where(Reservation.fair_id == fair_id))
+        await db.execute(
+            delete(fair_place_association).where(fair_place_association.c.fair_id == fair_id)
+        )
+        await db.execute(delete(Place).where(Place.place_cordinates.like(f"% 20.{run_id}")))
+        await db.execute(delete(Business).where(Business.email.like(f"bench-{run_id}-%")))
+        await db.execute(delete(Fair).where(Fair.id == fair_id))
+        await db.commit()
+
+
+async def run(args: argparse.Namespace) -> None:
+    if args.create_schema:
+        async with engine.begin() as conn:
+            await conn.run_sync(BaseModel.metadata.create_all)
+
+    # Digits only, so it can form the longitude of the benchmark places
+    run_id = f"{uuid.uuid4().int % 10 ** 8:08d}"
+    fair_id, places, businesses = await setup(run_id, args.places, args.claims)
+    fair_name = f"bench-{run_id}"
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies = []
+    outcomes = Counter()
+    errors = []
+
+    async def claim(index: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            async with AsyncSessionLocal() as db:
+                try:
+                    result = await reservation_crud.create_reservation(
+                        db=db,
+                        business=businesses[index],
+                        place=places[index % len(places)],
+                        fair=fair_name,
+                    )
+                    outcomes[result.status] += 1
+                except Exception as e:
+                    outcomes[f"error: {type(e).__name__}"] += 1
+                    errors.append(e)
+            latencies.append(time.perf_counter() - started)
+
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*(claim(index) for index in range(args.claims)))
+        elapsed = time.perf_counter() - started
+    finally:
+        await teardown(fair_id, run_id)
+        await engine.dispose()
+
+    latencies.sort()
+    print(f"claims:      {args.claims} on {args.places} place(s), concurrency {args.concurrency}")
+    print(f"elapsed:     {elapsed:.3f}s")
+    print(f"throughput:  {args.claims / elapsed:.1f} claims/s")
+    print(f"latency p50: {statistics.median(latencies) * 1000:.1f}ms")
+    print(f"latency p99: {latencies[int(len(latencies) * 0.99) - 1] * 1000:.1f}ms")
+    for status, count in sorted(outcomes.items()):
+        print(f"{status + ':':<12} {count}")
+    if errors:
+        print(f"first error: {errors[0]}", file=sys.stderr)
+    if outcomes["created"] != min(args.places, args.claims):
+        print("unexpected number of created reservations", file=sys.stderr)
+        sys.exit(1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--claims", type=int, default=500, help="number of claims to run")
+    parser.add_argument("--concurrency", type=int, default=50, help="claims in flight at once")
+    parser.add_argument("--places", type=int, default=1, help="places the claims are spread over")
+    parser.add_argument(
+        "--create-schema", action="store_true", help="create missing tables before running"
+    )
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
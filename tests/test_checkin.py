@@ -0,0 +1,118 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.core.config import settings
+from backend.services.checkin import (
+    CheckinClaims,
+    CheckinKeyError,
+    ExpiredCheckinTokenError,
+    InvalidCheckinTokenError,
+    generate_checkin_keys,
+    issue_checkin_token,
+    verify_checkin_token,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+def _claims(reservation_id: uuid.UUID = None, expires_at: datetime = None) -> CheckinClaims:
+    return CheckinClaims(
+        reservation_id=reservation_id or uuid.uuid4(),
+        fair_id=uuid.uuid4(),
+        place_id=uuid.uuid4(),
+        expires_at=expires_at or datetime(2030, 1, 1),
+    )
+
+
+@pytest.fixture
+def gate_keys(monkeypatch):
+    """
+    Issue tokens with a fresh key pair, then keep only the verify key like a gate device.
+    """
+    signing_key, verify_key = generate_checkin_keys()
+    monkeypatch.setattr(settings, "checkin_signing_key", signing_key)
+    monkeypatch.setattr(settings, "checkin_verify_key", verify_key)
+
+    def to_gate():
+        monkeypatch.setattr(settings, "checkin_signing_key", "")
+
+    return to_gate
+
+
+def test_gate_verifies_with_public_key_only(gate_keys):
+    claims = _claims()
+    token = issue_checkin_token(claims)
+    gate_keys()
+
+    assert verify_checkin_token(token) == claims
+    with pytest.raises(CheckinKeyError):
+        issue_checkin_token(claims)
+
+
+def test_tampered_token_is_rejected(gate_keys):
+    token = issue_checkin_token(_claims())
+    tampered = token[:10] + ("A" if token[10] != "A" else "B") + token[11:]
+
+    with pytest.raises(InvalidCheckinTokenError):
+        verify_checkin_token(tampered)
+
+
+def test_token_of_other_key_is_rejected(gate_keys):
+    token = issue_checkin_token(_claims())
+    other_signing_key, _ = generate_checkin_keys()
+    settings.checkin_signing_key = other_signing_key
+    settings.checkin_verify_key = ""
+
+    with pytest.raises(InvalidCheckinTokenError):
+        verify_checkin_token(token)
+
+
+def test_expired_token_is_rejected(gate_keys):
+    token = issue_checkin_token(_claims(expires_at=datetime(2020, 1, 1)))
+
+    with pytest.raises(ExpiredCheckinTokenError):
+        verify_checkin_token(token)
+
+
+async def test_check_in_rejects_stale_scan_time(client, reservation):
+    token = issue_checkin_token(
+        _claims(reservation_id=reservation.id, expires_at=datetime.utcnow() - timedelta(hours=1))
+    )
+    # An expired token replayed with a scan time from before its expiry
+    scanned_at = datetime.utcnow() - timedelta(hours=settings.checkin_max_scan_age_hours + 2)
+
+    response = await client.post(
+        "/check_in", json={"scans": [{"token": token, "scanned_at": scanned_at.isoformat()}]}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["results"][0]["status"] == "stale"
+    assert response.json()["checked_in"] == 0
+
+
+async def test_check_in_accepts_recent_scan(client, paid_reservation):
+    token = issue_checkin_token(_claims(reservation_id=paid_reservation.id))
+    scanned_at = datetime.utcnow() - timedelta(minutes=5)
+
+    response = await client.post(
+        "/check_in", json={"scans": [{"token": token, "scanned_at": scanned_at.isoformat()}]}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["results"][0]["status"] == "checked_in"
+
+
+async def test_check_in_rejects_unpaid_reservation(client, reservation):
+    token = issue_checkin_token(_claims(reservation_id=reservation.id))
+
+    response = await client.post("/check_in", json={"scans": [{"token": token}]})
+
+    assert response.status_code == 200
+    assert response.json()["results"][0]["status"] == "unpaid"
+    assert response.json()["checked_in"] == 0
+
+
+async def test_qr_code_is_only_issued_for_paid_reservation(client, reservation):
+    assert (await client.get("/generate_qr_code")).status_code == 404
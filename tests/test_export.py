@@ -0,0 +1,33 @@
+import csv
+import io
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from backend.crud.reservation import reservation_crud
+from backend.models import Business
+from backend.services import export
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize(
+    "business_name", ["=HYPERLINK(\"http://evil\")", "+1+1", "-2", "@SUM(A1)", "\tTab", "\rCR"]
+)
+async def test_csv_export_neutralizes_formulas(db, db_engine, reservation, monkeypatch, business_name):
+    monkeypatch.setattr(
+        export, "AsyncSessionLocal", sessionmaker(db_engine, expire_on_commit=False, class_=AsyncSession)
+    )
+    await db.execute(update(Business).values(business_name=business_name))
+    await db.commit()
+
+    chunks = [
+        chunk
+        async for chunk in export.stream_export(reservation_crud.exhibitors_export_query(), "csv")
+    ]
+
+    rows = list(csv.DictReader(io.StringIO("".join(chunks))))
+    assert rows[0]["business_name"] == "'" + business_name
+    assert rows[0]["email"] == "stanok@example.com"
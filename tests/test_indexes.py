@@ -0,0 +1,94 @@
+"""
+The hot lookups over associations and reservations must be served by an index.
+
+Sequential and bitmap scans are disabled, so the planner falls back to one only when no
+usable index exists, which is what these tests catch.
+"""
+import json
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import selectinload
+
+from backend.crud.business import business_crud
+from backend.crud.fair import fair_crud
+from backend.crud.place import place_crud
+from backend.crud.reservation import reservation_crud
+from backend.models import Place
+
+pytestmark = pytest.mark.anyio
+
+INDEX_SCANS = {"Index Scan", "Index Only Scan"}
+
+
+def _plan_nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", ()):
+        yield from _plan_nodes(child)
+
+
+async def _explain(db, statement: str, parameters) -> list[dict]:
+    await db.execute(text("SET LOCAL enable_seqscan = off"))
+    await db.execute(text("SET LOCAL enable_bitmapscan = off"))
+    conn = await db.connection()
+    result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    await db.rollback()
+    return list(_plan_nodes(plan[0]["Plan"]))
+
+
+def _find(statements, fragment: str):
+    matches = [(sql, params) for sql, params in statements.statements if fragment in sql]
+    assert matches, f"no statement containing {fragment!r} in {statements.statements}"
+    return matches[-1]
+
+
+def _assert_index_scan(nodes: list[dict], table: str, index: str) -> None:
+    scans = [node for node in nodes if node.get("Relation Name") == table]
+    assert scans, f"{table} is not scanned: {nodes}"
+    assert any(
+        node["Node Type"] in INDEX_SCANS and node.get("Index Name") == index for node in scans
+    ), f"{table} is not scanned with {index}: {[(n['Node Type'], n.get('Index Name')) for n in scans]}"
+
+
+async def test_fair_places_use_association_primary_key(db, reservation, statements):
+    statements.clear()
+    assert await fair_crud.get_places(db=db, fair_name="Jarmok")
+    sql, params = _find(statements, "WHERE fair_1.id IN")
+
+    nodes = await _explain(db, sql, params)
+    _assert_index_scan(nodes, "fair_place_association", "fair_place_association_pkey")
+
+
+async def test_place_fairs_use_reverse_association_index(db, reservation, statements):
+    statements.clear()
+    place = await place_crud.get_by_id(
+        db=db, obj_id=reservation.place_id, load=(selectinload(Place.fairs),)
+    )
+    assert place.fairs
+    sql, params = _find(statements, "WHERE place_1.id IN")
+
+    nodes = await _explain(db, sql, params)
+    _assert_index_scan(
+        nodes, "fair_place_association", "ix_fair_place_association_place_id_fair_id"
+    )
+
+
+async def test_reservations_by_business_use_index(db, reservation, statements):
+    statements.clear()
+    assert await business_crud.get_latest_reservation(db=db, email="stanok@example.com")
+    sql, params = _find(statements, "FROM reservation JOIN business")
+
+    nodes = await _explain(db, sql, params)
+    _assert_index_scan(nodes, "reservation", "ix_reservation_business_id")
+
+
+async def test_reservations_by_place_use_index(db, reservation, statements):
+    statements.clear()
+    await reservation_crud.delete_reservation(db=db, reservation_id=reservation.id)
+    sql, params = _find(statements, "UPDATE place SET place_reservated")
+
+    nodes = await _explain(db, sql, params)
+    _assert_index_scan(nodes, "reservation", "ix_reservation_place_id")
@@ -0,0 +1,38 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from backend.services.metrics import MetricsMiddleware, http_requests
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def metrics_client():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/items/{id}")
+    async def item(id: int):
+        return {"id": id}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+async def test_unknown_method_is_labelled_other(metrics_client):
+    before = http_requests.value("OTHER", "/items/{id}", "405")
+    response = await metrics_client.request("FOO", "/items/3")
+
+    assert response.status_code == 405
+    assert http_requests.value("OTHER", "/items/{id}", "405") == before + 1
+    assert http_requests.value("FOO", "/items/{id}", "405") == 0
+
+
+async def test_standard_method_keeps_its_label(metrics_client):
+    before = http_requests.value("GET", "/items/{id}", "200")
+    response = await metrics_client.get("/items/3")
+
+    assert response.status_code == 200
+    assert http_requests.value("GET", "/items/{id}", "200") == before + 1
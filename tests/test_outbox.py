@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from backend.core.config import settings
+from backend.crud.outbox import OUTBOX_DEAD, OUTBOX_DELIVERED, OUTBOX_PENDING, outbox_crud
+from backend.crud.reservation import reservation_crud
+from backend.models.outbox import OutboxMessage
+from backend.services import outbox
+from backend.services.cache import qr_cache
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def session_factory(db_engine, monkeypatch):
+    monkeypatch.setattr(
+        outbox, "AsyncSessionLocal", sessionmaker(db_engine, expire_on_commit=False, class_=AsyncSession)
+    )
+
+
+def _message(status: str, delivered_days_ago: float = None) -> dict:
+    delivered_at = None
+    if delivered_days_ago is not None:
+        delivered_at = datetime.utcnow() - timedelta(days=delivered_days_ago)
+    return {"topic": "test.topic", "payload": {}, "status": status, "delivered_at": delivered_at}
+
+
+async def test_purge_deletes_only_expired_delivered_messages(db, session_factory, monkeypatch):
+    monkeypatch.setattr(settings, "outbox_retention_days", 7)
+    monkeypatch.setattr(settings, "outbox_purge_batch_size", 2)
+    await db.execute(
+        insert(OutboxMessage),
+        [_message(OUTBOX_DELIVERED, 8) for _ in range(5)]
+        + [_message(OUTBOX_DELIVERED, 1), _message(OUTBOX_PENDING), _message(OUTBOX_DEAD)],
+    )
+    await db.commit()
+
+    await outbox.purge_outbox()
+
+    result = await db.execute(select(OutboxMessage.status, OutboxMessage.delivered_at))
+    remaining = result.all()
+    assert len(remaining) == 3
+    assert all(
+        delivered_at is None or delivered_at > datetime.utcnow() - timedelta(days=7)
+        for _, delivered_at in remaining
+    )
+
+
+async def test_stats_counts_pending_and_dead(db):
+    await db.execute(
+        insert(OutboxMessage),
+        [_message(OUTBOX_PENDING), _message(OUTBOX_PENDING), _message(OUTBOX_DEAD)]
+        + [_message(OUTBOX_DELIVERED, 1)],
+    )
+    await db.commit()
+
+    stats = await outbox_crud.stats(db=db)
+
+    assert stats[OUTBOX_PENDING] == 2
+    assert stats[OUTBOX_DEAD] == 1
+    assert stats["oldest_pending_at"] is not None
+
+
+async def test_unhandled_topic_is_reported(db, session_factory, monkeypatch):
+    warnings = []
+    monkeypatch.setattr(outbox, "_unhandled_topics", set())
+    monkeypatch.setattr(outbox.logger, "warning", warnings.append)
+    await outbox_crud.add(db=db, topic="test.unhandled", payloads=[{}, {}])
+    await db.commit()
+
+    await outbox.dispatch_outbox()
+
+    assert len(warnings) == 1
+    assert "test.unhandled" in warnings[0]
+    stats = await outbox_crud.stats(db=db)
+    assert stats[OUTBOX_PENDING] == 0
+
+
+async def test_reservation_deleted_drops_cached_qr_code(
+    client, db, paid_reservation, session_factory
+):
+    assert (await client.get("/generate_qr_code", params={"format": "svg"})).status_code == 200
+    assert qr_cache.get((paid_reservation.id, "svg")) is not None
+
+    await reservation_crud.delete_reservation(db=db, reservation_id=paid_reservation.id)
+    await outbox.dispatch_outbox()
+
+    assert qr_cache.get((paid_reservation.id, "svg")) is None
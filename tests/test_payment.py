@@ -0,0 +1,101 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from backend.crud.reservation import reservation_crud
+from backend.db.session import get_db
+from backend.main import app
+from backend.models import Payment, Reservation
+from backend.services.payment_gateway import get_payment_gateway
+
+pytestmark = pytest.mark.anyio
+
+PAY = {"amount": 5000, "currency": "eur", "token": "tok_visa"}
+
+
+@pytest.fixture
+def sessions(db_engine, client):
+    """
+    Give every request its own session, like in production, so concurrent requests race.
+    """
+    factory = sessionmaker(db_engine, expire_on_commit=False, class_=AsyncSession)
+
+    async def override_get_db():
+        async with factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    return factory
+
+
+async def _payments(db) -> int:
+    return await db.scalar(select(func.count()).select_from(Payment))
+
+
+async def test_concurrent_payments_record_one_payment(client, sessions, reservation, db):
+    first, second = await asyncio.gather(
+        client.post("/pay", params=PAY), client.post("/pay", params=PAY)
+    )
+
+    assert sorted([first.status_code, second.status_code]) == [200, 409]
+    assert await _payments(db) == 1
+
+
+async def test_hold_sweep_skips_reservation_being_paid(
+    client, sessions, reservation, db, monkeypatch
+):
+    async with sessions() as session:
+        await session.execute(
+            update(Reservation)
+            .where(Reservation.id == reservation.id)
+            .values(hold_expires_at=datetime.utcnow() - timedelta(minutes=1))
+        )
+        await session.commit()
+
+    gateway = get_payment_gateway()
+    charge = gateway.charge
+    released = []
+
+    async def charge_while_sweeping(**kwargs):
+        async with sessions() as session:
+            released.append(await reservation_crud.release_expired_holds(db=session))
+        return await charge(**kwargs)
+
+    monkeypatch.setattr(gateway, "charge", charge_while_sweeping)
+    response = await client.post("/pay", params=PAY)
+
+    assert response.status_code == 200, response.text
+    assert released == [0]
+    reservation = await db.get(Reservation, reservation.id)
+    assert reservation.payment_id is not None
+    assert reservation.hold_expires_at is None
+
+
+async def test_failed_payment_can_be_replaced(client, sessions, reservation, db):
+    response = await client.post("/pay", params=PAY)
+    assert response.status_code == 200, response.text
+    failed_charge = response.json()["charge_id"]
+    await db.execute(update(Payment).values(payment_status="failed"))
+    await db.commit()
+
+    response = await client.post("/pay", params=PAY)
+
+    assert response.status_code == 200, response.text
+    assert response.json()["charge_id"] != failed_charge
+    reservation = await db.get(Reservation, reservation.id)
+    payment = await db.get(Payment, reservation.payment_id)
+    assert payment.payment_status == "pending"
+    assert await _payments(db) == 2
+
+
+async def test_pending_payment_blocks_another(client, sessions, reservation):
+    assert (await client.post("/pay", params=PAY)).status_code == 200
+
+    response = await client.post("/pay", params={**PAY, "token": "tok_mastercard"})
+
+    assert response.status_code == 409
@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from backend.core.config import settings
+from backend.crud.payment_event import payment_event_crud
+from backend.models.payment import Payment
+from backend.models.payment_event import PaymentEvent
+from backend.schemas.payment import PaymentEventCreate
+from backend.services import jobs
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def drain(db_engine, monkeypatch):
+    monkeypatch.setattr(
+        jobs, "AsyncSessionLocal", sessionmaker(db_engine, expire_on_commit=False, class_=AsyncSession)
+    )
+    monkeypatch.setattr(settings, "payment_event_batch_size", 2)
+    monkeypatch.setattr(settings, "payment_event_max_attempts", 3)
+    return jobs.apply_payment_events
+
+
+async def _enqueue(db, event_id: str, charge_id: str, payment_status: str, occurred_at: datetime):
+    await payment_event_crud.enqueue(
+        db=db,
+        event_in=PaymentEventCreate(
+            event_id=event_id,
+            charge_id=charge_id,
+            payment_status=payment_status,
+            occurred_at=occurred_at,
+        ),
+    )
+
+
+async def _events(db) -> dict[str, PaymentEvent]:
+    result = await db.execute(select(PaymentEvent).execution_options(populate_existing=True))
+    return {event.event_id: event for event in result.scalars()}
+
+
+async def test_deferred_events_do_not_block_the_queue(db, drain):
+    start = datetime.utcnow() - timedelta(minutes=1)
+    db.add(Payment(payment_status="pending", payment_stripe_id="ch_known"))
+    # A full batch of events for an unknown charge sits at the head of the queue
+    await _enqueue(db, "evt_1", "ch_unknown", "success", start)
+    await _enqueue(db, "evt_2", "ch_unknown", "failed", start + timedelta(seconds=1))
+    await _enqueue(db, "evt_3", "ch_known", "success", start + timedelta(seconds=2))
+    await db.commit()
+
+    await drain()
+
+    events = await _events(db)
+    assert events["evt_3"].processed_at is not None
+    assert events["evt_1"].processed_at is None
+    assert events["evt_1"].attempts == 1
+    payment = (await db.execute(select(Payment))).scalar_one()
+    assert payment.payment_status == "success"
+
+
+async def test_events_are_ignored_after_max_attempts(db, drain):
+    await _enqueue(db, "evt_1", "ch_unknown", "success", datetime.utcnow())
+    await db.commit()
+
+    for _ in range(settings.payment_event_max_attempts):
+        await drain()
+
+    event = (await _events(db))["evt_1"]
+    assert event.attempts == settings.payment_event_max_attempts
+    assert event.ignored_at is not None
+    assert event.processed_at is not None
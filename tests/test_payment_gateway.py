@@ -0,0 +1,133 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+import stripe
+
+from backend.core.config import settings
+from backend.services.payment_gateway import (
+    FakeStripeGateway,
+    PaymentDeclinedError,
+    PaymentGatewayError,
+    StripeGateway,
+    reservation_idempotency_key,
+)
+
+pytestmark = pytest.mark.anyio
+
+RESERVATION_ID = uuid.UUID("01a14f02-8ab3-7241-92a4-aea74b80aa58")
+
+
+async def _charge(gateway, source: str = "tok_visa", amount: int = 5000, key: str = None):
+    return await gateway.charge(
+        amount=amount,
+        currency="eur",
+        source=source,
+        description="Payment for place on fair",
+        idempotency_key=key or reservation_idempotency_key(RESERVATION_ID, source),
+    )
+
+
+def test_idempotency_key_depends_on_card():
+    key = reservation_idempotency_key(RESERVATION_ID, "tok_visa")
+
+    assert key == reservation_idempotency_key(RESERVATION_ID, "tok_visa")
+    assert key != reservation_idempotency_key(RESERVATION_ID, "tok_mastercard")
+    assert "tok_visa" not in key
+
+
+async def test_fake_replays_charge():
+    gateway = FakeStripeGateway()
+
+    first = await _charge(gateway)
+    second = await _charge(gateway)
+
+    assert first == second
+    assert len(gateway.charges) == 1
+
+
+async def test_fake_replays_decline_and_accepts_another_card():
+    gateway = FakeStripeGateway()
+
+    with pytest.raises(PaymentDeclinedError):
+        await _charge(gateway, source=FakeStripeGateway.DECLINED_SOURCE)
+    with pytest.raises(PaymentDeclinedError):
+        await _charge(gateway, source=FakeStripeGateway.DECLINED_SOURCE)
+    charge = await _charge(gateway, source="tok_visa")
+
+    assert charge.status == "succeeded"
+
+
+async def test_fake_rejects_key_reused_with_other_parameters():
+    gateway = FakeStripeGateway()
+    key = reservation_idempotency_key(RESERVATION_ID, "tok_visa")
+    await _charge(gateway, key=key)
+
+    with pytest.raises(PaymentDeclinedError, match="same parameters"):
+        await _charge(gateway, amount=1000, key=key)
+
+
+@pytest.fixture
+def stripe_gateway(monkeypatch):
+    monkeypatch.setattr(settings, "stripe_retry_backoff_seconds", 0)
+    monkeypatch.setattr(settings, "stripe_max_retries", 2)
+    gateway = StripeGateway()
+    yield gateway
+    gateway.shutdown()
+
+
+def _stripe_responses(gateway, monkeypatch, *responses):
+    """
+    Replace the Stripe call with one returning or raising the given responses in order.
+    Returns the idempotency keys of the calls.
+    """
+    responses = list(responses)
+    keys = []
+
+    def create_charge(amount, currency, source, description, idempotency_key):
+        keys.append(idempotency_key)
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    monkeypatch.setattr(gateway, "_create_charge", create_charge)
+    return keys
+
+
+async def test_stripe_retries_with_same_key(stripe_gateway, monkeypatch):
+    keys = _stripe_responses(
+        stripe_gateway,
+        monkeypatch,
+        stripe.APIConnectionError("timeout"),
+        stripe.RateLimitError("slow down"),
+        SimpleNamespace(id="ch_1", status="succeeded"),
+    )
+
+    charge = await _charge(stripe_gateway)
+
+    assert charge.charge_id == "ch_1"
+    assert len(keys) == 3
+    assert len(set(keys)) == 1
+
+
+async def test_stripe_gives_up_after_retries(stripe_gateway, monkeypatch):
+    keys = _stripe_responses(
+        stripe_gateway, monkeypatch, *(stripe.APIConnectionError("timeout") for _ in range(3))
+    )
+
+    with pytest.raises(PaymentGatewayError):
+        await _charge(stripe_gateway)
+    assert len(keys) == 3
+
+
+async def test_stripe_does_not_retry_decline(stripe_gateway, monkeypatch):
+    keys = _stripe_responses(
+        stripe_gateway,
+        monkeypatch,
+        stripe.CardError("Your card was declined.", None, "card_declined"),
+    )
+
+    with pytest.raises(PaymentDeclinedError):
+        await _charge(stripe_gateway, source=FakeStripeGateway.DECLINED_SOURCE)
+    assert len(keys) == 1
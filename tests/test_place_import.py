@@ -0,0 +1,34 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+def _feature(name: str, lng: float, lat: float, **properties) -> dict:
+    return {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [lng, lat]},
+        "properties": {"name": name, **properties},
+    }
+
+
+async def test_imported_place_without_zone_can_be_read_back(client, reservation):
+    collection = {
+        "type": "FeatureCollection",
+        "features": [
+            _feature("B1", 20.12, 48.69),
+            _feature("B2", 20.13, 48.69, zona=2),
+        ],
+    }
+
+    response = await client.post("/import_places", params={"fair_name": "Jarmok"}, json=collection)
+    assert response.status_code == 200, response.text
+    assert response.json()["created"] == 2
+
+    response = await client.get("/places", params={"limit": 10})
+    assert response.status_code == 200, response.text
+    zones = {place["place_name"]: place["place_zona"] for place in response.json()["items"]}
+    assert zones["B1"] is None
+    assert zones["B2"] == 2
+
+    response = await client.post("/get_fair_places", params={"fair_name": "Jarmok"})
+    assert response.status_code == 200, response.text
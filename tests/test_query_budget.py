@@ -0,0 +1,44 @@
+"""
+Hot endpoints must stay within a fixed number of SQL statements and returned rows per request.
+
+Both are counted by the same cursor hooks that feed the db_statements_total and db_rows_total
+metrics, so a budget here matches what production reports.
+"""
+import pytest
+
+from backend.services.metrics import db_rows, db_statements
+
+pytestmark = pytest.mark.anyio
+
+
+# Authenticated endpoints spend one statement and row on resolving the principal of the token.
+# The fixtures hold one fair with two places, a business and its paid reservation.
+@pytest.mark.parametrize(
+    ("method", "route", "params", "status_code", "statements", "rows"),
+    [
+        ("POST", "/get_fair_places", {"fair_name": "Jarmok"}, 200, 2, 3),
+        ("GET", "/fair_availability", {"fair_name": "Jarmok"}, 200, 1, 2),
+        ("GET", "/places", {"limit": 10}, 200, 1, 2),
+        ("GET", "/generate_qr_code", {"format": "svg"}, 200, 2, 2),
+        ("POST", "/get_reservation/{id}", {}, 200, 2, 2),
+        (
+            "POST",
+            "/create_reservation",
+            {"fair_name": "Jarmok", "place_cordinates": "48.6834 20.1168"},
+            201,
+            4,
+            3,
+        ),
+    ],
+)
+async def test_query_budget(
+    client, paid_reservation, method, route, params, status_code, statements, rows
+):
+    before = db_statements.value(method, route), db_rows.value(method, route)
+    response = await client.request(method, route.format(id=paid_reservation.id), params=params)
+    executed = db_statements.value(method, route) - before[0]
+    returned = db_rows.value(method, route) - before[1]
+
+    assert response.status_code == status_code, response.text
+    assert executed <= statements, f"{route} ran {executed} statements, budget is {statements}"
+    assert returned <= rows, f"{route} returned {returned} rows, budget is {rows}"